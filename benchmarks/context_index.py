@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""Compare Claude turns and wall time per issue with and without the repository index
+
+Each issue is solved twice in throwaway worktrees, once with indexed
+snippets in the prompt and once without. Nothing is committed or pushed.
+
+    python benchmarks/context_index.py --issue 12 --issue 15
+    python benchmarks/context_index.py --issues-file issues.json --output results.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import List, Dict, Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from zezployee.claude_integration import ClaudeIntegration  # noqa: E402
+from zezployee.git_workspace import GitWorkspace  # noqa: E402
+from zezployee.paths import state_dir  # noqa: E402
+from zezployee.repo_index import RepoIndex  # noqa: E402
+
+
+def load_issues(args: argparse.Namespace, workspace: GitWorkspace) -> List[Dict[str, Any]]:
+    """Read issues from a JSON file or from the local issue cache"""
+    if args.issues_file:
+        issues = json.loads(Path(args.issues_file).read_text())
+        for issue in issues:
+            issue.setdefault('body', '')
+            issue.setdefault('labels', [])
+    else:
+        from zezployee.github_client import GitHubClient
+
+        client = GitHubClient(os.environ['GITHUB_TOKEN'], workspace=workspace)
+        issues = client.get_open_issues()
+    if args.issue:
+        issues = [issue for issue in issues if issue['number'] in args.issue]
+    return issues
+
+
+async def solve(claude: ClaudeIntegration, workspace: GitWorkspace, issue: Dict[str, Any],
+                mode: str) -> Dict[str, Any]:
+    """Solve one issue in a scratch worktree and measure it"""
+    branch_name = f"bench-issue-{issue['number']}-{mode}"
+    path = state_dir() / 'bench' / branch_name
+    workspace.run('worktree', 'add', '-B', branch_name, str(path), 'HEAD')
+    try:
+        start = time.perf_counter()
+        result = await claude.solve_issue_async(issue, cwd=path)
+        return {
+            'number': issue['number'],
+            'mode': mode,
+            'success': result['success'],
+            'turns': result.get('turns', 0),
+            'cost_usd': result.get('cost_usd', 0),
+            'wall_s': time.perf_counter() - start
+        }
+    finally:
+        workspace.run('worktree', 'remove', '--force', str(path), check=False)
+        workspace.run('branch', '-D', branch_name, check=False)
+
+
+async def run(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    """Solve every selected issue in both modes, one at a time"""
+    workspace = GitWorkspace()
+    issues = load_issues(args, workspace)
+
+    index = RepoIndex(state_dir() / 'index.sqlite3', workspace)
+    start = time.perf_counter()
+    indexed, removed = index.update()
+    print(f"index update: {indexed} indexed, {removed} removed in {time.perf_counter() - start:.2f}s")
+
+    quiet = lambda event, data: None  # noqa: E731
+    modes = {
+        'index': ClaudeIntegration(on_event=quiet, workspace=workspace, context_index=index,
+                                   context_tokens=args.context_tokens),
+        'none': ClaudeIntegration(on_event=quiet, workspace=workspace)
+    }
+
+    results = []
+    for issue in issues:
+        for mode, claude in modes.items():
+            result = await solve(claude, workspace, issue, mode)
+            results.append(result)
+            print(f"#{result['number']:<6} {mode:<6} success={result['success']!s:<5} "
+                  f"turns={result['turns']:<3} cost=${result['cost_usd']:.4f} wall={result['wall_s']:.1f}s")
+    return results
+
+
+def summarize(results: List[Dict[str, Any]]) -> None:
+    """Print mean turns and wall time per mode"""
+    for mode in ('index', 'none'):
+        runs = [result for result in results if result['mode'] == mode]
+        if not runs:
+            continue
+        print(f"{mode:<6} mean turns {sum(r['turns'] for r in runs) / len(runs):.1f}, "
+              f"mean wall {sum(r['wall_s'] for r in runs) / len(runs):.1f}s, "
+              f"solved {sum(1 for r in runs if r['success'])}/{len(runs)}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--issue', type=int, action='append', help='Issue number to include (repeatable)')
+    parser.add_argument('--issues-file', help='JSON list of issues instead of fetching from GitHub')
+    parser.add_argument('--context-tokens', type=int, default=2000)
+    parser.add_argument('--output', help='Write per-run results as JSON to this file')
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    summarize(results)
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
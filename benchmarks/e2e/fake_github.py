@@ -0,0 +1,238 @@
+"""In-process fake of the GitHub REST and GraphQL endpoints zezployee uses
+
+Serves a single repository with synthetic issues, answers conditional
+requests with 304, paginates with Link headers and sends rate limit headers
+with plenty of headroom so the client's pacing never kicks in.
+"""
+
+import hashlib
+import json
+import re
+import threading
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Dict, Any, Optional
+from urllib.parse import urlsplit, parse_qs, urlencode
+
+
+LABELS = ['bug', 'enhancement', 'documentation', 'performance', 'good first issue']
+
+
+def synthetic_issues(count: int) -> List[Dict[str, Any]]:
+    """Build issue payloads in the REST shape, newest first"""
+    base = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    issues = []
+    for number in range(1, count + 1):
+        stamp = (base + timedelta(minutes=number)).strftime('%Y-%m-%dT%H:%M:%SZ')
+        issues.append({
+            'number': number,
+            'title': f"Synthetic issue {number}: handle edge case in module_{number % 50}",
+            'body': f"Steps to reproduce issue {number}.\n\n" + 'The module misbehaves. ' * 20,
+            'state': 'open',
+            'labels': [{'name': LABELS[number % len(LABELS)]}],
+            'assignee': None,
+            'created_at': stamp,
+            'updated_at': stamp,
+            'html_url': f"https://github.example/owner/repo/issues/{number}"
+        })
+    return issues[::-1]
+
+
+class FakeGitHub:
+    def __init__(self, owner: str, name: str, issue_count: int):
+        self.owner = owner
+        self.name = name
+        self.issues = {issue['number']: issue for issue in synthetic_issues(issue_count)}
+        self.pulls: List[Dict[str, Any]] = []
+        self.requests: Counter = Counter()
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def full_name(self) -> str:
+        return f"{self.owner}/{self.name}"
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'FakeGitHub':
+        """Serve on a free localhost port from a daemon thread"""
+        fake = self
+
+        class Handler(_Handler):
+            github = fake
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def repo_payload(self) -> Dict[str, Any]:
+        return {
+            'full_name': self.full_name,
+            'name': self.name,
+            'owner': {'login': self.owner},
+            'html_url': f"https://github.example/{self.full_name}",
+            'default_branch': 'main'
+        }
+
+    def list_issues(self, state: str, since: Optional[str]) -> List[Dict[str, Any]]:
+        with self._lock:
+            issues = list(self.issues.values())
+        if state != 'all':
+            issues = [issue for issue in issues if issue['state'] == state]
+        if since:
+            issues = [issue for issue in issues if issue['updated_at'] >= since]
+            issues.sort(key=lambda issue: issue['updated_at'])
+        return issues
+
+    def create_pull(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        with self._lock:
+            number = len(self.issues) + len(self.pulls) + 1
+            pull = {
+                'number': number,
+                'title': payload.get('title'),
+                'head': payload.get('head'),
+                'base': payload.get('base'),
+                'state': 'open',
+                'html_url': f"https://github.example/{self.full_name}/pull/{number}"
+            }
+            self.pulls.append(pull)
+            return pull
+
+    def find_pulls(self, head: Optional[str]) -> List[Dict[str, Any]]:
+        branch = head.split(':', 1)[-1] if head else None
+        with self._lock:
+            return [pull for pull in self.pulls if branch is None or pull['head'] == branch]
+
+    def update_issue(self, number: int, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            issue = self.issues.get(number)
+            if issue is None:
+                return None
+            issue.update({key: value for key, value in payload.items() if key in ('state', 'title', 'body')})
+            issue['updated_at'] = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+            return issue
+
+    def graphql_issues(self, variables: Dict[str, Any]) -> Dict[str, Any]:
+        states = [state.lower() for state in variables.get('states') or ['OPEN']]
+        issues = [issue for issue in self.list_issues('all', variables.get('since'))
+                  if issue['state'] in states]
+        issues.sort(key=lambda issue: issue['updated_at'])
+        offset = int(variables.get('cursor') or 0)
+        page = issues[offset:offset + 100]
+        has_next = offset + 100 < len(issues)
+        return {'data': {'repository': {'issues': {
+            'pageInfo': {'hasNextPage': has_next, 'endCursor': str(offset + 100) if has_next else None},
+            'nodes': [{
+                'number': issue['number'],
+                'title': issue['title'],
+                'body': issue['body'],
+                'state': issue['state'].upper(),
+                'createdAt': issue['created_at'],
+                'updatedAt': issue['updated_at'],
+                'url': issue['html_url'],
+                'labels': {'nodes': issue['labels']},
+                'assignees': {'nodes': [issue['assignee']] if issue['assignee'] else []}
+            } for issue in page]
+        }}}}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    github: FakeGitHub
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+    def do_PATCH(self):
+        self._dispatch('PATCH')
+
+    def _dispatch(self, method: str) -> None:
+        url = urlsplit(self.path)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        length = int(self.headers.get('Content-Length') or 0)
+        body = json.loads(self.rfile.read(length)) if length else {}
+        repo_path = f"/repos/{self.github.full_name}"
+
+        if method == 'POST' and url.path == '/graphql':
+            self._count('graphql')
+            return self._send(200, self.github.graphql_issues(body.get('variables') or {}))
+
+        if url.path == repo_path and method == 'GET':
+            self._count('repo')
+            return self._send(200, self.github.repo_payload())
+
+        if url.path == f"{repo_path}/issues" and method == 'GET':
+            self._count('list_issues')
+            return self._list_issues(url.path, query)
+
+        if url.path == f"{repo_path}/pulls":
+            if method == 'POST':
+                self._count('create_pull')
+                return self._send(201, self.github.create_pull(body))
+            self._count('list_pulls')
+            return self._send(200, self.github.find_pulls(query.get('head')))
+
+        match = re.fullmatch(rf"{re.escape(repo_path)}/issues/(\d+)", url.path)
+        if match and method == 'PATCH':
+            self._count('update_issue')
+            issue = self.github.update_issue(int(match.group(1)), body)
+            if issue is None:
+                return self._send(404, {'message': 'Not Found'})
+            return self._send(200, issue)
+
+        self._count('not_found')
+        self._send(404, {'message': 'Not Found'})
+
+    def _list_issues(self, path: str, query: Dict[str, str]) -> None:
+        issues = self.github.list_issues(query.get('state', 'open'), query.get('since'))
+        per_page = int(query.get('per_page', 30))
+        page = int(query.get('page', 1))
+        chunk = issues[(page - 1) * per_page:page * per_page]
+
+        headers = {}
+        if page * per_page < len(issues):
+            next_query = dict(query, page=str(page + 1))
+            headers['Link'] = f'<{self.github.url}{path}?{urlencode(next_query)}>; rel="next"'
+
+        payload = json.dumps(chunk).encode()
+        etag = '"' + hashlib.sha1(payload).hexdigest() + '"'
+        headers['ETag'] = etag
+        if self.headers.get('If-None-Match') == etag:
+            self._count('not_modified')
+            return self._send(304, None, headers)
+        self._send(200, chunk, headers)
+
+    def _count(self, name: str) -> None:
+        with self.github._lock:
+            self.github.requests[name] += 1
+
+    def _send(self, status: int, payload: Any, headers: Optional[Dict[str, str]] = None) -> None:
+        data = b'' if payload is None else json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.send_header('X-RateLimit-Limit', '1000000')
+        self.send_header('X-RateLimit-Remaining', '999999')
+        self.send_header('X-RateLimit-Reset', '4102444800')
+        self.send_header('X-RateLimit-Resource', 'graphql' if self.path == '/graphql' else 'core')
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if data:
+            self.wfile.write(data)
@@ -0,0 +1,157 @@
+"""Scripted stand-in for claude_code_sdk used by the offline benchmark
+
+`query()` emits the same message types as the real SDK (an init system
+message, assistant tool calls with their results, and a final result) and
+really edits files in `options.cwd`, so everything downstream of Claude
+(change detection, commit, push, PR) does real work.
+
+Tunables, read from the environment:
+
+    FAKE_CLAUDE_TURNS        assistant turns per session (default 3)
+    FAKE_CLAUDE_LATENCY      seconds per turn (default 0.05)
+    FAKE_CLAUDE_FAIL_EVERY   end every Nth issue with error_max_turns (default 0, never)
+"""
+
+import asyncio
+import os
+import re
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional, Union
+
+
+class ClaudeSDKError(Exception):
+    pass
+
+
+class CLIConnectionError(ClaudeSDKError):
+    pass
+
+
+class CLINotFoundError(CLIConnectionError):
+    pass
+
+
+class ProcessError(ClaudeSDKError):
+    pass
+
+
+class CLIJSONDecodeError(ClaudeSDKError):
+    pass
+
+
+@dataclass
+class TextBlock:
+    text: str
+
+
+@dataclass
+class ToolUseBlock:
+    id: str
+    name: str
+    input: Dict[str, Any]
+
+
+@dataclass
+class ToolResultBlock:
+    tool_use_id: str
+    content: Optional[Union[str, List[Dict[str, Any]]]] = None
+    is_error: Optional[bool] = None
+
+
+@dataclass
+class UserMessage:
+    content: Union[str, List[Any]]
+
+
+@dataclass
+class AssistantMessage:
+    content: List[Any]
+    model: str = 'fake-claude'
+
+
+@dataclass
+class SystemMessage:
+    subtype: str
+    data: Dict[str, Any]
+
+
+@dataclass
+class ResultMessage:
+    subtype: str
+    duration_ms: int
+    duration_api_ms: int
+    is_error: bool
+    num_turns: int
+    session_id: str
+    total_cost_usd: Optional[float] = None
+    usage: Optional[Dict[str, Any]] = None
+    result: Optional[str] = None
+
+
+Message = Union[UserMessage, AssistantMessage, SystemMessage, ResultMessage]
+
+
+@dataclass
+class ClaudeCodeOptions:
+    allowed_tools: List[str] = field(default_factory=list)
+    max_thinking_tokens: int = 8000
+    system_prompt: Optional[str] = None
+    append_system_prompt: Optional[str] = None
+    permission_mode: Optional[str] = None
+    continue_conversation: bool = False
+    resume: Optional[str] = None
+    max_turns: Optional[int] = None
+    disallowed_tools: List[str] = field(default_factory=list)
+    model: Optional[str] = None
+    cwd: Optional[Union[str, Path]] = None
+
+
+ISSUE_PATTERN = re.compile(r'# GitHub Issue #(\d+)')
+
+
+async def query(*, prompt: str, options: Optional[ClaudeCodeOptions] = None) -> AsyncIterator[Message]:
+    options = options or ClaudeCodeOptions()
+    cwd = Path(options.cwd or os.getcwd())
+    turns = int(os.getenv('FAKE_CLAUDE_TURNS', '3'))
+    latency = float(os.getenv('FAKE_CLAUDE_LATENCY', '0.05'))
+    fail_every = int(os.getenv('FAKE_CLAUDE_FAIL_EVERY', '0'))
+
+    match = ISSUE_PATTERN.search(prompt)
+    number = int(match.group(1)) if match else 0
+    session_id = options.resume or str(uuid.uuid4())
+    resumed = options.resume is not None
+
+    yield SystemMessage(subtype='init', data={'session_id': session_id, 'cwd': str(cwd)})
+
+    for turn in range(1, turns + 1):
+        await asyncio.sleep(latency)
+        target = Path('src') / f"module_{number % 50}.py"
+        path = cwd / target
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'a') as handle:
+            handle.write(f"# issue {number}, turn {turn}\n")
+        tool_id = f"toolu_{number}_{turn}"
+        yield AssistantMessage(content=[
+            TextBlock(text=f"Editing {target} for issue #{number}."),
+            ToolUseBlock(id=tool_id, name='Edit', input={'file_path': str(path)})
+        ])
+        yield UserMessage(content=[ToolResultBlock(tool_use_id=tool_id, content='ok')])
+
+    notes = cwd / 'notes' / f"issue_{number}.md"
+    notes.parent.mkdir(parents=True, exist_ok=True)
+    notes.write_text(f"Notes for issue #{number}\n")
+
+    failed = fail_every and number % fail_every == 0 and not resumed
+    yield ResultMessage(
+        subtype='error_max_turns' if failed else 'success',
+        duration_ms=int(turns * latency * 1000),
+        duration_api_ms=int(turns * latency * 800),
+        is_error=bool(failed),
+        num_turns=turns,
+        session_id=session_id,
+        total_cost_usd=0.01 * turns,
+        usage={'input_tokens': 1200 * turns, 'output_tokens': 300 * turns},
+        result=None if failed else f"Fixed issue #{number} in {turns} turns."
+    )
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""Offline end-to-end benchmark for zezployee batch runs
+
+For each size, builds a scratch repository with a bare local remote, serves
+that many synthetic issues from a fake GitHub, and runs `zezployee --all`
+in a fresh interpreter with a scripted claude_code_sdk that edits files.
+Everything after Claude (worktrees, commits, pushes, pull requests) is real
+work against the local remote and fake API.
+
+    python benchmarks/e2e/run.py --sizes 10 100 1000 --concurrency 8
+    python benchmarks/e2e/run.py --sizes 100 --compare benchmarks/results/abc1234-20240101T000000.json
+
+Reports throughput, per-phase latency percentiles, peak RSS and subprocess
+counts, and saves them to benchmarks/results/<commit>-<timestamp>.json.
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+
+
+HERE = Path(__file__).resolve().parent
+ROOT = HERE.parent.parent
+FAKE_SDK = HERE / 'fake_sdk'
+RESULTS_DIR = ROOT / 'benchmarks' / 'results'
+
+OWNER, NAME = 'owner', 'repo'
+
+
+def git(*args: str, cwd: Path) -> str:
+    return subprocess.run(['git', *args], cwd=cwd, capture_output=True, text=True, check=True).stdout
+
+
+def make_repository(base: Path) -> Path:
+    """Create a clone with a few source files and a bare origin it can push to"""
+    remote = base / 'remote.git'
+    work = base / 'work'
+    git('init', '--quiet', '--bare', '--initial-branch=main', str(remote), cwd=base)
+    git('init', '--quiet', '--initial-branch=main', str(work), cwd=base)
+    git('config', 'user.name', 'Benchmark', cwd=work)
+    git('config', 'user.email', 'benchmark@example.com', cwd=work)
+
+    (work / 'src').mkdir()
+    for index in range(50):
+        (work / 'src' / f"module_{index}.py").write_text(
+            f'"""Module {index}"""\n\n\ndef handle_{index}(value):\n    return value * {index}\n'
+        )
+    (work / 'README.md').write_text('# Benchmark repository\n')
+    git('add', '.', cwd=work)
+    git('commit', '--quiet', '-m', 'Initial commit', cwd=work)
+    git('remote', 'add', 'origin', str(remote), cwd=work)
+    git('push', '--quiet', '-u', 'origin', 'main', cwd=work)
+    git('remote', 'set-head', 'origin', 'main', cwd=work)
+    return work
+
+
+def percentiles(values: List[float]) -> Dict[str, float]:
+    """Nearest-rank p50/p90/p99"""
+    ordered = sorted(values)
+
+    def rank(p: float) -> float:
+        return ordered[max(0, min(len(ordered) - 1, int(round(p / 100 * len(ordered))) - 1))]
+
+    return {'p50': rank(50), 'p90': rank(90), 'p99': rank(99), 'max': ordered[-1]}
+
+
+def run_size(size: int, args: argparse.Namespace) -> Dict[str, Any]:
+    """Benchmark one batch of synthetic issues in a scratch repository"""
+    sys.path.insert(0, str(HERE))
+    from fake_github import FakeGitHub
+
+    with tempfile.TemporaryDirectory(prefix=f"zezployee-e2e-{size}-") as tmp:
+        base = Path(tmp)
+        work = make_repository(base)
+        server = FakeGitHub(OWNER, NAME, size).start()
+        try:
+            env = dict(
+                os.environ,
+                PYTHONPATH=os.pathsep.join([str(FAKE_SDK), str(ROOT)]),
+                GITHUB_API_URL=server.url,
+                GITHUB_REPOSITORY=server.full_name,
+                GITHUB_TOKEN='fake-token',
+                XDG_CACHE_HOME=str(base / 'cache'),
+                FAKE_CLAUDE_TURNS=str(args.turns),
+                FAKE_CLAUDE_LATENCY=str(args.latency)
+            )
+            # The synthetic issues share most of their text, so dedup would fold
+            # them into a few clusters; every issue should get its own PR here
+            cli_args = ['--all', '--concurrency', str(args.concurrency), '--backend', args.backend,
+                        '--context-tokens', str(args.context_tokens), '--no-dedup']
+            output = base / 'child.json'
+            with open(base / 'child.log', 'w') as log:
+                child = subprocess.run(
+                    [sys.executable, str(Path(__file__).resolve()), '--child', str(output), '--', *cli_args],
+                    cwd=work, env=env, stdout=log, stderr=subprocess.STDOUT
+                )
+            if not output.exists():
+                tail = (base / 'child.log').read_text()[-2000:]
+                raise RuntimeError(f"Benchmark run for {size} issues crashed:\n{tail}")
+            measured = json.loads(output.read_text())
+            pulls = len(server.pulls)
+            requests = dict(server.requests)
+        finally:
+            server.stop()
+
+    spans = measured['profile']['spans']
+    by_phase: Dict[str, List[float]] = defaultdict(list)
+    for span in spans:
+        by_phase[span['name']].append(span['wall_s'])
+    total = next(span for span in spans if span['name'] == 'benchmark')
+
+    elapsed = measured['elapsed_s']
+    return {
+        'issues': size,
+        'pull_requests': pulls,
+        'exit_code': child.returncode,
+        'elapsed_s': elapsed,
+        'issues_per_min': pulls / elapsed * 60 if elapsed else 0.0,
+        'peak_rss_mb': measured['peak_rss_kb'] / 1024,
+        'peak_child_rss_mb': measured['peak_child_rss_kb'] / 1024,
+        'subprocesses': total['counters'].get('subprocesses', 0),
+        'subprocesses_per_issue': total['counters'].get('subprocesses', 0) / size,
+        'api_calls': total['counters'].get('api_calls', 0),
+        'api_requests': requests,
+        'phases': {name: dict(percentiles(walls), n=len(walls)) for name, walls in by_phase.items()}
+    }
+
+
+def child_main(output: Path, cli_args: List[str]) -> None:
+    """Run the CLI in this interpreter and record what it cost"""
+    import click
+    from zezployee import cli
+    from zezployee.profiling import profiler
+
+    start = time.perf_counter()
+    with profiler.span('benchmark'):
+        try:
+            cli.main.main(args=cli_args, standalone_mode=False)
+        except (SystemExit, click.exceptions.Exit):
+            # Failed issues exit non-zero; they are counted from the fake server
+            pass
+    elapsed = time.perf_counter() - start
+
+    output.write_text(json.dumps({
+        'elapsed_s': elapsed,
+        # ru_maxrss is in kilobytes on Linux
+        'peak_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        'peak_child_rss_kb': resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+        'profile': json.loads(profiler.to_json())
+    }))
+
+
+def print_result(result: Dict[str, Any], previous: Optional[Dict[str, Any]] = None) -> None:
+    def delta(key: str, value: float, phase: Optional[str] = None) -> str:
+        if not previous:
+            return ''
+        old = previous['phases'].get(phase, {}).get(key) if phase else previous.get(key)
+        if not old:
+            return ''
+        return f" ({(value - old) / old * 100:+.1f}%)"
+
+    print(f"\n{result['issues']} issues: {result['pull_requests']} pull requests in {result['elapsed_s']:.1f} s")
+    print(f"  throughput:   {result['issues_per_min']:.1f} issues/min"
+          f"{delta('issues_per_min', result['issues_per_min'])}")
+    print(f"  peak RSS:     {result['peak_rss_mb']:.1f} MB (largest child {result['peak_child_rss_mb']:.1f} MB)"
+          f"{delta('peak_rss_mb', result['peak_rss_mb'])}")
+    print(f"  subprocesses: {result['subprocesses']:g} ({result['subprocesses_per_issue']:.1f}/issue)"
+          f"{delta('subprocesses', result['subprocesses'])}")
+    print(f"  API calls:    {result['api_calls']:g}{delta('api_calls', result['api_calls'])}")
+    print(f"  {'phase':<18} {'n':>5} {'p50 s':>8} {'p90 s':>8} {'p99 s':>8}")
+    for name, phase in result['phases'].items():
+        print(f"  {name:<18} {phase['n']:>5} {phase['p50']:>8.3f} {phase['p90']:>8.3f} {phase['p99']:>8.3f}"
+              f"{delta('p50', phase['p50'], name)}")
+
+
+def main() -> int:
+    if len(sys.argv) > 2 and sys.argv[1] == '--child':
+        child_main(Path(sys.argv[2]), sys.argv[4:])
+        return 0
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000],
+                        help='Numbers of synthetic issues to benchmark')
+    parser.add_argument('--concurrency', type=int, default=8, help='Issues solved at once')
+    parser.add_argument('--backend', choices=['rest', 'graphql'], default='rest', help='API used to fetch issues')
+    parser.add_argument('--context-tokens', type=int, default=2000, help='Indexed context budget per prompt')
+    parser.add_argument('--turns', type=int, default=3, help='Scripted Claude turns per issue')
+    parser.add_argument('--latency', type=float, default=0.05, help='Scripted Claude seconds per turn')
+    parser.add_argument('--compare', type=Path, help='Earlier results file to show changes against')
+    parser.add_argument('--output', type=Path, help='Results file (default: benchmarks/results/<commit>-<time>.json)')
+    args = parser.parse_args()
+
+    previous = {}
+    if args.compare:
+        previous = {run['issues']: run for run in json.loads(args.compare.read_text())['runs']}
+
+    runs = []
+    for size in args.sizes:
+        result = run_size(size, args)
+        print_result(result, previous.get(size))
+        runs.append(result)
+
+    commit = git('rev-parse', '--short', 'HEAD', cwd=ROOT).strip()
+    dirty = bool(git('status', '--porcelain', '--untracked-files=no', cwd=ROOT).strip())
+    output = args.output or RESULTS_DIR / f"{commit}-{time.strftime('%Y%m%dT%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps({
+        'commit': commit,
+        'dirty': dirty,
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'settings': {
+            'concurrency': args.concurrency,
+            'backend': args.backend,
+            'context_tokens': args.context_tokens,
+            'turns': args.turns,
+            'latency': args.latency
+        },
+        'runs': runs
+    }, indent=2))
+    print(f"\nSaved results to {output}")
+
+    return 0 if all(run['pull_requests'] == run['issues'] for run in runs) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
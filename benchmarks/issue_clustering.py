@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""Speed and accuracy benchmark for near-duplicate issue clustering
+
+Generates synthetic issues, a known share of which are reworded copies of
+others, clusters them and fails (exit status 1) when clustering takes
+longer than the budget.
+
+    python benchmarks/issue_clustering.py --issues 10000 --budget-ms 500
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+from typing import List, Dict, Any, Tuple
+
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from zezployee.issue_clustering import cluster_duplicates, DEFAULT_THRESHOLD  # noqa: E402
+
+
+VOCABULARY = [
+    'cache', 'parser', 'config', 'timeout', 'login', 'upload', 'export', 'render', 'search', 'index',
+    'crash', 'error', 'slow', 'memory', 'leak', 'token', 'session', 'retry', 'queue', 'worker',
+    'button', 'page', 'dialog', 'request', 'response', 'header', 'field', 'value', 'empty', 'missing',
+    'when', 'after', 'before', 'with', 'without', 'using', 'on', 'in', 'fails', 'returns',
+]
+
+
+def make_issues(count: int, duplicate_share: float, seed: int = 1) -> Tuple[List[Dict[str, Any]], Dict[int, int]]:
+    """Build issues plus a map from each planted duplicate to its original"""
+    rng = random.Random(seed)
+    issues: List[Dict[str, Any]] = []
+    planted: Dict[int, int] = {}
+    for number in range(1, count + 1):
+        if issues and rng.random() < duplicate_share:
+            original = rng.choice(issues)
+            words = original['body'].split()
+            # Reword a few places, as a second reporter would
+            for _ in range(max(1, len(words) // 12)):
+                words[rng.randrange(len(words))] = rng.choice(VOCABULARY)
+            planted[number] = planted.get(original['number'], original['number'])
+            title, body = original['title'], ' '.join(words)
+        else:
+            title = ' '.join(rng.choices(VOCABULARY, k=8))
+            body = ' '.join(rng.choices(VOCABULARY, k=rng.randint(40, 120)))
+        issues.append({'number': number, 'title': title, 'body': body, 'labels': []})
+    return issues, planted
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--issues', type=int, default=10000, help='Number of synthetic issues')
+    parser.add_argument('--duplicates', type=float, default=0.2, help='Share of issues that duplicate another')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help='Similarity threshold')
+    parser.add_argument('--budget-ms', type=float, default=500.0, help='Maximum clustering wall time')
+    parser.add_argument('--runs', type=int, default=5, help='Number of timed runs')
+    args = parser.parse_args()
+
+    issues, planted = make_issues(args.issues, args.duplicates)
+
+    # Warm up NumPy's import and allocator so the first run is not an outlier
+    cluster_duplicates(issues[:100], args.threshold)
+
+    timings = []
+    for _ in range(args.runs):
+        start = time.perf_counter()
+        grouped = cluster_duplicates(issues, args.threshold)
+        timings.append((time.perf_counter() - start) * 1000)
+    best_ms = min(timings)
+
+    found = {}
+    for issue in grouped:
+        for duplicate in issue.get('duplicates', []):
+            found[duplicate['number']] = issue['number']
+    correct = sum(1 for number, original in found.items() if planted.get(number) == original)
+    recall = correct / len(planted) if planted else 1.0
+    precision = correct / len(found) if found else 1.0
+
+    print(f"{args.issues} issues -> {len(grouped)} clusters in {best_ms:.1f} ms (best of {args.runs})")
+    print(f"  planted duplicates: {len(planted)}, folded: {len(found)}")
+    print(f"  precision: {precision:.3f}, recall: {recall:.3f}")
+
+    if best_ms > args.budget_ms:
+        print(f"FAIL: clustering took {best_ms:.1f} ms, over the budget of {args.budget_ms:.0f} ms")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
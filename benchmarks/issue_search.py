@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""Keystroke latency benchmark for the interactive issue selector
+
+Builds the search index over synthetic issues, then types queries one
+character at a time. Each keystroke re-queries the index and renders the
+visible page, as the selector does. Fails (exit status 1) when the p99
+keystroke takes longer than the budget.
+
+    python benchmarks/issue_search.py --issues 50000 --budget-ms 16
+"""
+
+import argparse
+import gc
+import io
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from issue_clustering import make_issues  # noqa: E402
+from zezployee.issue_search import IssueIndex  # noqa: E402
+from zezployee.issue_selector import _View  # noqa: E402
+
+
+QUERIES = ['memory leak', 'cache timeout after retry', 'label:bug crash', 'age:week login fails', 'assignee:alice']
+
+LABELS = ['bug', 'enhancement', 'documentation', 'performance', 'good first issue']
+
+
+def main() -> int:
+    from rich.console import Console
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--issues', type=int, default=50000, help='Number of synthetic issues')
+    parser.add_argument('--page-size', type=int, default=30, help='Rows rendered per keystroke')
+    parser.add_argument('--budget-ms', type=float, default=16.0, help='Maximum p99 keystroke latency')
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    now = datetime.now(timezone.utc)
+    issues, _ = make_issues(args.issues, 0.1)
+    for issue in issues:
+        issue['labels'] = rng.sample(LABELS, rng.randint(0, 2))
+        issue['assignee'] = rng.choice(['alice', 'bob', None, None])
+        issue['created_at'] = now - timedelta(days=rng.randint(0, 700))
+
+    start = time.perf_counter()
+    index = IssueIndex(issues)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    # As the selector does, keep full collections off the keystroke path
+    gc.freeze()
+    console = Console(file=io.StringIO(), width=120, force_terminal=True)
+    view = _View(index, args.page_size)
+    console.print(view.render(True))
+
+    timings = []
+    for query in QUERIES:
+        for length in range(1, len(query) + 1):
+            start = time.perf_counter()
+            view.search(query[:length])
+            console.print(view.render(True))
+            timings.append((time.perf_counter() - start) * 1000)
+        view.search('')
+
+    timings.sort()
+    p50 = timings[len(timings) // 2]
+    p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+    print(f"{args.issues} issues indexed in {build_ms:.0f} ms")
+    print(f"  {len(timings)} keystrokes: p50 {p50:.1f} ms, p99 {p99:.1f} ms, max {timings[-1]:.1f} ms")
+
+    if p99 > args.budget_ms:
+        print(f"FAIL: p99 keystroke took {p99:.1f} ms, over the budget of {args.budget_ms:.0f} ms")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""Cold-start benchmark for the zezployee CLI
+
+Runs `python -X importtime -c "import zezployee.cli"` several times and
+fails (exit status 1) when the best cumulative import time exceeds the
+budget, or when a heavy dependency is imported at startup.
+
+    python benchmarks/startup.py --budget-ms 100
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Tuple
+
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Modules that must only be imported on the code paths that use them
+HEAVY_MODULES = ['claude_code_sdk', 'rich', 'dotenv', 'requests', 'numpy', 'asyncio', 'sqlite3']
+
+
+def measure_import() -> Tuple[float, Dict[str, int]]:
+    """Import zezployee.cli in a fresh interpreter, returning wall ms and per-module cumulative us"""
+    env = dict(os.environ, PYTHONPATH=str(ROOT))
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import zezployee.cli'],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True
+    )
+    wall_ms = (time.perf_counter() - start) * 1000
+
+    modules = {}
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        modules[name.strip()] = int(cumulative)
+    return wall_ms, modules
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--budget-ms', type=float, default=100.0,
+                        help='Maximum cold-start wall time of the interpreter plus import')
+    parser.add_argument('--runs', type=int, default=7, help='Number of fresh interpreters to measure')
+    args = parser.parse_args()
+
+    # Warm the bytecode cache so the first run is not an outlier
+    measure_import()
+
+    runs = [measure_import() for _ in range(args.runs)]
+    wall_ms, modules = min(runs, key=lambda run: run[0])
+    cli_ms = modules.get('zezployee.cli', 0) / 1000
+
+    print(f"cold start: {wall_ms:.1f} ms (best of {args.runs}), zezployee.cli import: {cli_ms:.1f} ms")
+    slowest = sorted(modules.items(), key=lambda item: item[1], reverse=True)[:10]
+    for name, cumulative in slowest:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+    failed = False
+    eager = [name for name in HEAVY_MODULES if name in modules]
+    if eager:
+        print(f"FAIL: heavy modules imported at startup: {', '.join(eager)}")
+        failed = True
+    if wall_ms > args.budget_ms:
+        print(f"FAIL: cold start {wall_ms:.1f} ms exceeds budget of {args.budget_ms:.0f} ms")
+        failed = True
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,23 @@
+import pytest
+
+from helpers import git, write
+
+
+@pytest.fixture(autouse=True)
+def git_identity(monkeypatch):
+    """Let tests commit without a configured git user"""
+    for role in ('AUTHOR', 'COMMITTER'):
+        monkeypatch.setenv(f"GIT_{role}_NAME", 'Test')
+        monkeypatch.setenv(f"GIT_{role}_EMAIL", 'test@example.com')
+
+
+@pytest.fixture
+def repo(tmp_path):
+    """A repository with one commit"""
+    path = tmp_path / 'repo'
+    path.mkdir()
+    git(path, 'init', '-q', '-b', 'main')
+    write(path, {'README.md': 'hello\n'})
+    git(path, 'add', '-A')
+    git(path, 'commit', '-q', '-m', 'init')
+    return path
@@ -0,0 +1,16 @@
+"""Shared helpers for tests that build throwaway git repositories"""
+
+import subprocess
+
+
+def git(path, *args):
+    """Run git in path and return its stripped output"""
+    return subprocess.run(['git', *args], cwd=path, check=True, capture_output=True, text=True).stdout.strip()
+
+
+def write(root, files):
+    """Write {relative path: text} under root"""
+    for name, text in files.items():
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text)
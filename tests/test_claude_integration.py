@@ -0,0 +1,62 @@
+import asyncio
+from types import SimpleNamespace
+
+from zezployee.claude_integration import ClaudeIntegration, is_read_only_command
+
+
+def test_read_only_commands():
+    assert is_read_only_command('ls -la src')
+    assert is_read_only_command('cd pkg && grep -rn "def main" . | head -20')
+    assert is_read_only_command('git --no-pager diff HEAD; git status')
+    assert not is_read_only_command('python -m pytest -q')
+    assert not is_read_only_command('cat a.py > b.py')
+    assert not is_read_only_command('git checkout -- a.py')
+    assert not is_read_only_command('echo $(rm -rf build)')
+    assert not is_read_only_command('')
+
+
+def test_commands_that_can_write_are_not_read_only():
+    assert not is_read_only_command('ls & rm -rf src')
+    assert not is_read_only_command('cat <(touch x)')
+    assert not is_read_only_command('cat >(tee x) a.py')
+    assert not is_read_only_command('grep foo < a.py')
+    assert not is_read_only_command('ls 2>/dev/null')
+    assert not is_read_only_command('tree -o out.txt')
+    assert not is_read_only_command('file -C -m x')
+    assert not is_read_only_command('rg --pre ./evil foo')
+    assert not is_read_only_command('rg --pre=./evil foo')
+    assert not is_read_only_command('git grep -O"rm -rf ." foo')
+    assert not is_read_only_command('git grep -nO foo')
+    assert not is_read_only_command('git grep --open-files foo')
+    assert not is_read_only_command('git diff --output=a.py')
+    assert not is_read_only_command('git show --output a.py HEAD')
+    assert is_read_only_command('rg --pretty -n foo && git log --oneline -5')
+    assert is_read_only_command('git grep -n -e Oops -- -O')
+
+
+def tool_call(name, **tool_input):
+    return SimpleNamespace(content=[SimpleNamespace(name=name, input=tool_input)])
+
+
+def test_track_edits_through_read_only_bash(tmp_path):
+    claude = ClaudeIntegration(transcript_dir=tmp_path)
+    touched = claude._track_edits(tool_call('Bash', command='grep -rn foo .'), tmp_path, set())
+    touched = claude._track_edits(tool_call('Write', file_path=str(tmp_path / 'app.py')), tmp_path, touched)
+    assert touched == {'app.py'}
+    assert claude._track_edits(tool_call('Bash', command="sed -i 's/a/b/' app.py"), tmp_path, touched) is None
+
+
+def test_stream_without_result_keeps_the_session_id(tmp_path, monkeypatch):
+    import claude_code_sdk
+    from claude_code_sdk import AssistantMessage, SystemMessage, TextBlock
+
+    async def query(prompt, options):
+        yield SystemMessage(subtype='init', data={'session_id': 'session-1'})
+        yield AssistantMessage(content=[TextBlock(text='Done')], model='claude')
+
+    monkeypatch.setattr(claude_code_sdk, 'query', query)
+    claude = ClaudeIntegration(on_event=lambda event, data: None, transcript_dir=tmp_path / 'transcripts')
+    result = asyncio.run(claude._run_claude_code('Fix it', cwd=tmp_path))
+
+    assert result['success'] and result['output'] == 'Done'
+    assert result['session_id'] == 'session-1'
@@ -0,0 +1,42 @@
+import asyncio
+
+from zezployee.daemon import Daemon
+from zezployee.job_queue import JobQueue, COMMITTED, PR_OPENED
+
+
+class FlakyGitHub:
+    """Fails the first pushes, as on a network blip, then works"""
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.pushed = []
+
+    def push_branch(self, branch_name):
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError('Could not resolve host: github.com')
+        self.pushed.append(branch_name)
+
+    def find_pull_request(self, branch_name):
+        return None
+
+    def open_pull_request(self, branch_name, issue, changes):
+        return f"https://github.com/o/r/pull/{issue['number']}"
+
+
+def test_push_failures_keep_the_committed_solution(tmp_path):
+    queue = JobQueue(tmp_path / 'jobs.sqlite3')
+    queue.enqueue({'number': 1, 'title': 'Issue 1', 'body': '', 'labels': []})
+    queue.advance(1, COMMITTED, attempts=1, changes='- app.py (+1/-0)')
+    github = FlakyGitHub(failures=5)
+    daemon = Daemon(github, None, queue, pool=object())
+
+    for _ in range(5):
+        asyncio.run(daemon._process(queue.get(1)))
+        assert queue.get(1)['stage'] == COMMITTED
+
+    asyncio.run(daemon._process(queue.get(1)))
+    job = queue.get(1)
+    assert job['stage'] == PR_OPENED and job['pr_url'] == 'https://github.com/o/r/pull/1'
+    assert github.pushed == ['issue-1']
+    queue.close()
@@ -0,0 +1,52 @@
+from helpers import git, write
+from zezployee import git_workspace
+from zezployee.git_workspace import GitWorkspace
+from zezployee.profiling import profiler
+
+
+def test_stage_skips_ignored_and_unchanged_paths(repo):
+    write(repo, {'.gitignore': '*.log\n'})
+    git(repo, 'add', '-A')
+    git(repo, 'commit', '-q', '-m', 'ignore logs')
+    write(repo, {'out.log': 'noise\n', 'app.py': 'x = 1\n', 'README.md': 'changed\n'})
+
+    workspace = GitWorkspace(repo)
+    staged = workspace.stage(['out.log', 'app.py', 'README.md', '.gitignore'])
+
+    assert sorted(staged) == ['README.md', 'app.py']
+    assert sorted(workspace.staged_paths()) == ['README.md', 'app.py']
+
+
+def test_stage_nothing_touched(repo):
+    write(repo, {'other.py': 'y = 2\n'})
+    workspace = GitWorkspace(repo)
+    assert workspace.stage([]) == []
+    assert workspace.staged_paths() == []
+
+
+def test_full_scans_look_up_the_index_once(repo):
+    workspace = GitWorkspace(repo)
+    with profiler.span('test_full_scans') as span:
+        workspace.for_path(repo)._count_scanned(None)
+        workspace.for_path(repo)._count_scanned(None)
+    assert span.counters == {'subprocesses': 1, 'paths_scanned': 2}
+
+
+def test_changes_summary_counts_staged_and_unstaged_lines_apart(repo):
+    write(repo, {'README.md': 'hello\nstaged\n'})
+    git(repo, 'add', 'README.md')
+    write(repo, {'README.md': 'hello\nstaged\nunstaged\nagain\n'})
+
+    summary = GitWorkspace(repo).changes_summary()
+    assert summary == "**Staged changes:**\n\n- README.md (+1/-0)\n\n**Unstaged changes:**\n\n- README.md (+2/-0)"
+
+
+def test_state_dir_is_looked_up_once_per_repository(repo, tmp_path, monkeypatch):
+    worktree = tmp_path / 'worktree'
+    git(repo, 'worktree', 'add', '-q', str(worktree))
+    lookups = []
+    monkeypatch.setattr(git_workspace, 'state_dir', lambda cwd: lookups.append(cwd) or tmp_path / 'state')
+
+    workspace = GitWorkspace(repo)
+    assert workspace.state_dir == workspace.for_path(worktree).state_dir == tmp_path / 'state'
+    assert lookups == [repo]
@@ -0,0 +1,95 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from helpers import git
+from zezployee.git_workspace import GitWorkspace
+from zezployee.github_client import GitHubClient
+
+
+def issue_node(number):
+    return {
+        'number': number,
+        'title': f"Issue {number}",
+        'body': 'Steps to reproduce',
+        'state': 'OPEN',
+        'createdAt': '2026-01-01T00:00:00Z',
+        'updatedAt': f"2026-01-01T00:{number // 60:02d}:{number % 60:02d}Z",
+        'url': f"https://github.com/o/r/issues/{number}",
+        'labels': {'nodes': [{'name': 'bug'}]},
+        'assignees': {'nodes': []}
+    }
+
+
+class FakeGraphQL(BaseHTTPRequestHandler):
+    """Serves the repository and pages issues 100 at a time by cursor"""
+
+    issues = [issue_node(number) for number in range(1, 151)]
+    queries = []
+
+    def log_message(self, *args):
+        pass
+
+    def reply(self, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        assert self.path == '/repos/o/r'
+        self.reply({'full_name': 'o/r', 'name': 'r', 'owner': {'login': 'o'}, 'html_url': 'https://github.com/o/r'})
+
+    def do_POST(self):
+        assert self.path == '/fake/graphql'
+        variables = json.loads(self.rfile.read(int(self.headers['Content-Length'])))['variables']
+        self.queries.append(variables)
+        start = int(variables['cursor'] or 0)
+        nodes = self.issues[start:start + 100]
+        self.reply({'data': {'repository': {'issues': {
+            'pageInfo': {'hasNextPage': start + 100 < len(self.issues), 'endCursor': str(start + 100)},
+            'nodes': nodes
+        }}}})
+
+
+@pytest.fixture
+def graphql_server(repo, tmp_path, monkeypatch):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FakeGraphQL)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    FakeGraphQL.queries = []
+
+    git(repo, 'remote', 'add', 'origin', 'https://github.com/o/r.git')
+    monkeypatch.chdir(repo)
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path / 'cache'))
+    monkeypatch.setenv('GITHUB_API_URL', url)
+    monkeypatch.setenv('GITHUB_GRAPHQL_URL', f"{url}/fake/graphql")
+    monkeypatch.setenv('GITHUB_REPOSITORY', 'o/r')
+    yield FakeGraphQL
+    server.shutdown()
+    server.server_close()
+
+
+def test_graphql_fetch_follows_cursors(repo, graphql_server):
+    client = GitHubClient('token', backend='graphql', workspace=GitWorkspace(repo))
+    issues = client.get_open_issues()
+
+    assert len(issues) == 150
+    assert issues[0]['number'] == 150 and issues[0]['labels'] == ['bug']
+    assert [query['cursor'] for query in graphql_server.queries] == [None, '100']
+    assert graphql_server.queries[0]['states'] == ['OPEN']
+
+
+def test_graphql_resync_asks_for_updates_since_the_last_one(repo, graphql_server):
+    client = GitHubClient('token', backend='graphql', workspace=GitWorkspace(repo))
+    client.get_open_issues()
+    graphql_server.queries.clear()
+
+    client.get_open_issues()
+    since = graphql_server.queries[0]['since']
+    assert since == max(node['updatedAt'] for node in graphql_server.issues)
+    assert graphql_server.queries[0]['states'] == ['OPEN', 'CLOSED']
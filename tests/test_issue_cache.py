@@ -0,0 +1,93 @@
+from zezployee.github_client import GitHubClient
+from zezployee.issue_cache import IssueCache
+
+
+def raw_issue(number, updated_at, state='open', **fields):
+    return dict({
+        'number': number,
+        'title': f"Issue {number}",
+        'body': '',
+        'state': state,
+        'labels': [],
+        'assignee': None,
+        'created_at': '2026-01-01T00:00:00Z',
+        'updated_at': updated_at,
+        'html_url': f"https://github.com/o/r/issues/{number}"
+    }, **fields)
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, issues=(), headers=None):
+        self.status_code = status_code
+        self.issues = list(issues)
+        self.headers = headers or {}
+        self.links = {}
+
+    def json(self):
+        return self.issues
+
+    def raise_for_status(self):
+        assert self.status_code < 400
+
+
+class FakeTransport:
+    """Answers GETs with queued responses and records what was asked"""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = []
+
+    def get(self, url, params=None, headers=None):
+        self.calls.append({'url': url, 'params': params, 'headers': headers or {}})
+        return self.responses.pop(0)
+
+
+def make_client(transport):
+    client = GitHubClient.__new__(GitHubClient)
+    client.backend = 'rest'
+    client.repo = {'full_name': 'o/r'}
+    client.transport = transport
+    return client
+
+
+def test_apply_advances_the_high_water_mark(tmp_path):
+    cache = IssueCache(tmp_path / 'issues.sqlite3')
+    cache.apply([raw_issue(1, '2026-02-01T00:00:00Z'), raw_issue(2, '2026-03-01T00:00:00Z')])
+    assert cache.get_meta('since') == '2026-03-01T00:00:00Z'
+
+    # An older update never moves the mark back
+    cache.apply([raw_issue(1, '2026-02-15T00:00:00Z')])
+    assert cache.get_meta('since') == '2026-03-01T00:00:00Z'
+    assert [issue['number'] for issue in cache.open_issues()] == [2, 1]
+
+
+def test_closed_issues_and_pull_requests_drop_out(tmp_path):
+    cache = IssueCache(tmp_path / 'issues.sqlite3')
+    cache.apply([raw_issue(1, '2026-02-01T00:00:00Z'), raw_issue(2, '2026-02-01T00:00:00Z')])
+    cache.apply([
+        raw_issue(1, '2026-03-01T00:00:00Z', state='closed'),
+        raw_issue(3, '2026-03-01T00:00:00Z', pull_request={'url': 'x'})
+    ])
+    assert [issue['number'] for issue in cache.open_issues()] == [2]
+
+
+def test_unchanged_repository_is_answered_by_a_304(tmp_path):
+    cache = IssueCache(tmp_path / 'issues.sqlite3')
+    since = '2026-03-01T00:00:00Z'
+    transport = FakeTransport(
+        FakeResponse(issues=[raw_issue(1, since)]),
+        FakeResponse(issues=[raw_issue(1, since)], headers={'ETag': '"v1"'}),
+        FakeResponse(status_code=304)
+    )
+    client = make_client(transport)
+
+    client._sync_issue_cache(cache)
+    client._sync_issue_cache(cache)
+    client._sync_issue_cache(cache)
+
+    first, second, third = transport.calls
+    assert first['params']['state'] == 'open'
+    assert second['params']['since'] == since and second['params']['state'] == 'all'
+    assert 'If-None-Match' not in second['headers']
+    assert third['headers']['If-None-Match'] == '"v1"'
+    assert [issue['number'] for issue in cache.open_issues()] == [1]
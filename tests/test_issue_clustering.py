@@ -0,0 +1,45 @@
+from click.testing import CliRunner
+
+from zezployee.cli import main
+from zezployee.issue_clustering import cluster_duplicates, covered_issues, group_issues
+
+
+def issue(number, title, body):
+    return {'number': number, 'title': title, 'body': body, 'labels': []}
+
+
+CRASH = ("The app crashes on startup when the config file is missing. Steps: delete config.toml, "
+         "run the app, see the traceback from the settings loader about a missing file.")
+
+
+def test_near_duplicates_fold_into_the_oldest_issue():
+    issues = [
+        issue(7, 'Crash on startup without config', CRASH + ' Seen on 1.2.'),
+        issue(3, 'Crash on startup without config', CRASH),
+        issue(5, 'Dark mode colours are wrong', 'Buttons in dark mode use the light palette for borders.'),
+    ]
+    grouped = cluster_duplicates(issues)
+
+    assert [item['number'] for item in grouped] == [3, 5]
+    primary = grouped[0]
+    assert [item['number'] for item in primary['duplicates']] == [7]
+    assert [item['number'] for item in covered_issues(primary)] == [3, 7]
+    assert 'duplicates' not in grouped[1]
+
+
+def test_distinct_issues_stay_apart():
+    issues = [issue(number, f"Problem {number}", f"Unrelated report number {number} about area {number * 7}")
+              for number in range(1, 30)]
+    assert len(cluster_duplicates(issues)) == len(issues)
+
+
+def test_grouping_can_be_turned_off():
+    issues = [issue(1, 'Same', CRASH), issue(2, 'Same', CRASH)]
+    assert [item['number'] for item in group_issues(issues, threshold=None)] == [1, 2]
+    assert [item['number'] for item in group_issues(issues)] == [1]
+
+
+def test_batch_area_needs_the_repository_index():
+    result = CliRunner().invoke(main, ['--batch-area', '3', '--context-tokens', '0'])
+    assert result.exit_code == 2
+    assert '--batch-area needs the repository index' in result.output
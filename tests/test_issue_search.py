@@ -0,0 +1,72 @@
+from datetime import datetime, timedelta, timezone
+
+from zezployee.issue_search import IssueIndex
+from zezployee.issue_selector import _View, _parse_rows
+
+NOW = datetime(2026, 6, 1, tzinfo=timezone.utc)
+
+
+def make_issue(number, title, labels=(), assignee=None, days_old=0):
+    return {'number': number, 'title': title, 'body': f"Details for {number}", 'labels': list(labels),
+            'assignee': assignee, 'created_at': NOW - timedelta(days=days_old)}
+
+
+ISSUES = [
+    make_issue(5, 'Memory leak in the parser', ['bug'], 'alice', days_old=2),
+    make_issue(4, 'Parser rejects unicode names', ['bug']),
+    make_issue(3, 'Document the memory settings', ['docs'], days_old=40),
+    make_issue(2, 'Speed up startup', ['performance'], 'bob', days_old=400),
+    make_issue(1, 'Leaking file handles', ['bug'], days_old=10),
+]
+
+
+def numbers(index, positions):
+    return [index.issues[position]['number'] for position in positions]
+
+
+def test_results_follow_the_query_as_it_is_typed():
+    view = _View(IssueIndex(ISSUES, now=NOW), page_size=10)
+    assert numbers(view.index, view.matches) == [5, 4, 3, 2, 1]
+
+    for query, expected in [('me', [5, 4, 3, 2, 1]), ('mem', [5, 3]), ('memory le', [5]),
+                            ('memory', [5, 3]), ('memory leek', [5])]:
+        view.search(query)
+        assert numbers(view.index, view.matches) == expected, query
+
+
+def test_filters_narrow_the_text_match():
+    index = IssueIndex(ISSUES, now=NOW)
+    assert numbers(index, index.search('label:bug')) == [5, 4, 1]
+    assert numbers(index, index.search('parser label:bug')) == [5, 4]
+    assert numbers(index, index.search('assignee:@alice')) == [5]
+    assert numbers(index, index.search('age:week')) == [5]
+    assert numbers(index, index.search('age:year label:performance')) == []
+    assert index.facets() == (['bug', 'docs', 'performance'], ['alice', 'bob'])
+
+
+def test_paging_through_matches():
+    issues = [make_issue(number, f"Flaky test {number}") for number in range(25, 0, -1)]
+    view = _View(IssueIndex(issues, now=NOW), page_size=10)
+    view.search('flaky')
+
+    assert view.page() == range(0, 10)
+    view.move(view.page_size)
+    assert view.page() == range(10, 20) and view.current() == 10
+    view.move(view.page_size)
+    assert view.page() == range(20, 25)
+    view.move(view.page_size)
+    assert view.cursor == 24
+    view.move(-100)
+    assert view.cursor == 0
+
+
+def test_multi_select_toggles_rows():
+    view = _View(IssueIndex(ISSUES, now=NOW), page_size=10)
+    view.toggle([0, 2])
+    view.toggle([2])
+    assert view.chosen == {0}
+    view.toggle(range(len(view.matches)))
+    assert view.chosen == {0, 1, 2, 3, 4}
+    view.toggle(range(len(view.matches)))
+    assert view.chosen == set()
+    assert _parse_rows('2-4, 7 3') == [2, 3, 4, 7]
@@ -0,0 +1,80 @@
+import sqlite3
+from types import SimpleNamespace
+
+from zezployee import job_queue
+from zezployee.job_queue import JobQueue, QUEUED, SOLVING, COMMITTED, PUSHED, PR_OPENED, RETRY_BACKOFF
+
+
+def issue(number):
+    return {'number': number, 'title': f"Issue {number}", 'body': '', 'labels': []}
+
+
+def test_restart_picks_up_jobs_that_were_in_flight(tmp_path):
+    path = tmp_path / 'jobs.sqlite3'
+    queue = JobQueue(path)
+    for number in (1, 2, 3, 4, 5):
+        queue.enqueue(issue(number))
+    queue.advance(1, SOLVING, attempts=1)
+    queue.advance(2, COMMITTED, changes='- app.py (+1/-0)', session_id='session-2')
+    queue.advance(3, PUSHED)
+    queue.advance(4, PR_OPENED, pr_url='https://github.com/o/r/pull/4')
+    queue.close()
+
+    # A new process opens the same queue after the first one died
+    queue = JobQueue(path)
+    assert queue.recover() == 1
+    assert queue.get(1)['stage'] == QUEUED and queue.get(1)['attempts'] == 1
+    assert queue.get(2)['session_id'] == 'session-2'
+
+    # Nearly done jobs come first; opened pull requests are finished
+    assert [job['number'] for job in queue.runnable(10)] == [3, 2, 1, 5]
+    assert [job['number'] for job in queue.runnable(10, exclude=[3])] == [2, 1, 5]
+    queue.close()
+
+
+def test_enqueue_keeps_an_existing_job(tmp_path):
+    queue = JobQueue(tmp_path / 'jobs.sqlite3')
+    assert queue.enqueue(issue(1))
+    queue.advance(1, COMMITTED)
+    assert not queue.enqueue(issue(1))
+    assert queue.get(1)['stage'] == COMMITTED
+    queue.close()
+
+
+def test_failed_tries_back_off_per_stage(tmp_path, monkeypatch):
+    clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(job_queue, 'time', SimpleNamespace(time=lambda: clock.now))
+    queue = JobQueue(tmp_path / 'jobs.sqlite3')
+    queue.enqueue(issue(1))
+    queue.advance(1, SOLVING, attempts=1)
+    queue.advance(1, COMMITTED)
+
+    assert queue.fail(1, COMMITTED, 'push timed out') == 1
+    assert queue.runnable(10) == []
+    clock.now += RETRY_BACKOFF
+    assert [job['number'] for job in queue.runnable(10)] == [1]
+
+    # The second failure in a row waits twice as long
+    assert queue.fail(1, COMMITTED, 'push timed out') == 2
+    clock.now += RETRY_BACKOFF
+    assert queue.runnable(10) == []
+    clock.now += RETRY_BACKOFF
+    assert queue.get(1)['stage'] == COMMITTED and queue.get(1)['attempts'] == 1
+
+    # Reaching the next stage starts the count over
+    queue.advance(1, PUSHED)
+    assert queue.get(1)['retries'] == 0
+    assert queue.fail(1, PUSHED, 'API down') == 1
+    queue.close()
+
+
+def test_queue_without_retries_column_is_upgraded(tmp_path):
+    path = tmp_path / 'jobs.sqlite3'
+    conn = sqlite3.connect(str(path))
+    conn.executescript(job_queue.SCHEMA.replace('    retries INTEGER NOT NULL DEFAULT 0,\n', ''))
+    conn.close()
+
+    queue = JobQueue(path)
+    queue.enqueue(issue(1))
+    assert queue.get(1)['retries'] == 0
+    queue.close()
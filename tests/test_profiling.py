@@ -0,0 +1,14 @@
+import asyncio
+
+from zezployee.profiling import profiler, in_thread
+
+
+def test_in_thread_counts_towards_the_callers_span():
+    async def solve():
+        with profiler.span('test_in_thread') as span:
+            await in_thread(profiler.count, 'subprocesses', 2)
+        return span
+
+    span = asyncio.run(solve())
+    assert span.counters == {'subprocesses': 2}
+
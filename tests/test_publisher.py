@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+
+from helpers import git, write
+from zezployee.git_workspace import GitWorkspace
+from zezployee.github_client import GitHubClient
+from zezployee.publisher import Publisher
+
+
+def test_push_branches_reports_only_the_rejected_ref(repo, tmp_path):
+    remote = tmp_path / 'remote.git'
+    git(tmp_path, 'init', '-q', '--bare', str(remote))
+    git(repo, 'remote', 'add', 'origin', str(remote))
+    for name in ('issue-1', 'issue-2', 'issue-3'):
+        git(repo, 'branch', name)
+
+    # The remote's issue-3 has a commit the local one lacks
+    git(repo, 'checkout', '-q', 'issue-3')
+    write(repo, {'other.txt': 'pushed elsewhere\n'})
+    git(repo, 'add', '-A')
+    git(repo, 'commit', '-q', '-m', 'elsewhere')
+    git(repo, 'push', '-q', 'origin', 'issue-3')
+    git(repo, 'reset', '-q', '--hard', 'HEAD~1')
+    git(repo, 'checkout', '-q', 'main')
+
+    client = GitHubClient.__new__(GitHubClient)
+    client.workspace = GitWorkspace(repo)
+    errors = client.push_branches(['issue-1', 'issue-2', 'issue-3'])
+
+    assert errors['issue-1'] is None and errors['issue-2'] is None
+    assert errors['issue-3'].startswith('Push rejected')
+    assert git(remote, 'branch', '--list', 'issue-1', 'issue-2') == 'issue-1\n  issue-2'
+
+
+class FakeClient:
+    def __init__(self, rejected):
+        self.rejected = rejected
+        self.pushes = []
+        self.closed = []
+
+    def push_branches(self, branch_names):
+        self.pushes.append(branch_names)
+        return {name: 'Push rejected: non-fast-forward' if name in self.rejected else None
+                for name in branch_names}
+
+    def open_pull_request(self, branch_name, issue, changes):
+        return f"https://github.com/o/r/pull/{issue['number']}"
+
+    def close_issue(self, number):
+        self.closed.append(number)
+
+
+def test_publisher_pushes_a_batch_and_publishes_the_rest_on_rejection():
+    client = FakeClient(rejected={'issue-2'})
+
+    async def publish():
+        async with Publisher(client, linger=1.0) as publisher:
+            futures = [publisher.submit({'number': number}, f"issue-{number}", '') for number in (1, 2, 3)]
+        return futures
+
+    first, second, third = asyncio.run(publish())
+    assert client.pushes == [['issue-1', 'issue-2', 'issue-3']]
+    assert first.result() == 'https://github.com/o/r/pull/1'
+    assert third.result() == 'https://github.com/o/r/pull/3'
+    with pytest.raises(RuntimeError, match='non-fast-forward'):
+        second.result()
+    assert sorted(client.closed) == [1, 3]
@@ -0,0 +1,46 @@
+from zezployee.git_workspace import GitWorkspace
+from zezployee.repo_index import RepoIndex
+
+from helpers import git, write
+
+
+def make_index(repo):
+    return RepoIndex(repo.parent / 'index.sqlite3', GitWorkspace(repo))
+
+
+def test_update_only_reindexes_changed_files(repo):
+    write(repo, {'app/models.py': 'class Invoice:\n    pass\n', 'app/views.py': 'def render_invoice():\n    pass\n'})
+    git(repo, 'add', '-A')
+    index = make_index(repo)
+    assert index.update() == (3, 0)
+    assert index.update() == (0, 0)
+
+    write(repo, {'app/views.py': 'def render_receipt():\n    pass\n'})
+    git(repo, 'rm', '-qf', 'app/models.py')
+    git(repo, 'add', '-A')
+    assert index.update() == (1, 1)
+    assert [path for path, _ in index.rank('receipt')] == ['app/views.py']
+    assert index.rank('invoice') == []
+
+
+def test_skipped_files_are_not_read_again(repo):
+    (repo / 'logo.png').write_bytes(b'\x89PNG\0\0binary')
+    write(repo, {'app.py': 'def logo():\n    pass\n'})
+    git(repo, 'add', '-A')
+    index = make_index(repo)
+    assert index.update() == (3, 0)
+    assert index.update() == (0, 0)
+    assert [path for path, _ in index.rank('logo')] == ['app.py']
+
+    git(repo, 'rm', '-qf', 'logo.png')
+    assert index.update() == (0, 1)
+
+
+def test_first_query_updates_the_index(repo):
+    updates = []
+    index = RepoIndex(repo.parent / 'index.sqlite3', GitWorkspace(repo),
+                      on_update=lambda indexed, removed: updates.append((indexed, removed)))
+    assert updates == []
+    assert [path for path, _ in index.rank('hello')] == ['README.md']
+    index.rank('hello')
+    assert updates == [(1, 0)]
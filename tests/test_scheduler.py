@@ -0,0 +1,91 @@
+import asyncio
+
+import pytest
+
+from zezployee import cli, issue_selector
+from zezployee.batch import BatchRunner
+from zezployee.scheduler import Scheduler, History, DEFAULT_COST_USD
+
+
+def make_issues(count):
+    return [{'number': number, 'title': f"Issue {number}", 'body': '', 'labels': []}
+            for number in range(1, count + 1)]
+
+
+def test_admit_reserves_the_estimate_until_charged():
+    scheduler = Scheduler(History(), budget_usd=2 * DEFAULT_COST_USD, concurrency=3)
+    first, second, third = issues = make_issues(3)
+    scheduler.plan(issues)
+
+    assert scheduler.admit(first)
+    assert scheduler.admit(second)
+    assert not scheduler.admit(third)
+
+    scheduler.charge(first, 0.0)
+    assert scheduler.admit(third)
+    assert scheduler.reserved_usd == {2: DEFAULT_COST_USD, 3: DEFAULT_COST_USD}
+
+
+class FakeGitHub:
+    def _configure_git_auth(self):
+        pass
+
+    def _commit_changes(self, issue, path, touched):
+        return False
+
+
+class FakePool:
+    def start(self):
+        pass
+
+    def close(self):
+        pass
+
+    def acquire(self, branch_name):
+        return branch_name
+
+    def release(self, path):
+        pass
+
+
+class FakeClaude:
+    def __init__(self):
+        self.solved = []
+
+    async def solve_issue_async(self, issue, cwd=None, max_turns=None):
+        self.solved.append(issue['number'])
+        await asyncio.sleep(0.01)
+        return {'success': True, 'cost_usd': DEFAULT_COST_USD, 'turns': 1, 'touched': []}
+
+
+def test_concurrent_batch_stays_within_budget():
+    scheduler = Scheduler(History(), budget_usd=2 * DEFAULT_COST_USD, concurrency=4)
+    issues = make_issues(4)
+    scheduler.plan(issues)
+    claude = FakeClaude()
+
+    results = BatchRunner(FakeGitHub(), claude, concurrency=4, pool=FakePool(), scheduler=scheduler).run(issues)
+
+    assert len(claude.solved) == 2
+    assert sum(result.get('cost_usd', 0) for result in results) <= 2 * DEFAULT_COST_USD
+    assert [result['error'] for result in results].count('Skipped: not enough budget left') == 2
+    assert scheduler.reserved_usd == {}
+
+
+def test_single_issue_over_budget_is_not_solved(monkeypatch):
+    issue = make_issues(1)[0]
+
+    class FakeSelector:
+        def select_issues(self, issues):
+            return [issue]
+
+    class Unleasable(FakePool):
+        def lease(self, branch_name):
+            raise AssertionError('an issue over budget got a worktree')
+
+    monkeypatch.setattr(issue_selector, 'IssueSelector', FakeSelector)
+    claude = FakeClaude()
+    scheduler = Scheduler(History(), budget_usd=DEFAULT_COST_USD / 2)
+    with pytest.raises(SystemExit):
+        cli._solve_selected(FakeGitHub(), claude, Unleasable(), [issue], 1, scheduler)
+    assert claude.solved == []
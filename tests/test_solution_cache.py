@@ -0,0 +1,43 @@
+from helpers import git, write
+from zezployee.claude_integration import ClaudeIntegration
+from zezployee.git_workspace import GitWorkspace
+from zezployee.solution_cache import SolutionCache
+
+ISSUE = {'number': 7, 'title': 'Add fix.py', 'body': '', 'labels': []}
+
+
+def make_claude(repo, tmp_path):
+    return ClaudeIntegration(on_event=lambda event, data: None, transcript_dir=tmp_path / 'transcripts',
+                             workspace=GitWorkspace(repo), solution_cache=SolutionCache(tmp_path / 'solutions.sqlite3'))
+
+
+def solve_once(claude, repo, prompt):
+    """Look the prompt up and, on a miss, store a made-up solution"""
+    key, cached = claude._cached_solution(ISSUE, prompt, repo)
+    assert cached is None
+    write(repo, {'fix.py': 'fixed = True\n'})
+    claude._store_solution(key, {'touched': ['fix.py'], 'output': 'Added fix.py', 'session_id': 'session-1',
+                                 'cost_usd': 0.5, 'turns': 3}, repo)
+    git(repo, 'reset', '-q', '--hard')
+
+
+def test_same_prompt_and_tree_reuse_the_solution(repo, tmp_path):
+    claude = make_claude(repo, tmp_path)
+    solve_once(claude, repo, 'Fix issue 7')
+
+    _, cached = claude._cached_solution(ISSUE, 'Fix issue 7', repo)
+    assert cached['cached'] and cached['cost_usd'] == 0
+    assert cached['touched'] == ['fix.py'] and cached['output'] == 'Added fix.py'
+    assert (repo / 'fix.py').read_text() == 'fixed = True\n'
+
+
+def test_changed_tree_or_prompt_misses(repo, tmp_path):
+    claude = make_claude(repo, tmp_path)
+    solve_once(claude, repo, 'Fix issue 7')
+
+    assert claude._cached_solution(ISSUE, 'Fix issue 7, now with tests', repo)[1] is None
+
+    write(repo, {'README.md': 'moved on\n'})
+    git(repo, 'commit', '-q', '-am', 'move on')
+    assert claude._cached_solution(ISSUE, 'Fix issue 7', repo)[1] is None
+    assert not (repo / 'fix.py').exists()
@@ -0,0 +1,27 @@
+from zezployee.transcript_store import TranscriptStore
+
+
+def record(store, issue, session_id, text):
+    with store.session(issue=issue) as writer:
+        writer.write({'type': 'text', 'text': text})
+        writer.finish(session_id=session_id, success=True)
+
+
+def test_find_by_issue_and_session(tmp_path):
+    store = TranscriptStore(tmp_path / 'transcripts')
+    record(store, 1, 'a', 'first')
+    record(store, 2, 'b', 'second')
+    record(store, 1, 'c', 'third')
+
+    assert [entry['issue'] for entry in store.find()] == [1, 2, 1]
+    assert [list(store.messages(entry))[0]['text'] for entry in store.find(issue=1)] == ['first', 'third']
+    assert [list(store.messages(entry))[0]['text'] for entry in store.find(session_id='b')] == ['second']
+    assert store.find(issue=1, session_id='b') == []
+
+
+def test_find_ignores_a_torn_record(tmp_path):
+    store = TranscriptStore(tmp_path / 'transcripts')
+    record(store, 1, 'a', 'first')
+    with open(store.index_path, 'ab') as index:
+        index.write(b'\x02\x00\x00')
+    assert [entry['issue'] for entry in store.find()] == [1]
@@ -0,0 +1,98 @@
+from types import SimpleNamespace
+
+import pytest
+
+from zezployee import transport
+from zezployee.transport import GitHubTransport, RateLimiter
+
+
+class Clock:
+    """Stands in for the time module; sleeping just moves the clock on"""
+
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(transport, 'time', clock)
+    return clock
+
+
+def limit_headers(clock, remaining, reset_in):
+    return {'X-RateLimit-Remaining': str(remaining), 'X-RateLimit-Reset': str(clock.now + reset_in)}
+
+
+def test_quota_is_spread_until_the_reset(tmp_path, clock):
+    limiter = RateLimiter(tmp_path / 'ratelimit.json', burst=5, safety_margin=10)
+    # 100 usable requests over 50 seconds: two per second
+    limiter.update('core', limit_headers(clock, 110, 50))
+
+    assert [limiter.acquire('core') for _ in range(5)] == [0] * 5
+    assert limiter.acquire('core') == pytest.approx(0.5)
+
+    clock.sleep(2)
+    assert [limiter.acquire('core') for _ in range(4)] == [0] * 4
+    assert limiter.remaining('core') == 110
+
+
+def test_exhausted_quota_waits_for_the_reset(tmp_path, clock):
+    limiter = RateLimiter(tmp_path / 'ratelimit.json', burst=5, safety_margin=10)
+    limiter.update('core', limit_headers(clock, 10, 30))
+    assert limiter.acquire('core') == pytest.approx(30)
+
+
+def test_block_holds_every_request_back(tmp_path, clock):
+    limiter = RateLimiter(tmp_path / 'ratelimit.json')
+    limiter.update('core', limit_headers(clock, 5000, 3600))
+    limiter.block('core', 60)
+    assert limiter.acquire('core') == pytest.approx(60)
+    # Other resources have their own bucket
+    assert limiter.acquire('search') == 0
+
+
+def test_no_headers_means_no_pacing(tmp_path, clock):
+    limiter = RateLimiter(tmp_path / 'ratelimit.json', burst=5)
+    limiter.update('core', {})
+    assert sum(limiter.acquire('core') for _ in range(500)) == 0
+
+    # Pacing comes back once the server reports a limit
+    limiter.update('core', limit_headers(clock, 0, 30))
+    assert limiter.acquire('core') == pytest.approx(30)
+
+
+def response(status_code, headers=None, text=''):
+    return SimpleNamespace(status_code=status_code, headers=headers or {}, text=text)
+
+
+def test_rate_limit_wait(tmp_path, clock):
+    github = GitHubTransport('token', 'https://api.github.com', tmp_path / 'ratelimit.json')
+    assert github._rate_limit_wait(response(200)) is None
+    assert github._rate_limit_wait(response(403, {'Retry-After': '7'})) == 7
+    assert github._rate_limit_wait(response(403, limit_headers(clock, 0, 120))) == pytest.approx(120)
+    assert github._rate_limit_wait(response(403, text='You have exceeded a secondary rate limit')) == 60
+    assert github._rate_limit_wait(response(429)) == 60
+    assert github._rate_limit_wait(response(403, text='Resource not accessible by integration')) is None
+
+
+def test_request_backs_off_after_retry_after(tmp_path, clock):
+    github = GitHubTransport('token', 'https://api.github.com', tmp_path / 'ratelimit.json')
+    replies = [response(429, {'Retry-After': '30'}), response(200, limit_headers(clock, 4000, 3600))]
+    sent = []
+
+    def send(method, url, **kwargs):
+        sent.append((method, url, clock.now))
+        return replies.pop(0)
+
+    github.session = SimpleNamespace(request=send)
+    started = clock.now
+    assert github.get('/rate_limit').status_code == 200
+    assert [url for _, url, _ in sent] == ['https://api.github.com/rate_limit'] * 2
+    assert sent[1][2] - started == pytest.approx(30)
@@ -0,0 +1,59 @@
+from helpers import git, write
+from zezployee.git_workspace import GitWorkspace
+from zezployee.verification import Verifier, parse_imports
+
+
+def test_parse_imports():
+    source = '\n'.join([
+        'import os, pkg.core as core',
+        'from pkg.util import (twice,  # doubles',
+        '    thrice as three,',
+        ')',
+        'from . import sibling',
+        'from ..base import Thing',
+        'from pkg import *',
+        '    import lazy  # inside a function',
+    ])
+    assert parse_imports(source) == [
+        'os', 'pkg.core', 'pkg.util.twice', 'pkg.util.thrice', '.sibling', '..base.Thing', 'pkg', 'lazy'
+    ]
+
+
+def make_map(repo):
+    write(repo, {
+        'pkg/__init__.py': '',
+        'pkg/core.py': 'def add(a, b):\n    return a + b\n',
+        'pkg/util.py': 'from .core import add\n',
+        'pkg/sub/__init__.py': '',
+        'pkg/sub/deep.py': 'from ..util import add\n',
+        'pkg/other.py': 'X = 1\n',
+        'tests/conftest.py': '',
+        'tests/test_util.py': 'from pkg.util import add\n',
+        'tests/test_deep.py': 'from pkg.sub import deep\n',
+        'tests/test_other.py': 'import pkg.other\n',
+    })
+    git(repo, 'add', '-A')
+    git(repo, 'commit', '-q', '-m', 'project')
+    workspace = GitWorkspace(repo)
+    return Verifier(repo.parent / 'verification.sqlite3', workspace).import_map, workspace
+
+
+def test_affected_tests_follow_imports_transitively(repo):
+    import_map, workspace = make_map(repo)
+    assert import_map.affected_tests(workspace, ['pkg/core.py']) == [
+        'tests/test_deep.py', 'tests/test_util.py'
+    ]
+    assert import_map.affected_tests(workspace, ['pkg/other.py']) == ['tests/test_other.py']
+    assert import_map.affected_tests(workspace, ['tests/test_other.py']) == ['tests/test_other.py']
+
+
+def test_docs_only_change_affects_no_tests(repo):
+    import_map, workspace = make_map(repo)
+    assert import_map.affected_tests(workspace, ['README.md', 'docs/index.html']) == []
+
+
+def test_conftest_and_non_python_changes_run_everything(repo):
+    import_map, workspace = make_map(repo)
+    assert import_map.affected_tests(workspace, ['tests/conftest.py']) is None
+    assert import_map.affected_tests(workspace, ['requirements.txt']) is None
+    assert import_map.affected_tests(workspace, ['pkg/core.py', 'setup.cfg']) is None
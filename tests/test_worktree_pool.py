@@ -0,0 +1,57 @@
+from helpers import git, write
+from zezployee.git_workspace import GitWorkspace
+from zezployee.worktree_pool import WorktreePool, non_interactive_env
+
+
+def make_pool(repo, size=1):
+    pool = WorktreePool(GitWorkspace(repo), repo / '.git' / 'pool', size, fetch_interval=3600)
+    pool.start()
+    return pool
+
+
+def test_same_issue_can_be_acquired_again(repo):
+    pool = make_pool(repo)
+    try:
+        base = git(repo, 'rev-parse', 'HEAD')
+        with pool.lease('issue-1') as path:
+            write(path, {'fix.py': 'x = 1\n'})
+            git(path, 'add', '-A')
+            git(path, 'commit', '-q', '-m', 'fix')
+
+        # The branch from the first run still exists; a re-run starts it over
+        with pool.lease('issue-1') as path:
+            assert git(path, 'rev-parse', '--abbrev-ref', 'HEAD') == 'issue-1'
+            assert git(path, 'rev-parse', 'HEAD') == base
+            assert not (path / 'fix.py').exists()
+    finally:
+        pool.close()
+
+
+def test_released_slot_is_recycled(repo):
+    pool = make_pool(repo)
+    try:
+        with pool.lease('issue-1') as path:
+            write(path, {'scratch.txt': 'left behind\n', 'README.md': 'changed\n'})
+        with pool.lease('issue-2') as path:
+            assert not (path / 'scratch.txt').exists()
+            assert (path / 'README.md').read_text() == 'hello\n'
+    finally:
+        pool.close()
+
+
+def test_grown_pool_leases_more_slots_at_once(repo):
+    pool = make_pool(repo)
+    try:
+        pool.grow(2)
+        with pool.lease('issue-1') as first, pool.lease('issue-2') as second:
+            assert first != second
+            assert git(second, 'rev-parse', '--abbrev-ref', 'HEAD') == 'issue-2'
+    finally:
+        pool.close()
+
+
+def test_background_git_never_prompts(monkeypatch):
+    monkeypatch.setenv('GIT_SSH_COMMAND', 'ssh -i ~/.ssh/deploy')
+    env = non_interactive_env()
+    assert env['GIT_TERMINAL_PROMPT'] == '0'
+    assert env['GIT_SSH_COMMAND'] == 'ssh -i ~/.ssh/deploy -o BatchMode=yes'
@@ -0,0 +1,103 @@
+"""Concurrent solving of several issues in pooled git worktrees"""
+
+import asyncio
+from typing import List, Dict, Any, Optional
+
+from .paths import state_dir
+from .profiling import profiler, in_thread
+from .publisher import Publisher
+from .scheduler import Scheduler
+from .worktree_pool import WorktreePool
+
+
+class BatchRunner:
+    def __init__(self, github_client, claude_integration, concurrency: int = 4,
+                 pool: Optional[WorktreePool] = None, publish_concurrency: int = 8,
+                 scheduler: Optional[Scheduler] = None):
+        if concurrency < 1:
+            raise ValueError("Concurrency must be at least 1")
+        self.github_client = github_client
+        self.claude_integration = claude_integration
+        self.concurrency = concurrency
+        self.pool = pool or WorktreePool(github_client.workspace, state_dir() / 'pool', concurrency)
+        self.publish_concurrency = publish_concurrency
+        self.scheduler = scheduler
+
+    def run(self, issues: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Solve all issues concurrently and return one result per issue"""
+        return asyncio.run(self.run_async(issues))
+
+    async def run_async(self, issues: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Solve all issues on the running event loop
+
+        With a scheduler, issues are started in its order with its turn
+        budgets, and those not fitting the remaining budget are skipped.
+        """
+        # Rewrite the remote once up front instead of racing on it per issue,
+        # and before the pool starts fetching through it
+        await in_thread(self.github_client._configure_git_auth)
+        await in_thread(self.pool.start)
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        try:
+            async with Publisher(self.github_client, concurrency=self.publish_concurrency) as publisher:
+                return await asyncio.gather(*(self._solve_one(issue, semaphore, publisher) for issue in issues))
+        finally:
+            await in_thread(self.pool.close)
+
+    async def _solve_one(self, issue: Dict[str, Any], semaphore: asyncio.Semaphore,
+                         publisher: Publisher) -> Dict[str, Any]:
+        """Run the branch/solve/commit pipeline for one issue and publish it, never raising
+
+        The semaphore is released once the branch is committed, so the next
+        Claude session starts while this one is being pushed.
+        """
+        branch_name = f"issue-{issue['number']}"
+        result = {'number': issue['number'], 'title': issue['title'], 'branch': branch_name}
+        published = None
+
+        async with semaphore:
+            if self.scheduler and not self.scheduler.admit(issue):
+                result.update(success=False, error='Skipped: not enough budget left')
+                return result
+
+            with profiler.span('issue', issue=f"#{issue['number']}"):
+                path = None
+                cost_usd = 0
+                try:
+                    path = await in_thread(self.pool.acquire, branch_name)
+
+                    claude_result = await self.claude_integration.solve_issue_async(
+                        issue, cwd=path, max_turns=self.scheduler.max_turns_for(issue) if self.scheduler else None
+                    )
+                    cost_usd = claude_result.get('cost_usd', 0)
+                    result['cost_usd'] = cost_usd
+                    result['turns'] = claude_result.get('turns', 0)
+                    if not claude_result['success']:
+                        result.update(success=False, error=claude_result['error'])
+                        return result
+
+                    committed = await in_thread(self.github_client._commit_changes, issue, path,
+                                                      claude_result.get('touched'))
+                    if not committed:
+                        result.update(success=False, error='Claude made no changes')
+                        return result
+
+                    published = publisher.submit(issue, branch_name, claude_result['changes'])
+
+                except Exception as e:
+                    result.update(success=False, error=str(e))
+                finally:
+                    if self.scheduler:
+                        # Settles the reservation admit() made, whether or not the issue got solved
+                        self.scheduler.charge(issue, cost_usd)
+                    if path:
+                        self.pool.release(path)
+
+        if published is None:
+            return result
+        try:
+            result.update(success=True, pr_url=await published)
+        except Exception as e:
+            result.update(success=False, error=str(e))
+        return result
@@ -1,24 +1,234 @@
 """Claude Code integration for solving GitHub issues"""
 
 import asyncio
+import dataclasses
+import re
+import shlex
 import subprocess
+import uuid
 from pathlib import Path
-from typing import Dict, Any, List
-from claude_code_sdk import query, ClaudeCodeOptions, Message, ResultMessage, SystemMessage, AssistantMessage, UserMessage
+from typing import Dict, Any, Iterable, List, Optional, Callable, Set, Tuple, TYPE_CHECKING
+
+from .git_workspace import GitWorkspace
+from .profiling import profiler, in_thread
+from .transcript_store import TranscriptStore
+
+if TYPE_CHECKING:
+    from claude_code_sdk import Message
+    from .repo_index import RepoIndex
+    from .solution_cache import SolutionCache
+    from .verification import Verifier
+
+
+ProgressCallback = Callable[[str, Dict[str, Any]], None]
+
+
+def print_progress(event: str, data: Dict[str, Any]) -> None:
+    """Default progress callback: describe session events on stdout
+
+    Individual messages are not printed; the live dashboard in
+    `progress` shows them on a terminal.
+    """
+    if event == 'started':
+        print(f"🤖 Starting Claude Code with prompt: {data['prompt'][:100]}...")
+    elif event == 'finished':
+        print(f"📊 Total messages received: {data['message_count']}")
+    elif event == 'cache_hit':
+        print(f"♻️  Reusing cached solution for issue #{data['number']} "
+              f"(saved ${data['cost_usd']:.4f}, {data['turns']} turns)")
+    elif event == 'verified':
+        if data['passed']:
+            selected = 'all tests' if data['tests'] is None else f"{len(data['tests'])} affected test files"
+            print(f"🧪 Issue #{data['number']}: {selected} pass{' (cached)' if data['cached'] else ''}")
+        elif data['round']:
+            print(f"🧪 Issue #{data['number']}: tests fail, asking Claude to fix them "
+                  f"(round {data['round']}/{data['rounds']})")
+        else:
+            print(f"🧪 Issue #{data['number']}: tests fail")
+    elif event == 'retrying':
+        action = f"Resuming session {data['session_id']}" if data['session_id'] else "Restarting"
+        print(f"🔁 {action} (attempt {data['attempt']}/{data['max_attempts']}) after: {data['error']}")
+
+
+# Result subtypes a resumed session can recover from
+RESUMABLE_SUBTYPES = ('error_max_turns', 'error_during_execution')
+
+CONTINUE_PROMPT = """You ran out of turns or were interrupted before finishing.
+Continue working on the issue from where you left off, and provide a summary
+of the changes made when you're done.
+"""
+
+FIX_PROMPT = """The project's tests fail with your changes. Fix the code so that they pass,
+without deleting or weakening tests, and provide a summary of all the changes
+made when you're done.
+
+Tests run with `{command}`:
+
+```
+{output}
+```
+"""
+
+# Tools whose file_path (or notebook_path) input is the only file they change
+EDIT_TOOLS = ('Write', 'Edit', 'MultiEdit', 'NotebookEdit')
+
+# Tools that never change the checkout; any other tool, such as Bash, may
+# change any file
+READ_ONLY_TOOLS = ('Read', 'Glob', 'Grep', 'LS', 'NotebookRead', 'WebFetch', 'WebSearch', 'TodoRead', 'TodoWrite')
+
+# Bash commands that only look around, so running them keeps the edit
+# tracking. Test runs are not among them: they may rewrite tracked files
+READ_ONLY_COMMANDS = ('cd', 'ls', 'pwd', 'cat', 'head', 'tail', 'wc', 'grep', 'rg', 'stat', 'echo')
+READ_ONLY_GIT_COMMANDS = ('status', 'diff', 'log', 'show', 'grep', 'ls-files', 'blame')
+
+# Options that make one of the commands above write files or run other
+# programs, as (long option names, short option letters). Git accepts
+# unambiguous abbreviations of most long options, so any prefix counts
+UNSAFE_OPTIONS = {
+    'rg': (('pre',), ''),
+    'git grep': (('open-files-in-pager',), 'O'),
+    'git diff': (('output',), ''),
+    'git log': (('output',), ''),
+    'git show': (('output',), ''),
+}
+
+# Shell syntax that writes files or runs commands the words above do not
+# show: redirections and process substitution, command substitution and a
+# lone & starting a background command
+SHELL_WRITES = re.compile(r'[<>`]|\$\(|(?<!&)&(?!&)')
+SHELL_SEPARATORS = re.compile(r'&&|\|\||[|;\n]')
+
+# Lines of test output quoted in the error when the tests still fail
+FAILURE_LINES = 20
+
+
+def is_read_only_command(command: str) -> bool:
+    """Whether a shell command line only runs commands that cannot change files"""
+    if not command.strip() or SHELL_WRITES.search(command):
+        return False
+    for segment in SHELL_SEPARATORS.split(command):
+        try:
+            words = shlex.split(segment)
+        except ValueError:
+            return False
+        if not words:
+            continue
+        if words[0] == 'git':
+            arguments = [word for word in words[1:] if word != '--no-pager']
+            if not arguments or arguments[0] not in READ_ONLY_GIT_COMMANDS:
+                return False
+            name, arguments = f"git {arguments[0]}", arguments[1:]
+        elif words[0] in READ_ONLY_COMMANDS:
+            name, arguments = words[0], words[1:]
+        else:
+            return False
+        if name in UNSAFE_OPTIONS and _has_option(arguments, *UNSAFE_OPTIONS[name]):
+            return False
+    return True
+
+
+def _has_option(arguments: List[str], long_names: Tuple[str, ...], short_letters: str) -> bool:
+    """Whether arguments use one of the options, spelled out, abbreviated or among bundled short ones"""
+    for argument in arguments:
+        if argument == '--':
+            break
+        if argument.startswith('--'):
+            given = argument[2:].split('=', 1)[0]
+            if given and any(name.startswith(given) for name in long_names):
+                return True
+        elif argument.startswith('-') and any(letter in argument[1:] for letter in short_letters):
+            return True
+    return False
+
+
+class RetryPolicy:
+    """Limits for continuing a session that stopped before finishing
+
+    Sessions that hit the turn limit are resumed with their session_id and
+    extra turns; transient SDK failures are retried with exponential backoff.
+    """
+    
+    def __init__(self, max_attempts: int = 3, initial_turns: int = 10, extra_turns: int = 10,
+                 max_total_turns: int = 40, max_cost_usd: float = 5.0,
+                 backoff_seconds: float = 2.0, max_backoff_seconds: float = 60.0):
+        self.max_attempts = max_attempts
+        self.initial_turns = initial_turns
+        self.extra_turns = extra_turns
+        self.max_total_turns = max_total_turns
+        self.max_cost_usd = max_cost_usd
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+    
+    def backoff(self, attempt: int) -> float:
+        """Seconds to wait before the given (1-based) retry attempt"""
+        return min(self.max_backoff_seconds, self.backoff_seconds * 2 ** (attempt - 2))
 
 
 class ClaudeIntegration:
-    def __init__(self):
-        pass
+    def __init__(self, on_event: Optional[ProgressCallback] = None,
+                 transcript_dir: Optional[Path] = None,
+                 workspace: Optional[GitWorkspace] = None,
+                 context_index: Optional['RepoIndex'] = None,
+                 context_tokens: int = 2000,
+                 retry_policy: Optional[RetryPolicy] = None,
+                 solution_cache: Optional['SolutionCache'] = None,
+                 verifier: Optional['Verifier'] = None,
+                 verify_rounds: int = 2):
+        self.on_event = on_event or print_progress
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.workspace = workspace or GitWorkspace()
+        self.transcript_dir = transcript_dir
+        self._transcript_stores: Dict[Path, TranscriptStore] = {}
+        self.context_index = context_index
+        self.context_tokens = context_tokens
+        self.solution_cache = solution_cache
+        self.verifier = verifier
+        self.verify_rounds = verify_rounds
     
-    def solve_issue(self, issue: Dict[str, Any]) -> Dict[str, Any]:
+    def solve_issue(self, issue: Dict[str, Any], cwd: Optional[Path] = None,
+                    max_turns: Optional[int] = None) -> Dict[str, Any]:
         """Execute Claude Code to solve the given issue"""
+        return asyncio.run(self.solve_issue_async(issue, cwd=cwd, max_turns=max_turns))
+    
+    async def solve_issue_async(self, issue: Dict[str, Any], cwd: Optional[Path] = None,
+                                max_turns: Optional[int] = None) -> Dict[str, Any]:
+        """Execute Claude Code to solve the given issue on the running event loop
+
+        max_turns overrides the retry policy's turns for the first session.
+        With a verifier, the changes must pass the tests they affect; failures
+        go back to the same session for up to verify_rounds more rounds.
+        """
         try:
-            # Create a prompt for Claude Code
-            prompt = self._create_prompt(issue)
+            # Create a prompt for Claude Code; ranking the context snippets
+            # may build the index first, so it runs off the event loop
+            prompt = await in_thread(self._create_prompt, issue)
+            
+            cache_key = cached = None
+            if self.solution_cache:
+                cache_key, cached = await in_thread(self._cached_solution, issue, prompt, cwd)
             
-            # Run Claude Code using the official SDK
-            return asyncio.run(self._run_claude_code(prompt))
+            # Summary fields recorded with each session's transcript
+            session = {
+                'issue': issue['number'],
+                'run': uuid.uuid4().hex,
+                'labels': issue['labels'],
+                'issue_chars': len(issue['title']) + len(issue['body'] or '')
+            }
+            
+            if cached:
+                result = cached
+            else:
+                # Run Claude Code using the official SDK
+                with profiler.span('solve_issue', issue=f"#{issue['number']}"):
+                    result = await self._run_with_retries(prompt, cwd=cwd, session=session, max_turns=max_turns)
+                    profiler.record(cost_usd=result.get('cost_usd', 0), turns=result.get('turns', 0))
+            
+            if result['success'] and self.verifier:
+                result = await self._verify(issue, result, cwd, session)
+            
+            if cache_key and result['success'] and not result.get('cached'):
+                await in_thread(self._store_solution, cache_key, result, cwd)
+            return result
                 
         except Exception as e:
             return {
@@ -26,121 +236,368 @@ class ClaudeIntegration:
                 'error': f'Failed to run Claude Code: {str(e)}'
             }
     
-    async def _run_claude_code(self, prompt: str) -> Dict[str, Any]:
-        """Run Claude Code using the official Python SDK"""
+    async def _verify(self, issue: Dict[str, Any], result: Dict[str, Any], cwd: Optional[Path],
+                      session: Dict[str, Any]) -> Dict[str, Any]:
+        """Test a successful run's changes, resuming its session with the failures until they pass"""
+        for attempt in range(1, self.verify_rounds + 2):
+            with profiler.span('verify', issue=f"#{issue['number']}"):
+                verification = await in_thread(self.verifier.verify, cwd, result.get('touched'))
+            fixing = not verification['passed'] and attempt <= self.verify_rounds and result.get('session_id')
+            self.on_event('verified', {
+                'number': issue['number'],
+                'passed': verification['passed'],
+                'tests': verification['tests'],
+                'cached': verification['cached'],
+                'round': attempt if fixing else None,
+                'rounds': self.verify_rounds
+            })
+            if verification['passed']:
+                return dict(result, verification=verification)
+            if not fixing:
+                break
+            
+            prompt = FIX_PROMPT.format(command=verification['command'], output=verification['output'].strip())
+            with profiler.span('fix_tests', issue=f"#{issue['number']}"):
+                fix = await self._run_with_retries(prompt, cwd=cwd, session=dict(session, fix_round=attempt),
+                                                   resume=result['session_id'], touched=result.get('touched'))
+                profiler.record(cost_usd=fix.get('cost_usd', 0), turns=fix.get('turns', 0))
+            fix['cost_usd'] = result.get('cost_usd', 0) + fix.get('cost_usd', 0)
+            fix['turns'] = result.get('turns', 0) + fix.get('turns', 0)
+            fix['session_id'] = fix.get('session_id') or result['session_id']
+            result = fix
+            if not result['success']:
+                return result
+        
+        failures = '\n'.join(verification['output'].strip().splitlines()[-FAILURE_LINES:])
+        return {
+            'success': False,
+            'error': f"Tests fail (`{verification['command']}`):\n{failures}",
+            'session_id': result.get('session_id'),
+            'cost_usd': result.get('cost_usd', 0),
+            'turns': result.get('turns', 0),
+            'transcript': result.get('transcript'),
+            'touched': result.get('touched'),
+            'verification': verification
+        }
+    
+    def _cached_solution(self, issue: Dict[str, Any], prompt: str,
+                         cwd: Optional[Path] = None) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        """Look the prompt up against the current tree, applying a hit to the checkout
+
+        Returns the cache key and, on a hit, a result shaped like a fresh run.
+        """
+        from .solution_cache import solution_key
+        
+        workspace = self.workspace.for_path(cwd)
+        key = solution_key(prompt, workspace.tree_hash())
+        cached = self.solution_cache.get(key)
+        if not cached:
+            return key, None
+        
         try:
-            messages: List[Message] = []
+            with profiler.span('apply_cached_solution', issue=f"#{issue['number']}"):
+                workspace.apply_patch(cached['patch'])
+        except subprocess.CalledProcessError:
+            # The same tree should always take the patch; drop the entry if not
+            self.solution_cache.discard(key)
+            return key, None
+        
+        self.on_event('cache_hit', {'number': issue['number'], 'cost_usd': cached['cost_usd'],
+                                    'turns': cached['turns']})
+        # The patch was applied to the index too, so the index says what it touched
+        touched = workspace.staged_paths()
+        return key, {
+            'success': True,
+            'cached': True,
+            'changes': self._get_git_changes(cwd, touched),
+            'touched': touched,
+            'output': cached['output'],
+            'session_id': cached['session_id'],
+            'cost_usd': 0,
+            'turns': 0,
+            'transcript': cached['transcript']
+        }
+    
+    def _store_solution(self, key: str, result: Dict[str, Any], cwd: Optional[Path] = None) -> None:
+        """Save a successful run's changes as a patch for later runs on the same tree"""
+        try:
+            patch = self.workspace.for_path(cwd).staged_patch(result.get('touched'))
+        except subprocess.CalledProcessError:
+            return
+        if not patch:
+            return
+        self.solution_cache.put(key, patch, {
+            'output': result.get('output', ''),
+            'session_id': result.get('session_id'),
+            'cost_usd': result.get('cost_usd', 0),
+            'turns': result.get('turns', 0),
+            'transcript': result.get('transcript')
+        })
+    
+    def transcript_store(self, cwd: Optional[Path] = None) -> TranscriptStore:
+        """Get the transcript store of the repository (shared by all its worktrees)"""
+        root = self.transcript_dir or self.workspace.for_path(cwd).state_dir / 'transcripts'
+        if root not in self._transcript_stores:
+            self._transcript_stores[root] = TranscriptStore(root)
+        return self._transcript_stores[root]
+    
+    async def _run_with_retries(self, prompt: str, cwd: Optional[Path] = None,
+                                session: Optional[Dict[str, Any]] = None,
+                                max_turns: Optional[int] = None,
+                                resume: Optional[str] = None,
+                                touched: Optional[Iterable[str]] = ()) -> Dict[str, Any]:
+        """Run Claude Code, resuming or retrying within the retry policy's caps
+
+        With resume, the prompt continues that session rather than starting one.
+        The result's `touched` adds the paths every session edited to the given
+        ones; it is None once any session may have changed other files.
+        """
+        policy = self.retry_policy
+        touched = set(touched) if touched is not None else None
+        total_cost = 0.0
+        total_turns = 0
+        session_id = resume
+        max_turns = min(max_turns or policy.initial_turns, policy.max_total_turns)
+        attempt = 1
+        
+        while True:
+            result = await self._run_claude_code(
+                CONTINUE_PROMPT if session_id and attempt > 1 else prompt, cwd=cwd,
+                session=dict(session or {}, attempt=attempt), resume=session_id, max_turns=max_turns
+            )
+            
+            total_cost += result.get('cost_usd', 0)
+            total_turns += result.get('turns', 0)
+            result['cost_usd'] = total_cost
+            result['turns'] = total_turns
+            result['attempts'] = attempt
+            if touched is not None and result.get('touched') is not None:
+                touched.update(result['touched'])
+            else:
+                touched = None
+            result['touched'] = sorted(touched) if touched is not None else None
+            
+            if result['success']:
+                # Get changes made
+                result['changes'] = await in_thread(self._get_git_changes, cwd, result['touched'])
+                return result
+            if not result.get('retryable'):
+                return result
+            if attempt >= policy.max_attempts or total_cost >= policy.max_cost_usd:
+                return result
+            
+            max_turns = min(policy.extra_turns, policy.max_total_turns - total_turns)
+            if max_turns <= 0:
+                return result
+            
+            attempt += 1
+            session_id = result.get('session_id') or session_id
+            self.on_event('retrying', {
+                'attempt': attempt,
+                'max_attempts': policy.max_attempts,
+                'session_id': session_id,
+                'error': result['error']
+            })
+            if result.get('transient'):
+                await asyncio.sleep(policy.backoff(attempt))
+    
+    async def _run_claude_code(self, prompt: str, cwd: Optional[Path] = None,
+                               session: Optional[Dict[str, Any]] = None,
+                               resume: Optional[str] = None, max_turns: int = 10) -> Dict[str, Any]:
+        """Run Claude Code using the official Python SDK
+
+        Messages are handled as they arrive: the result, cost and turns are
+        captured on the fly and each message is spooled to the transcript
+        store rather than kept in memory. The session's outcome is stored
+        with it, along with the `session` summary fields. Failures carry
+        `retryable` (and `transient` for SDK errors) so the caller can
+        resume or retry. `touched` lists the files the session wrote or
+        edited, or is None if it ran a tool that may have changed others.
+        """
+        session_id = resume
+        touched: Optional[Set[str]] = set()
+        # Tells this session's events apart from those of concurrent sessions
+        key = uuid.uuid4().hex
+        message_count = 0
+        started = False
+        try:
+            from claude_code_sdk import query, ClaudeCodeOptions, ResultMessage, AssistantMessage, SystemMessage
             
             # Configure Claude Code options
             options = ClaudeCodeOptions(
                 allowed_tools=["Read", "Write", "Bash"],
                 permission_mode='acceptEdits',  # auto-accept file edits
-                max_turns=10,
-                cwd=Path.cwd()
+                max_turns=max_turns,
+                cwd=cwd or Path.cwd(),
+                resume=resume
             )
             
-            print(f"🤖 Starting Claude Code with prompt: {prompt[:100]}...")
+            self.on_event('started', {'prompt': prompt, 'session': key, 'issue': (session or {}).get('issue'),
+                                      'attempt': (session or {}).get('attempt'), 'max_turns': max_turns})
+            started = True
             
-            # Execute Claude Code query
-            message_count = 0
-            async for message in query(prompt=prompt, options=options):
-                message_count += 1
-                messages.append(message)
-                print(f"📨 Received message {message_count}: {type(message).__name__}")
-                
-                # Debug: print message details based on type
-                if isinstance(message, SystemMessage):
-                    print(f"   System message: {message.subtype}")
-                elif isinstance(message, ResultMessage):
-                    print(f"   Result: {message.subtype}")
-                    print(f"   Success: {message.subtype == 'success'}")
-                elif isinstance(message, AssistantMessage):
-                    print(f"   Assistant message")
-                elif isinstance(message, UserMessage):
-                    print(f"   User message")
-            
-            print(f"📊 Total messages received: {len(messages)}")
-            
-            # Find the result message
             result_message = None
-            cost_usd = 0
-            turns = 0
-            session_id = None
-            
-            for msg in messages:
-                if isinstance(msg, ResultMessage):
-                    result_message = msg
-                    cost_usd = msg.total_cost_usd or 0
-                    turns = msg.num_turns
-                    session_id = msg.session_id
-                    print(f"🎯 Found result message: {msg.subtype}")
-                    break
+            assistant_count = 0
+            last_output = ''
+            
+            with self.transcript_store(cwd).session(**(session or {})) as sink:
+                # Execute Claude Code query
+                async for message in query(prompt=prompt, options=options):
+                    message_count += 1
+                    sink.write(self._message_to_dict(message))
+                    self.on_event('message', {'session': key, 'index': message_count, 'message': message})
+                    
+                    if isinstance(message, ResultMessage):
+                        result_message = message
+                    elif isinstance(message, SystemMessage) and isinstance(message.data, dict):
+                        # Known from the init message, so an interrupted stream can still be resumed
+                        session_id = message.data.get('session_id') or session_id
+                    elif isinstance(message, AssistantMessage):
+                        assistant_count += 1
+                        last_output = self._message_text(message)
+                        touched = self._track_edits(message, cwd or Path.cwd(), touched)
+                
+                if result_message:
+                    session_id = result_message.session_id or session_id
+                    sink.finish(session_id=session_id, success=result_message.subtype == 'success',
+                                outcome=result_message.subtype, cost_usd=result_message.total_cost_usd or 0,
+                                turns=result_message.num_turns, max_turns=max_turns)
+                else:
+                    sink.finish(session_id=session_id, success=bool(assistant_count),
+                                outcome='no_result', cost_usd=0, turns=assistant_count, max_turns=max_turns)
+            
+            transcript = session_id
+            touched_paths = sorted(touched) if touched is not None else None
             
             if result_message:
+                cost_usd = result_message.total_cost_usd or 0
+                turns = result_message.num_turns
                 if result_message.subtype == 'success':
-                    # Get changes made
-                    changes = self._get_git_changes()
                     return {
                         'success': True,
-                        'changes': changes,
                         'output': result_message.result or '',
                         'session_id': session_id,
                         'cost_usd': cost_usd,
                         'turns': turns,
-                        'messages': [self._message_to_dict(msg) for msg in messages]
+                        'transcript': transcript,
+                        'touched': touched_paths
                     }
                 else:
                     return {
                         'success': False,
                         'error': f'Claude Code failed: {result_message.subtype}',
+                        'retryable': result_message.subtype in RESUMABLE_SUBTYPES,
                         'session_id': session_id,
                         'cost_usd': cost_usd,
-                        'turns': turns
+                        'turns': turns,
+                        'transcript': transcript,
+                        'touched': touched_paths
                     }
+            elif assistant_count:
+                # No result message found - fall back to the last assistant message
+                return {
+                    'success': True,
+                    'output': last_output,
+                    'session_id': session_id,
+                    'cost_usd': 0,
+                    'turns': assistant_count,
+                    'transcript': transcript,
+                    'touched': touched_paths
+                }
             else:
-                # No result message found - extract from assistant messages
-                assistant_messages = [msg for msg in messages if hasattr(msg, 'type') and msg.type == 'assistant']
-                if assistant_messages:
-                    changes = self._get_git_changes()
-                    last_msg = assistant_messages[-1]
-                    output = getattr(last_msg.message, 'content', [])
-                    if isinstance(output, list) and output:
-                        output_text = output[0].text if hasattr(output[0], 'text') else str(output[0])
-                    else:
-                        output_text = str(output)
-                    
-                    return {
-                        'success': True,
-                        'changes': changes,
-                        'output': output_text,
-                        'session_id': session_id,
-                        'cost_usd': cost_usd,
-                        'turns': len(assistant_messages),
-                        'messages': [self._message_to_dict(msg) for msg in messages]
-                    }
-                else:
-                    return {
-                        'success': False,
-                        'error': 'No response from Claude Code'
-                    }
+                return {
+                    'success': False,
+                    'error': 'No response from Claude Code',
+                    'touched': []
+                }
                     
         except Exception as e:
+            transient = self._is_transient(e)
             return {
                 'success': False,
-                'error': f'Claude Code SDK error: {str(e)}'
+                'error': f'Claude Code SDK error: {str(e)}',
+                'retryable': transient,
+                'transient': transient,
+                'session_id': session_id,
+                'touched': sorted(touched) if touched is not None else None
             }
+        finally:
+            # Also on errors and cancellation, so displays never keep a dead session
+            if started:
+                self.on_event('finished', {'session': key, 'message_count': message_count})
+    
+    def _is_transient(self, error: Exception) -> bool:
+        """Whether an SDK error is worth retrying (a crashed or disconnected CLI)"""
+        from claude_code_sdk import CLIConnectionError, CLINotFoundError, CLIJSONDecodeError, ProcessError
+        
+        if isinstance(error, CLINotFoundError):
+            return False
+        return isinstance(error, (CLIConnectionError, CLIJSONDecodeError, ProcessError))
     
-    def _message_to_dict(self, message: Message) -> Dict[str, Any]:
-        """Convert a Message object to a dictionary for serialization"""
-        result = {'type': getattr(message, 'type', 'unknown')}
+    def _message_to_dict(self, message: 'Message') -> Dict[str, Any]:
+        """Convert a Message object to a dictionary for serialization, keeping every field"""
+        result = {'type': type(message).__name__}
         
-        # Add common attributes
-        for attr in ['session_id', 'subtype', 'total_cost_usd', 'num_turns', 'result']:
-            if hasattr(message, attr):
-                result[attr] = getattr(message, attr)
+        if dataclasses.is_dataclass(message):
+            fields = [field.name for field in dataclasses.fields(message)]
+        else:
+            fields = [attr for attr in ['session_id', 'subtype', 'total_cost_usd', 'num_turns', 'result',
+                                        'duration_ms', 'is_error', 'usage', 'model', 'data', 'content']
+                      if hasattr(message, attr)]
+        for attr in fields:
+            value = getattr(message, attr)
+            if attr == 'content' and isinstance(value, list):
+                value = [self._block_to_dict(block) for block in value]
+            result[attr] = value
         
         return result
     
+    def _block_to_dict(self, block: Any) -> Dict[str, Any]:
+        """Convert a message content block to a dictionary for serialization"""
+        result = {'type': type(block).__name__}
+        if dataclasses.is_dataclass(block):
+            fields = [field.name for field in dataclasses.fields(block)]
+        else:
+            fields = [attr for attr in ['text', 'thinking', 'id', 'name', 'input', 'tool_use_id', 'content',
+                                        'is_error'] if hasattr(block, attr)]
+        for attr in fields:
+            result[attr] = getattr(block, attr)
+        return result
+    
+    def _track_edits(self, message: 'Message', root: Path, touched: Optional[Set[str]]) -> Optional[Set[str]]:
+        """Add the checkout files an assistant message's tool calls edit to touched
+
+        Returns None, meaning any file may have changed, once a tool other
+        than an edit or a read-only one is used. Bash counts as read-only
+        while its commands only list, read or search files.
+        """
+        if touched is None:
+            return None
+        root = Path(root).resolve()
+        for block in getattr(message, 'content', None) or []:
+            name = getattr(block, 'name', None)
+            if name is None or name in READ_ONLY_TOOLS:
+                continue
+            if name == 'Bash' and is_read_only_command(block.input.get('command') or ''):
+                continue
+            if name not in EDIT_TOOLS:
+                return None
+            path = block.input.get('file_path') or block.input.get('notebook_path')
+            if not path:
+                continue
+            try:
+                touched.add((root / path).resolve().relative_to(root).as_posix())
+            except ValueError:
+                pass  # outside the checkout
+        return touched
+    
+    def _message_text(self, message: 'Message') -> str:
+        """Get the first text block of an assistant message"""
+        for block in getattr(message, 'content', None) or []:
+            if hasattr(block, 'text'):
+                return block.text
+        return ''
+    
     def _create_prompt(self, issue: Dict[str, Any]) -> str:
         """Create a prompt for Claude Code based on the issue"""
         prompt = f"""# GitHub Issue #{issue['number']}: {issue['title']}
@@ -150,7 +607,7 @@ class ClaudeIntegration:
 
 ## Labels
 {', '.join(issue['labels']) if issue['labels'] else 'None'}
-
+{self._grouped_issues(issue)}{self._relevant_code(issue)}
 ## Instructions
 Please analyze this GitHub issue and implement a solution. Make sure to:
 
@@ -164,42 +621,50 @@ When you're done implementing, please provide a summary of the changes made.
 """
         return prompt
     
-    def _get_git_changes(self) -> str:
-        """Get a summary of git changes made"""
+    def _grouped_issues(self, issue: Dict[str, Any]) -> str:
+        """Get prompt sections for duplicates and small issues solved in the same session"""
+        sections = ''
+        if issue.get('duplicates'):
+            sections += """
+## Duplicate Reports
+These issues report the same problem. They may add detail; one fix should
+resolve all of them.
+
+""" + '\n\n'.join(self._issue_summary(duplicate) for duplicate in issue['duplicates']) + '\n'
+        if issue.get('batched'):
+            sections += """
+## Related Issues
+These small issues touch the same area of the code. Solve them in this
+session as well.
+
+""" + '\n\n'.join(self._issue_summary(related) for related in issue['batched']) + '\n'
+        return sections
+    
+    def _issue_summary(self, issue: Dict[str, Any]) -> str:
+        """Format another issue as a short prompt subsection"""
+        body = issue['body'] or ''
+        return f"### #{issue['number']}: {issue['title']}\n{body[:1000]}{'...' if len(body) > 1000 else ''}"
+    
+    def _relevant_code(self, issue: Dict[str, Any]) -> str:
+        """Get prompt section with the indexed snippets most relevant to the issue"""
+        if not self.context_index or self.context_tokens <= 0:
+            return ''
+        
+        text = ' '.join([issue['title'], issue['body'], *issue['labels']])
+        context = self.context_index.context_for(text, token_budget=self.context_tokens)
+        if not context:
+            return ''
+        return f"""
+## Possibly Relevant Code
+These snippets were ranked against the issue text and may help you find
+where to start. Read the full files before changing them.
+
+{context}
+"""
+    
+    def _get_git_changes(self, cwd: Optional[Path] = None, paths: Optional[List[str]] = None) -> str:
+        """Get a summary of git changes made, optionally only to the given paths"""
         try:
-            # Get diff of staged changes
-            staged_result = subprocess.run([
-                'git', 'diff', '--cached', '--stat'
-            ], capture_output=True, text=True)
-            
-            # Get diff of unstaged changes
-            unstaged_result = subprocess.run([
-                'git', 'diff', '--stat'
-            ], capture_output=True, text=True)
-            
-            # Get list of untracked files
-            untracked_result = subprocess.run([
-                'git', 'ls-files', '--others', '--exclude-standard'
-            ], capture_output=True, text=True)
-            
-            changes = []
-            
-            if staged_result.stdout.strip():
-                changes.append("**Staged changes:**")
-                changes.append(staged_result.stdout.strip())
-            
-            if unstaged_result.stdout.strip():
-                changes.append("**Unstaged changes:**")
-                changes.append(unstaged_result.stdout.strip())
-            
-            if untracked_result.stdout.strip():
-                changes.append("**New files:**")
-                changes.extend(f"- {f}" for f in untracked_result.stdout.strip().split('\n'))
-            
-            if not changes:
-                changes.append("No changes detected")
-            
-            return '\n\n'.join(changes)
-            
+            return self.workspace.for_path(cwd).changes_summary(paths)
         except subprocess.CalledProcessError:
-            return "Could not determine changes"
\ No newline at end of file
+            return "Could not determine changes"
@@ -3,64 +3,181 @@
 
 import click
 import os
-import subprocess
 import sys
 from pathlib import Path
-from dotenv import load_dotenv
 
-from .github_client import GitHubClient
-from .issue_selector import IssueSelector
-from .claude_integration import ClaudeIntegration
 
-# Load environment variables from .env file
-load_dotenv()
+def _load_token(token):
+    """Load .env, check we're at a repo root and resolve the GitHub token"""
+    from dotenv import load_dotenv
+    
+    # Load environment variables from .env file
+    load_dotenv()
+    
+    # Check if we're in a git repo
+    if not Path('.git').exists():
+        click.echo("Error: Must be run from a git repository root", err=True)
+        sys.exit(1)
+    
+    # Get GitHub token
+    github_token = token or os.getenv('GITHUB_TOKEN')
+    if not github_token:
+        click.echo("Error: GitHub token required. Set GITHUB_TOKEN env var or use --token", err=True)
+        sys.exit(1)
+    
+    return github_token
 
 
-@click.command()
+@click.group(invoke_without_command=True)
 @click.option('--token', help='GitHub token (or set GITHUB_TOKEN env var)')
-def main(token):
+@click.option('--issue', 'issue_numbers', type=int, multiple=True,
+              help='Issue number to solve without prompting (repeat for a batch)')
+@click.option('--all', 'all_issues', is_flag=True, help='Solve every open issue as a batch')
+@click.option('--concurrency', default=4, show_default=True,
+              help='Number of issues solved at once in batch mode')
+@click.option('--refresh', is_flag=True, help='Discard the local issue cache and fetch all open issues')
+@click.option('--backend', type=click.Choice(['rest', 'graphql']), default='rest', show_default=True,
+              help='API used to fetch issues')
+@click.option('--context-tokens', default=2000, show_default=True,
+              help='Token budget for indexed code snippets added to the prompt (0 disables)')
+@click.option('--max-attempts', default=3, show_default=True,
+              help='Claude sessions per issue, resuming after the turn limit or transient errors')
+@click.option('--max-cost', default=5.0, show_default=True,
+              help='Stop resuming an issue once it has cost this many dollars')
+@click.option('--setup-cmd',
+              help='Shell command run once in each new pooled worktree, e.g. to install dependencies')
+@click.option('--keep', multiple=True,
+              help='Untracked path kept when pooled worktrees are recycled (repeatable) '
+                   '[default: .venv, venv, node_modules]')
+@click.option('--cache/--no-cache', default=True, show_default=True,
+              help='Reuse the stored solution when an issue is solved again against the same tree')
+@click.option('--dedup/--no-dedup', default=True, show_default=True,
+              help='Solve each cluster of near-duplicate issues once, linking every member')
+@click.option('--similarity', default=0.6, show_default=True,
+              help='Similarity (0-1) above which two issues count as duplicates')
+@click.option('--batch-area', default=0, show_default=True,
+              help='Solve up to this many small issues touching the same file in one session (0 disables)')
+@click.option('--schedule/--no-schedule', default=True, show_default=True,
+              help='Pick turn budgets and batch order from the outcomes of past sessions')
+@click.option('--budget-usd', type=float, help='Stop starting issues once this many dollars are spent')
+@click.option('--budget-minutes', type=float, help='Stop starting issues after this many minutes')
+@click.option('--verify/--no-verify', default=False, show_default=True,
+              help="Run the tests affected by Claude's changes before publishing, sending failures back to Claude")
+@click.option('--test-cmd',
+              help='Test command for --verify (implies it); affected test files are appended, or replace '
+                   '{tests} [default: python -m pytest -q]')
+@click.option('--profile', is_flag=True, help='Print a per-phase timing breakdown at the end')
+@click.option('--profile-json', type=click.Path(dir_okay=False),
+              help='Write per-phase timings and spans as JSON to this file')
+@click.option('--profile-prom', type=click.Path(dir_okay=False),
+              help='Write per-phase metrics as a Prometheus textfile to this file')
+@click.pass_context
+def main(ctx, token, issue_numbers, all_issues, concurrency, refresh, backend, context_tokens,
+         max_attempts, max_cost, setup_cmd, keep, cache, dedup, similarity, batch_area,
+         schedule, budget_usd, budget_minutes, verify, test_cmd, profile, profile_json, profile_prom):
     """Select a GitHub issue and solve it with Claude Code"""
+    if ctx.invoked_subcommand is not None:
+        return
+    if batch_area > 1 and context_tokens <= 0:
+        # Areas come from the repository index, which --context-tokens 0 turns off
+        raise click.UsageError("--batch-area needs the repository index; it cannot be used with --context-tokens 0")
+    
+    github_token = _load_token(token)
+    
     try:
-        # Check if we're in a git repo
-        if not Path('.git').exists():
-            click.echo("Error: Must be run from a git repository root", err=True)
-            sys.exit(1)
-        
-        # Get GitHub token
-        github_token = token or os.getenv('GITHUB_TOKEN')
-        if not github_token:
-            click.echo("Error: GitHub token required. Set GITHUB_TOKEN env var or use --token", err=True)
+        _solve(github_token, issue_numbers, all_issues, concurrency, refresh, backend,
+               context_tokens, max_attempts, max_cost, setup_cmd, keep, cache,
+               similarity if dedup else None, batch_area, schedule, budget_usd, budget_minutes,
+               verify or test_cmd is not None, test_cmd)
+    except Exception as e:
+        click.echo(f"Error: {e}", err=True)
+        sys.exit(1)
+    finally:
+        if profile or profile_json or profile_prom:
+            _export_profile(profile, profile_json, profile_prom)
+
+
+def _solve(github_token, issue_numbers, all_issues, concurrency, refresh, backend,
+           context_tokens, max_attempts, max_cost, setup_cmd, keep, cache, similarity, batch_area,
+           schedule, budget_usd, budget_minutes, verify=False, test_cmd=None):
+    """Fetch issues, then solve the selected one or run a batch"""
+    # Imported only once the cheap checks in main() have passed, so that
+    # --help and argument errors never load GitHub, Claude or rich
+    from .github_client import GitHubClient
+    from .git_workspace import GitWorkspace
+    
+    # Initialize components
+    workspace = GitWorkspace()
+    github_client = GitHubClient(github_token, backend=backend, workspace=workspace,
+                                 pool_size=max(16, concurrency))
+    claude_integration = _make_claude(workspace, context_tokens, max_attempts, max_cost, cache,
+                                      verify, test_cmd)
+    
+    # Get repository info
+    repo_info = github_client.get_repo_info()
+    click.echo(f"Repository: {repo_info['full_name']}")
+    
+    # Fetch and display issues
+    issues = github_client.get_open_issues(refresh=refresh)
+    if not issues:
+        click.echo("No open issues found.")
+        return
+    
+    issues = _group_issues(issues, similarity, claude_integration.context_index, batch_area)
+    scheduler = None
+    if schedule or budget_usd is not None or budget_minutes is not None:
+        scheduler = _make_scheduler(claude_integration, concurrency, budget_usd, budget_minutes, schedule)
+    
+    if issue_numbers or all_issues:
+        pool = _make_pool(workspace, concurrency, setup_cmd, keep)
+        _run_batch(github_client, claude_integration, pool, issues, issue_numbers, concurrency, scheduler)
+        return
+    
+    # One worktree gets ready while the user picks; more are only set up
+    # if several issues are picked
+    pool = _make_pool(workspace, 1, setup_cmd, keep)
+    pool.start()
+    try:
+        _solve_selected(github_client, claude_integration, pool, issues, concurrency, scheduler)
+    finally:
+        pool.close()
+
+
+def _solve_selected(github_client, claude_integration, pool, issues, concurrency, scheduler=None):
+    """Let the user pick issues; solve one in a pooled worktree, or several as a batch"""
+    from .issue_selector import IssueSelector
+    from .profiling import profiler
+    
+    # Select issues
+    issue_selector = IssueSelector()
+    with profiler.span('select_issue'):
+        selected_issues = issue_selector.select_issues(issues)
+    if not selected_issues:
+        click.echo("No issue selected.")
+        return
+    if len(selected_issues) > 1:
+        pool.grow(min(concurrency, len(selected_issues)))
+        _run_batch(github_client, claude_integration, pool, selected_issues, (), concurrency, scheduler)
+        return
+    
+    selected_issue = selected_issues[0]
+    click.echo(f"Selected issue #{selected_issue['number']}: {selected_issue['title']}")
+    
+    # Check out a branch for the issue in a leased worktree, leaving the
+    # user's own checkout alone
+    branch_name = f"issue-{selected_issue['number']}"
+    max_turns = None
+    if scheduler:
+        planned, _ = scheduler.plan([selected_issue])
+        if not planned:
+            estimate = scheduler.estimates[selected_issue['number']]
+            click.echo(f"❌ Deferred: issue #{selected_issue['number']} is expected to take "
+                       f"${estimate['cost_usd']:.2f} and {estimate['duration_s'] / 60:.0f} min, over the budget")
             sys.exit(1)
-        
-        # Initialize components
-        github_client = GitHubClient(github_token)
-        issue_selector = IssueSelector()
-        claude_integration = ClaudeIntegration()
-        
-        # Get repository info
-        repo_info = github_client.get_repo_info()
-        click.echo(f"Repository: {repo_info['full_name']}")
-        
-        # Fetch and display issues
-        issues = github_client.get_open_issues()
-        if not issues:
-            click.echo("No open issues found.")
-            return
-        
-        # Select issue
-        selected_issue = issue_selector.select_issue(issues)
-        if not selected_issue:
-            click.echo("No issue selected.")
-            return
-        
-        click.echo(f"Selected issue #{selected_issue['number']}: {selected_issue['title']}")
-        
-        # Create branch for the issue
-        branch_name = f"issue-{selected_issue['number']}"
-        github_client.create_branch(branch_name)
-        
+        max_turns = scheduler.max_turns_for(selected_issue)
+    with pool.lease(branch_name) as path:
         # Run Claude Code
-        claude_result = claude_integration.solve_issue(selected_issue)
+        claude_result = claude_integration.solve_issue(selected_issue, cwd=path, max_turns=max_turns)
         
         if claude_result['success']:
             # Show execution stats
@@ -68,12 +185,18 @@ def main(token):
                 click.echo(f"💰 Cost: ${claude_result['cost_usd']:.4f}")
             if 'turns' in claude_result:
                 click.echo(f"🔄 Turns: {claude_result['turns']}")
+            if claude_result.get('attempts', 1) > 1:
+                click.echo(f"🔁 Attempts: {claude_result['attempts']}")
+            if claude_result.get('transcript'):
+                click.echo(f"📝 Transcript: zezployee stats --session {claude_result['transcript']}")
             
             # Create PR
             pr_url = github_client.create_pull_request(
                 branch_name, 
                 selected_issue, 
-                claude_result['changes']
+                claude_result['changes'],
+                cwd=path,
+                paths=claude_result.get('touched')
             )
             
             click.echo(f"✅ Pull request created: {pr_url}")
@@ -81,11 +204,288 @@ def main(token):
         else:
             click.echo(f"❌ Claude Code failed: {claude_result['error']}")
             sys.exit(1)
+
+
+def _make_pool(workspace, size, setup_cmd, keep):
+    """Build the pool of prepared worktrees that issues are solved in"""
+    from .paths import state_dir
+    from .worktree_pool import WorktreePool, DEFAULT_KEEP
+    
+    return WorktreePool(workspace, state_dir() / 'pool', size, setup_command=setup_cmd,
+                        keep=keep or DEFAULT_KEEP)
+
+
+def _export_profile(profile, profile_json, profile_prom):
+    """Print and/or export the timing breakdown collected during the run"""
+    from .profiling import profiler
+    
+    if profile:
+        click.echo("\n⏱️  Profile")
+        click.echo(profiler.report())
+    if profile_json:
+        Path(profile_json).write_text(profiler.to_json())
+    if profile_prom:
+        profiler.write_prometheus(Path(profile_prom))
+
+
+def _group_issues(issues, similarity, index, batch_area):
+    """Fold near-duplicates, and small issues in the same area if asked, into one issue each"""
+    if similarity is None and batch_area <= 1:
+        return issues
+    
+    from .issue_clustering import group_issues
+    from .profiling import profiler
+    
+    with profiler.span('group_issues', issues=len(issues)):
+        grouped = group_issues(issues, threshold=similarity, index=index, batch_size=batch_area)
+    
+    folded = len(issues) - len(grouped)
+    if folded:
+        click.echo(f"🔗 Folded {folded} duplicate or related issues, {len(grouped)} left to solve")
+    return grouped
+
+
+def _run_batch(github_client, claude_integration, pool, issues, issue_numbers, concurrency, scheduler=None):
+    """Solve several issues concurrently, each in its own worktree"""
+    from .batch import BatchRunner
+    from .issue_clustering import covered_issues
+    
+    if issue_numbers:
+        # A duplicate asked for by number is solved through its cluster
+        by_number = {member['number']: issue for issue in issues for member in covered_issues(issue)}
+        missing = [n for n in issue_numbers if n not in by_number]
+        if missing:
+            click.echo(f"⚠️  Not open issues, skipping: {', '.join(f'#{n}' for n in missing)}")
+        issues = list({by_number[n]['number']: by_number[n] for n in issue_numbers if n in by_number}.values())
+        if not issues:
+            click.echo("No issues to solve.")
+            return
+    
+    deferred = []
+    if scheduler:
+        issues, deferred = scheduler.plan(issues)
+        expected_cost = sum(scheduler.estimates[issue['number']]['cost_usd'] for issue in issues)
+        expected_minutes = sum(scheduler.estimates[issue['number']]['duration_s'] for issue in issues) / 60
+        click.echo(f"📅 Planned {len(issues)} issues, expecting ${expected_cost:.2f} "
+                   f"and {expected_minutes / concurrency:.0f} min"
+                   + (f"; {len(deferred)} deferred to stay within budget" if deferred else ""))
+    
+    click.echo(f"Solving {len(issues)} issues with concurrency {concurrency}")
+    runner = BatchRunner(github_client, claude_integration, concurrency=concurrency, pool=pool,
+                         scheduler=scheduler)
+    results = runner.run(issues) if issues else []
+    results += [{'number': issue['number'], 'success': False, 'error': 'Deferred: over the batch budget'}
+                for issue in deferred]
+    issues = issues + deferred
+    
+    covers = {
+        issue['number']: ''.join(f", #{member['number']}" for member in covered_issues(issue)[1:])
+        for issue in issues
+    }
+    for result in results:
+        if result['success']:
+            click.echo(f"✅ #{result['number']}{covers[result['number']]}: {result['pr_url']}")
+        else:
+            click.echo(f"❌ #{result['number']}{covers[result['number']]}: {result['error']}")
+    
+    total_cost = sum(result.get('cost_usd', 0) for result in results)
+    solved = sum(1 for result in results if result['success'])
+    click.echo(f"💰 Total cost: ${total_cost:.4f}")
+    click.echo(f"Solved {solved}/{len(results)} issues")
+    
+    if solved < len(results):
+        sys.exit(1)
+
+
+def _make_scheduler(claude_integration, concurrency, budget_usd, budget_minutes, use_history=True):
+    """Build the scheduler, learning from the session history in the transcript store if asked"""
+    from .scheduler import History, Scheduler
+    
+    policy = claude_integration.retry_policy
+    return Scheduler(
+        History.load(claude_integration.transcript_store()) if use_history else History(),
+        default_turns=policy.initial_turns,
+        max_turns=policy.max_total_turns,
+        budget_usd=budget_usd,
+        budget_seconds=budget_minutes * 60 if budget_minutes is not None else None,
+        concurrency=concurrency
+    )
+
+
+def _make_claude(workspace, context_tokens, max_attempts, max_cost, cache=True, verify=False, test_cmd=None):
+    """Build the Claude integration shared by the interactive, batch and daemon modes"""
+    from .claude_integration import ClaudeIntegration, RetryPolicy
+    from .paths import state_dir
+    
+    solution_cache = None
+    if cache:
+        from .solution_cache import SolutionCache
+        
+        solution_cache = SolutionCache(state_dir() / 'solutions.sqlite3')
+    
+    verifier = None
+    if verify:
+        from .verification import Verifier, DEFAULT_TEST_COMMAND
+        
+        verifier = Verifier(state_dir() / 'verification.sqlite3', workspace, test_cmd or DEFAULT_TEST_COMMAND)
+    
+    return ClaudeIntegration(
+        on_event=_progress_callback(),
+        workspace=workspace,
+        context_index=_load_index(workspace, context_tokens),
+        context_tokens=context_tokens,
+        retry_policy=RetryPolicy(max_attempts=max_attempts, max_cost_usd=max_cost),
+        solution_cache=solution_cache,
+        verifier=verifier
+    )
+
+
+def _progress_callback():
+    """Session events go to a live dashboard on a terminal, and are printed otherwise"""
+    from .claude_integration import print_progress
+    
+    if not sys.stdout.isatty():
+        return print_progress
+    
+    from .progress import EventBus, Dashboard, SESSION_EVENTS
+    
+    bus = EventBus()
+    bus.subscribe(Dashboard())
+    bus.subscribe(lambda event, data: event in SESSION_EVENTS or print_progress(event, data))
+    return bus.publish
+
+
+def _load_index(workspace, context_tokens):
+    """Open the repository index, unless prompt context is disabled
+    
+    The index is only brought up to date once a prompt or grouping needs it.
+    """
+    if context_tokens <= 0:
+        return None
+    
+    from .paths import state_dir
+    from .repo_index import RepoIndex
+    
+    return RepoIndex(state_dir() / 'index.sqlite3', workspace,
+                     on_update=lambda indexed, removed: click.echo(f"📚 Indexed {indexed} files ({removed} removed)"))
+
+
+@main.command()
+@click.option('--token', help='GitHub token (or set GITHUB_TOKEN env var)')
+@click.option('--label', 'labels', multiple=True, help='Only take issues with this label (repeatable)')
+@click.option('--assignee', help='Only take issues assigned to this user')
+@click.option('--workers', default=2, show_default=True, help='Number of issues worked on at once')
+@click.option('--poll-interval', default=60.0, show_default=True, help='Seconds between issue polls')
+@click.option('--backend', type=click.Choice(['rest', 'graphql']), default='rest', show_default=True,
+              help='API used to fetch issues')
+@click.option('--once', is_flag=True, help='Exit once the queue is drained instead of polling forever')
+@click.option('--context-tokens', default=2000, show_default=True,
+              help='Token budget for indexed code snippets added to the prompt (0 disables)')
+@click.option('--max-attempts', default=3, show_default=True,
+              help='Claude sessions per issue, resuming after the turn limit or transient errors')
+@click.option('--max-cost', default=5.0, show_default=True,
+              help='Stop resuming an issue once it has cost this many dollars')
+@click.option('--setup-cmd',
+              help='Shell command run once in each new pooled worktree, e.g. to install dependencies')
+@click.option('--keep', multiple=True,
+              help='Untracked path kept when pooled worktrees are recycled (repeatable) '
+                   '[default: .venv, venv, node_modules]')
+@click.option('--cache/--no-cache', default=True, show_default=True,
+              help='Reuse the stored solution when an issue is solved again against the same tree')
+@click.option('--dedup/--no-dedup', default=True, show_default=True,
+              help='Queue each cluster of near-duplicate issues once, linking every member')
+@click.option('--similarity', default=0.6, show_default=True,
+              help='Similarity (0-1) above which two issues count as duplicates')
+@click.option('--verify/--no-verify', default=False, show_default=True,
+              help="Run the tests affected by Claude's changes before publishing, sending failures back to Claude")
+@click.option('--test-cmd',
+              help='Test command for --verify (implies it); affected test files are appended, or replace '
+                   '{tests} [default: python -m pytest -q]')
+def serve(token, labels, assignee, workers, poll_interval, backend, once, context_tokens,
+          max_attempts, max_cost, setup_cmd, keep, cache, dedup, similarity, verify, test_cmd):
+    """Poll for matching issues and solve them unattended"""
+    github_token = _load_token(token)
+    
+    try:
+        from .github_client import GitHubClient
+        from .git_workspace import GitWorkspace
+        from .job_queue import JobQueue
+        from .daemon import Daemon
+        from .paths import state_dir
+        
+        workspace = GitWorkspace()
+        github_client = GitHubClient(github_token, backend=backend, workspace=workspace,
+                                     pool_size=max(16, workers))
+        claude_integration = _make_claude(workspace, context_tokens, max_attempts, max_cost, cache,
+                                          verify or test_cmd is not None, test_cmd)
+        queue = JobQueue(state_dir() / 'jobs.sqlite3')
+        
+        click.echo(f"Serving {github_client.get_repo_info()['full_name']} with {workers} workers")
+        daemon = Daemon(
+            github_client,
+            claude_integration,
+            queue,
+            labels=labels,
+            assignee=assignee,
+            workers=workers,
+            poll_interval=poll_interval,
+            pool=_make_pool(workspace, workers, setup_cmd, keep),
+            similarity=similarity if dedup else None
+        )
+        try:
+            daemon.run(once=once)
+        except KeyboardInterrupt:
+            click.echo("\nStopped. Unfinished jobs resume on the next start.")
+        finally:
+            counts = queue.counts()
+            click.echo(', '.join(f"{stage}: {count}" for stage, count in counts.items()))
+            queue.close()
             
     except Exception as e:
         click.echo(f"Error: {e}", err=True)
         sys.exit(1)
 
 
+@main.command()
+@click.option('--since', type=float, help='Only count sessions started in the last this many days')
+@click.option('--issue', 'issue_number', type=int, help="Print the stored transcripts of this issue's sessions")
+@click.option('--session', 'session_id', help='Print the stored transcript of this session')
+def stats(since, issue_number, session_id):
+    """Show cost, turns, duration and success rate of past sessions by label"""
+    import json
+    import time
+    
+    try:
+        from .paths import state_dir
+        from .transcript_store import TranscriptStore
+        
+        store = TranscriptStore(state_dir() / 'transcripts')
+        
+        if issue_number is not None or session_id:
+            entries = store.find(issue=issue_number, session_id=session_id)
+            if not entries:
+                click.echo("No stored transcript found.", err=True)
+                sys.exit(1)
+            for entry in entries:
+                for message in store.messages(entry):
+                    click.echo(json.dumps(message, ensure_ascii=False))
+            return
+        
+        rows = store.stats(since=time.time() - since * 86400 if since is not None else None)
+        if not rows:
+            click.echo("No sessions recorded yet.")
+            return
+        
+        click.echo(f"{'Label':<24} {'Sessions':>8} {'Success':>8} {'Cost':>10} {'Avg cost':>9} "
+                   f"{'Avg turns':>9} {'Avg time':>9}")
+        for row in rows:
+            click.echo(f"{row['label'][:24]:<24} {row['sessions']:>8} {row['success_rate']:>8.1%} "
+                       f"{'$%.2f' % row['cost_usd']:>10} {'$%.4f' % row['avg_cost_usd']:>9} "
+                       f"{row['avg_turns']:>9.1f} {'%.0fs' % row['avg_duration_s']:>9}")
+    except ValueError as e:
+        click.echo(f"Error: {e}", err=True)
+        sys.exit(1)
+
+
 if __name__ == '__main__':
     main()
\ No newline at end of file
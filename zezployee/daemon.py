@@ -0,0 +1,178 @@
+"""Headless mode: poll for matching issues and work through them unattended"""
+
+import asyncio
+import time
+from typing import List, Dict, Any, Optional, Sequence
+
+from .issue_clustering import cluster_duplicates
+from .job_queue import JobQueue, QUEUED, SOLVING, COMMITTED, PUSHED, PR_OPENED, FAILED
+from .paths import state_dir
+from .profiling import in_thread
+from .worktree_pool import WorktreePool
+
+
+# Claude sessions started for one issue before its job is given up. Later
+# stages are retried until they succeed: the solution is already paid for
+MAX_SOLVE_ATTEMPTS = 3
+
+class Daemon:
+    def __init__(self, github_client, claude_integration, queue: JobQueue,
+                 labels: Sequence[str] = (), assignee: Optional[str] = None,
+                 workers: int = 2, poll_interval: float = 60.0,
+                 pool: Optional[WorktreePool] = None, similarity: Optional[float] = None):
+        if workers < 1:
+            raise ValueError("Workers must be at least 1")
+        self.github_client = github_client
+        self.claude_integration = claude_integration
+        self.queue = queue
+        self.labels = set(labels)
+        self.assignee = assignee
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.pool = pool or WorktreePool(github_client.workspace, state_dir() / 'pool', workers)
+        self.similarity = similarity
+
+    def run(self, once: bool = False) -> None:
+        """Run until interrupted, or until the queue drains when once is set"""
+        asyncio.run(self.run_async(once=once))
+
+    async def run_async(self, once: bool = False) -> None:
+        """Poll, enqueue and process jobs on the running event loop"""
+        recovered = self.queue.recover()
+        if recovered:
+            print(f"🔁 Requeued {recovered} jobs interrupted while solving")
+
+        await in_thread(self.github_client._configure_git_auth)
+        await in_thread(self.pool.start)
+        try:
+            await self._serve(once)
+        finally:
+            await in_thread(self.pool.close)
+
+    async def _serve(self, once: bool) -> None:
+        """Main loop: poll on schedule and keep up to `workers` jobs running"""
+        active: Dict[int, asyncio.Future] = {}
+        next_poll = 0.0
+        while True:
+            if time.monotonic() >= next_poll:
+                await self._poll()
+                next_poll = time.monotonic() + self.poll_interval
+
+            for job in self.queue.runnable(self.workers - len(active), exclude=active):
+                active[job['number']] = asyncio.ensure_future(self._process(job))
+
+            if not active:
+                if once:
+                    return
+                await asyncio.sleep(max(0.0, next_poll - time.monotonic()))
+                continue
+
+            done, _ = await asyncio.wait(
+                list(active.values()),
+                timeout=max(0.0, next_poll - time.monotonic()),
+                return_when=asyncio.FIRST_COMPLETED
+            )
+            for number in [number for number, task in active.items() if task in done]:
+                del active[number]
+
+    async def _poll(self) -> None:
+        """Enqueue open issues matching the filters
+
+        The issue cache makes this a single conditional request when nothing
+        changed, so an idle daemon costs next to nothing.
+        """
+        try:
+            issues = await in_thread(self.github_client.get_open_issues)
+        except Exception as e:
+            print(f"⚠️  Failed to poll issues: {e}")
+            return
+
+        matching = self._matching(issues)
+        if self.similarity is not None:
+            # Duplicates ride along with their cluster's job; one already
+            # queued on its own from an earlier poll keeps that job
+            matching = cluster_duplicates(matching, self.similarity)
+
+        added = [issue['number'] for issue in matching if self.queue.enqueue(issue)]
+        if added:
+            print(f"📥 Queued issues: {', '.join(f'#{n}' for n in added)}")
+
+    def _matching(self, issues: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Filter issues by label and assignee"""
+        matching = []
+        for issue in issues:
+            if self.labels and not self.labels.intersection(issue['labels']):
+                continue
+            if self.assignee and issue['assignee'] != self.assignee:
+                continue
+            matching.append(issue)
+        return matching
+
+    async def _process(self, job: Dict[str, Any]) -> None:
+        """Drive one job from its current stage to an open pull request"""
+        number = job['number']
+        issue = job['issue']
+        branch_name = job['branch']
+        stage = job['stage']
+
+        try:
+            if stage == QUEUED:
+                stage, job = await self._solve(job)
+                if stage == FAILED:
+                    return
+
+            if stage == COMMITTED:
+                await in_thread(self.github_client.push_branch, branch_name)
+                self.queue.advance(number, PUSHED)
+                stage = PUSHED
+                print(f"⬆️  Pushed {branch_name}")
+
+            if stage == PUSHED:
+                # A crash right after creating the PR must not open a second one
+                pr_url = await in_thread(self.github_client.find_pull_request, branch_name)
+                if not pr_url:
+                    pr_url = await in_thread(
+                        self.github_client.open_pull_request, branch_name, issue, job['changes'] or ''
+                    )
+                self.queue.advance(number, PR_OPENED, pr_url=pr_url)
+                print(f"✅ #{number}: {pr_url}")
+
+        except Exception as e:
+            # The stage is left untouched so a later try resumes here, once
+            # the queue's backoff is over
+            retries = self.queue.fail(number, stage, str(e))
+            print(f"❌ #{number} failed at {stage} (try {retries}): {e}")
+            if stage == QUEUED and self.queue.get(number)['attempts'] >= MAX_SOLVE_ATTEMPTS:
+                self.queue.advance(number, FAILED)
+
+    async def _solve(self, job: Dict[str, Any]):
+        """Run Claude in a fresh worktree and commit the result"""
+        number = job['number']
+        issue = job['issue']
+        branch_name = job['branch']
+
+        self.queue.advance(number, SOLVING, attempts=job['attempts'] + 1)
+        # A branch left behind by an interrupted attempt is started over
+        path = await in_thread(self.pool.acquire, branch_name)
+        try:
+            claude_result = await self.claude_integration.solve_issue_async(issue, cwd=path)
+            fields = {
+                'session_id': claude_result.get('session_id'),
+                'cost_usd': claude_result.get('cost_usd', 0),
+                'turns': claude_result.get('turns', 0)
+            }
+            if not claude_result['success']:
+                self.queue.advance(number, FAILED, error=claude_result['error'], **fields)
+                print(f"❌ #{number}: {claude_result['error']}")
+                return FAILED, job
+
+            committed = await in_thread(self.github_client._commit_changes, issue, path,
+                                              claude_result.get('touched'))
+            if not committed:
+                self.queue.advance(number, FAILED, error='Claude made no changes', **fields)
+                return FAILED, job
+
+            self.queue.advance(number, COMMITTED, changes=claude_result['changes'], **fields)
+            return COMMITTED, self.queue.get(number)
+        finally:
+            self.pool.release(path)
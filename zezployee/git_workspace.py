@@ -0,0 +1,296 @@
+"""Shared access to git state for the main checkout and its worktrees"""
+
+import os
+import struct
+import subprocess
+import threading
+import time
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple, Iterator
+
+from .paths import state_dir
+from .profiling import profiler
+
+
+class GitWorkspace:
+    def __init__(self, path: Optional[Path] = None, _shared: Optional[Dict[str, Any]] = None):
+        self.path = Path(path) if path else Path.cwd()
+        # Facts that are the same for every worktree of the repository are
+        # looked up once and shared with workspaces created via for_path()
+        self._shared = _shared if _shared is not None else {'timings': []}
+
+    @property
+    def timings(self) -> List[Tuple[str, float]]:
+        """(command, seconds) for every git call made through this repository"""
+        return self._shared['timings']
+
+    def for_path(self, path: Optional[Path]) -> 'GitWorkspace':
+        """Get a workspace for another worktree of the same repository"""
+        if path is None or Path(path) == self.path:
+            return self
+        return GitWorkspace(path, _shared=self._shared)
+
+    def run(self, *args: str, check: bool = True, capture: bool = True,
+            input: Optional[bytes] = None, text: bool = True, scan: bool = False,
+            env: Optional[Dict[str, str]] = None) -> subprocess.CompletedProcess:
+        """Run a timed git command in this workspace
+
+        Commands that scan the working tree pass scan, which turns on the
+        fsmonitor and untracked cache where git supports them. env adds
+        variables to the command's environment.
+        """
+        profiler.count('subprocesses')
+        options = self.scan_options if scan else []
+        start = time.perf_counter()
+        try:
+            return subprocess.run(
+                ['git', *options, *args],
+                capture_output=capture,
+                input=input,
+                text=text,
+                check=check,
+                cwd=self.path,
+                env=dict(os.environ, **env) if env else None
+            )
+        finally:
+            self.timings.append((' '.join(args[:2]), time.perf_counter() - start))
+
+    @property
+    def scan_options(self) -> List[str]:
+        """`-c` options speeding up working tree scans, probed once per repository"""
+        options = self._shared.get('scan_options')
+        if options is None:
+            options = ['-c', 'core.untrackedCache=true']
+            # The built-in fsmonitor needs git 2.36+ and a supported platform
+            probe = self.run('fsmonitor--daemon', 'status', check=False)
+            if 'not supported' not in probe.stderr and 'not a git command' not in probe.stderr:
+                options += ['-c', 'core.fsmonitor=true']
+            self._shared['scan_options'] = options
+        return options
+
+    def read_blobs(self, blob_ids: List[str]) -> Iterator[Optional[bytes]]:
+        """Stream blob contents, in order, through a single `git cat-file --batch`
+
+        Missing objects yield None.
+        """
+        profiler.count('subprocesses')
+        start = time.perf_counter()
+        process = subprocess.Popen(
+            ['git', 'cat-file', '--batch'],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            cwd=self.path
+        )
+
+        def feed():
+            # Written from a thread so a full stdout pipe cannot deadlock us
+            try:
+                for blob_id in blob_ids:
+                    process.stdin.write(blob_id.encode() + b'\n')
+                process.stdin.close()
+            except BrokenPipeError:
+                pass
+
+        writer = threading.Thread(target=feed, daemon=True)
+        writer.start()
+        try:
+            for _ in blob_ids:
+                header = process.stdout.readline().split()
+                if len(header) < 3:
+                    yield None
+                    continue
+                data = process.stdout.read(int(header[2]))
+                process.stdout.read(1)  # trailing newline
+                yield data
+        finally:
+            process.stdout.close()
+            process.kill()
+            process.wait()
+            writer.join()
+            self.timings.append(('cat-file --batch', time.perf_counter() - start))
+
+    @property
+    def remote_url(self) -> str:
+        """URL of the origin remote"""
+        if 'remote_url' not in self._shared:
+            self._shared['remote_url'] = self.run('remote', 'get-url', 'origin').stdout.strip()
+        return self._shared['remote_url']
+
+    def set_remote_url(self, url: str) -> None:
+        """Point origin at a new URL"""
+        self.run('remote', 'set-url', 'origin', url)
+        self._shared['remote_url'] = url
+
+    @property
+    def base_branch(self) -> str:
+        """Default branch of origin, used as the base for pull requests"""
+        if 'base_branch' not in self._shared:
+            result = self.run('symbolic-ref', '--short', 'refs/remotes/origin/HEAD', check=False)
+            ref = result.stdout.strip()
+            self._shared['base_branch'] = ref.split('/', 1)[1] if result.returncode == 0 and '/' in ref else 'main'
+        return self._shared['base_branch']
+
+    @property
+    def state_dir(self) -> Path:
+        """zezployee's state directory in the git common dir, the same for every worktree"""
+        if 'state_dir' not in self._shared:
+            self._shared['state_dir'] = state_dir(self.path)
+        return self._shared['state_dir']
+
+    def tree_hash(self, rev: str = 'HEAD') -> str:
+        """Hash of the tree a commit points at"""
+        return self.run('rev-parse', f"{rev}^{{tree}}").stdout.strip()
+
+    def staged_patch(self, paths: Optional[List[str]] = None) -> bytes:
+        """Stage every change, or those to the given paths, and get them as a binary-safe patch against HEAD"""
+        self.stage(paths)
+        return self.run('diff', '--cached', '--binary', text=False).stdout
+
+    def stage(self, paths: Optional[List[str]] = None) -> Optional[List[str]]:
+        """Stage every change in the checkout, or only changes to the given paths
+
+        Given paths go through one scoped status call first, so paths that
+        are unchanged or gitignored are skipped rather than failing `git add`.
+        Returns the paths staged, or None when everything was.
+        """
+        if paths is None:
+            self._count_scanned(None)
+            self.run('add', '-A', scan=True)
+            return None
+        status = self.status(paths)
+        changed = list(dict.fromkeys(status['staged'] + status['unstaged'] + status['untracked']))
+        if changed:
+            self.run('add', '-A', '--', *_literal(changed), scan=True)
+        return changed
+
+    def staged_paths(self) -> List[str]:
+        """Paths whose staged content differs from HEAD; compares the index only"""
+        output = self.run('diff', '--cached', '--name-only', '-z', 'HEAD').stdout
+        return [path for path in output.split('\0') if path]
+
+    def apply_patch(self, patch: bytes) -> None:
+        """Apply a patch from staged_patch() to the working tree and index"""
+        self.run('apply', '--index', '-', input=patch, text=False)
+
+    def status(self, paths: Optional[List[str]] = None) -> Dict[str, List[str]]:
+        """Get staged, unstaged and untracked paths from a single porcelain call
+
+        With paths, only those are checked instead of the whole tree.
+        """
+        status = {'staged': [], 'unstaged': [], 'untracked': []}
+        if paths is not None and not paths:
+            return status
+        self._count_scanned(paths)
+        output = self.run('status', '--porcelain=v2', '-z', '--untracked-files=all',
+                          '--', *_literal(paths or []), scan=True).stdout
+
+        entries = iter(output.split('\0'))
+        for entry in entries:
+            if not entry:
+                continue
+            kind = entry[0]
+            if kind == '?':
+                status['untracked'].append(entry[2:])
+            elif kind in ('1', '2', 'u'):
+                # Ordinary, renamed/copied and unmerged entries have 8, 9 and
+                # 10 space-separated fields before the path respectively
+                fields = {'1': 8, '2': 9, 'u': 10}[kind]
+                parts = entry.split(' ', fields)
+                xy, path = parts[1], parts[fields]
+                if kind == '2':
+                    next(entries, None)  # original path of the rename
+                if xy[0] != '.':
+                    status['staged'].append(path)
+                if xy[1] != '.':
+                    status['unstaged'].append(path)
+        return status
+
+    def numstat(self, paths: Optional[List[str]] = None, staged: bool = False) -> Dict[str, Tuple[str, str]]:
+        """Get added/deleted line counts, optionally only for some paths
+
+        Staged counts compare the index with HEAD; the others compare the
+        working tree with the index, as `git status` does.
+        """
+        stats = {}
+        if paths is not None and not paths:
+            return stats
+        if staged:
+            # Compares the index only, so no working tree paths are checked
+            result = self.run('diff', '--cached', 'HEAD', '--numstat', '-z', '--', *_literal(paths or []),
+                              check=False)
+        else:
+            self._count_scanned(paths)
+            result = self.run('diff', '--numstat', '-z', '--', *_literal(paths or []), check=False, scan=True)
+
+        entries = iter(result.stdout.split('\0'))
+        for entry in entries:
+            if not entry:
+                continue
+            added, deleted, path = entry.split('\t', 2)
+            if not path:
+                # Renames are followed by the old and new path as separate entries
+                next(entries, None)
+                path = next(entries, '')
+            stats[path] = (added, deleted)
+        return stats
+
+    def changes_summary(self, paths: Optional[List[str]] = None) -> str:
+        """Describe staged, unstaged and untracked changes as markdown, optionally only to some paths
+
+        Which paths changed comes from the one porcelain status call. Line
+        counts need up to two numstat calls on top, since no single git
+        command reports index-vs-HEAD and working-tree-vs-index counts
+        apart; each runs only when its section is not empty, and the staged
+        one reads the index alone.
+        """
+        status = self.status(paths)
+        staged = self.numstat(status['staged'] if paths is not None else None, staged=True) if status['staged'] else {}
+        unstaged = self.numstat(status['unstaged'] if paths is not None else None) if status['unstaged'] else {}
+
+        def describe(path: str, stats: Dict[str, Tuple[str, str]]) -> str:
+            added, deleted = stats.get(path, ('-', '-'))
+            return f"- {path} (+{added}/-{deleted})"
+
+        changes = []
+
+        if status['staged']:
+            changes.append("**Staged changes:**")
+            changes.append('\n'.join(describe(path, staged) for path in status['staged']))
+
+        if status['unstaged']:
+            changes.append("**Unstaged changes:**")
+            changes.append('\n'.join(describe(path, unstaged) for path in status['unstaged']))
+
+        if status['untracked']:
+            changes.append("**New files:**")
+            changes.append('\n'.join(f"- {path}" for path in status['untracked']))
+
+        if not changes:
+            changes.append("No changes detected")
+
+        return '\n\n'.join(changes)
+
+    def _count_scanned(self, paths: Optional[List[str]]) -> None:
+        """Count the paths a command checks: the given ones, or every entry in the index"""
+        if paths is not None:
+            profiler.count('paths_scanned', len(paths))
+            return
+        # Each worktree has its own index; workspaces from for_path() are
+        # short-lived, so the paths are kept with the shared facts
+        index_paths = self._shared.setdefault('index_paths', {})
+        index = index_paths.get(self.path)
+        if index is None:
+            index = index_paths[self.path] = self.path / self.run('rev-parse', '--git-path', 'index').stdout.strip()
+        try:
+            with open(index, 'rb') as handle:
+                header = handle.read(12)
+        except OSError:
+            return
+        if len(header) == 12:
+            # DIRC signature, version, entry count
+            profiler.count('paths_scanned', struct.unpack('>I', header[8:])[0])
+
+
+def _literal(paths: List[str]) -> List[str]:
+    """Pathspecs matching exactly these paths, even with glob characters in them"""
+    return [f":(literal){path}" for path in paths]
@@ -1,31 +1,84 @@
 """GitHub API client for zezployee"""
 
+import hashlib
 import os
 import subprocess
-from github import Github
-from typing import List, Dict, Any
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+
+from .git_workspace import GitWorkspace
+from .issue_cache import IssueCache
+from .issue_clustering import covered_issues
+from .paths import state_dir, user_cache_dir
+from .profiling import profiler
+from .transport import GitHubTransport
+
+
+ISSUES_QUERY = """
+query($owner: String!, $name: String!, $cursor: String, $states: [IssueState!], $since: DateTime) {
+  repository(owner: $owner, name: $name) {
+    issues(first: 100, after: $cursor, states: $states, filterBy: {since: $since},
+           orderBy: {field: UPDATED_AT, direction: ASC}) {
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        number
+        title
+        body
+        state
+        createdAt
+        updatedAt
+        url
+        labels(first: 20) { nodes { name } }
+        assignees(first: 1) { nodes { login } }
+      }
+    }
+  }
+}
+"""
 
 
 class GitHubClient:
-    def __init__(self, token: str):
-        self.github = Github(token)
+    def __init__(self, token: str, backend: str = 'rest', workspace: Optional[GitWorkspace] = None,
+                 pool_size: int = 16):
+        if backend not in ('rest', 'graphql'):
+            raise ValueError(f"Unknown issue backend: {backend}")
+        
+        self.workspace = workspace or GitWorkspace()
+        self.backend = backend
+        self.api_url = os.getenv('GITHUB_API_URL', 'https://api.github.com').rstrip('/')
+        self.graphql_url = os.getenv('GITHUB_GRAPHQL_URL') or self._default_graphql_url()
+        
+        # Rate limits belong to the token, so every process and repository
+        # using the same token shares one bucket
+        token_id = hashlib.sha256(token.encode()).hexdigest()[:16]
+        self.transport = GitHubTransport(
+            token,
+            self.api_url,
+            user_cache_dir() / f"ratelimit-{token_id}.json",
+            pool_size=pool_size
+        )
         self.repo = None
-        self._setup_repo()
+        with profiler.span('repo_setup'):
+            self._setup_repo()
+    
+    def _default_graphql_url(self) -> str:
+        """Derive the GraphQL endpoint from the REST API URL"""
+        if self.api_url.endswith('/api/v3'):
+            # GitHub Enterprise Server
+            return self.api_url[:-len('/v3')] + '/graphql'
+        return f"{self.api_url}/graphql"
     
     def _setup_repo(self):
         """Get repository info from git remote"""
         try:
             # Get remote URL
-            result = subprocess.run(
-                ['git', 'remote', 'get-url', 'origin'],
-                capture_output=True,
-                text=True,
-                check=True
-            )
-            remote_url = result.stdout.strip()
+            remote_url = self.workspace.remote_url
             
             # Parse GitHub repo from URL
-            if 'github.com' in remote_url:
+            if os.getenv('GITHUB_REPOSITORY'):
+                # Explicit owner/repo, e.g. for mirrors or a local fake server
+                self.repo = self._api('GET', f"/repos/{os.environ['GITHUB_REPOSITORY']}")
+            elif 'github.com' in remote_url:
                 if remote_url.startswith('git@'):
                     # SSH format: git@github.com:owner/repo.git
                     repo_part = remote_url.split(':')[1].replace('.git', '')
@@ -33,64 +86,233 @@ class GitHubClient:
                     # HTTPS format: https://github.com/owner/repo.git
                     repo_part = remote_url.split('github.com/')[1].replace('.git', '')
                 
-                self.repo = self.github.get_repo(repo_part)
+                self.repo = self._api('GET', f"/repos/{repo_part}")
             else:
                 raise ValueError("Not a GitHub repository")
                 
         except subprocess.CalledProcessError:
             raise ValueError("Could not get git remote URL")
     
+    def _api(self, method: str, path: str, **kwargs: Any) -> Any:
+        """Call a REST endpoint and return its decoded JSON body"""
+        response = self.transport.request(method, path, **kwargs)
+        if response.status_code >= 400:
+            try:
+                message = response.json().get('message', response.text)
+            except ValueError:
+                message = response.text
+            raise RuntimeError(f"GitHub API {method} {path} failed ({response.status_code}): {message}")
+        return response.json() if response.content else None
+    
     def get_repo_info(self) -> Dict[str, Any]:
         """Get repository information"""
         return {
-            'full_name': self.repo.full_name,
-            'name': self.repo.name,
-            'owner': self.repo.owner.login,
-            'url': self.repo.html_url
+            'full_name': self.repo['full_name'],
+            'name': self.repo['name'],
+            'owner': self.repo['owner']['login'],
+            'url': self.repo['html_url']
         }
     
-    def get_open_issues(self) -> List[Dict[str, Any]]:
-        """Get all open issues for the repository"""
-        issues = []
-        for issue in self.repo.get_issues(state='open'):
-            # Skip pull requests (they appear as issues in GitHub API)
-            if issue.pull_request is None:
-                issues.append({
-                    'number': issue.number,
-                    'title': issue.title,
-                    'body': issue.body or '',
-                    'labels': [label.name for label in issue.labels],
-                    'assignee': issue.assignee.login if issue.assignee else None,
-                    'created_at': issue.created_at,
-                    'url': issue.html_url
-                })
-        return issues
+    def get_open_issues(self, refresh: bool = False) -> List[Dict[str, Any]]:
+        """Get all open issues, syncing only what changed into the local cache"""
+        with profiler.span('get_open_issues', backend=self.backend) as span:
+            cache = IssueCache(state_dir() / 'issues.sqlite3')
+            try:
+                if refresh:
+                    cache.clear()
+                self._sync_issue_cache(cache)
+                issues = cache.open_issues()
+                span.attrs['issues'] = len(issues)
+                return issues
+            finally:
+                cache.close()
+    
+    def _sync_issue_cache(self, cache: IssueCache) -> None:
+        """Fetch issues updated since the last sync and merge them into the cache"""
+        since = cache.get_meta('since')
+        if self.backend == 'graphql':
+            cache.apply(self._fetch_issues_graphql(since))
+            return
+        
+        url = f"/repos/{self.repo['full_name']}/issues"
+        if since:
+            # Closed issues must come back too so they can drop out of the cache
+            params = {'state': 'all', 'since': since, 'sort': 'updated', 'direction': 'asc'}
+        else:
+            params = {'state': 'open'}
+        params['per_page'] = 100
+        
+        # `since` is inclusive, so an unchanged repo returns the same first page
+        # again and the conditional request is answered with a free 304
+        headers = {}
+        etag = cache.get_meta('etag')
+        if since and etag and cache.get_meta('etag_since') == since:
+            headers['If-None-Match'] = etag
+        
+        response = self.transport.get(url, params=params, headers=headers)
+        if response.status_code == 304:
+            return
+        response.raise_for_status()
+        first_etag = response.headers.get('ETag')
+        
+        def pages():
+            page = response
+            while True:
+                yield from page.json()
+                next_url = page.links.get('next', {}).get('url')
+                if not next_url:
+                    return
+                page = self.transport.get(next_url)
+                page.raise_for_status()
+        
+        cache.apply(pages())
+        if since and first_etag:
+            cache.set_meta('etag', first_etag)
+            cache.set_meta('etag_since', since)
+    
+    def _fetch_issues_graphql(self, since: Optional[str] = None):
+        """Yield issues page by page from one GraphQL query, in REST payload shape
+
+        The `issues` connection never contains pull requests, so they are
+        excluded on the server instead of being filtered here.
+        """
+        owner, name = self.repo['full_name'].split('/', 1)
+        variables = {
+            'owner': owner,
+            'name': name,
+            'cursor': None,
+            # Closed issues must come back too so they can drop out of the cache
+            'states': ['OPEN', 'CLOSED'] if since else ['OPEN'],
+            'since': since
+        }
+        
+        while True:
+            response = self.transport.post(
+                self.graphql_url,
+                json={'query': ISSUES_QUERY, 'variables': variables}
+            )
+            response.raise_for_status()
+            payload = response.json()
+            if payload.get('errors'):
+                messages = '; '.join(error.get('message', '') for error in payload['errors'])
+                raise RuntimeError(f"GitHub GraphQL query failed: {messages}")
+            
+            connection = payload['data']['repository']['issues']
+            for node in connection['nodes']:
+                assignees = node['assignees']['nodes']
+                yield {
+                    'number': node['number'],
+                    'title': node['title'],
+                    'body': node['body'],
+                    'state': node['state'].lower(),
+                    'labels': node['labels']['nodes'],
+                    'assignee': assignees[0] if assignees else None,
+                    'created_at': node['createdAt'],
+                    'updated_at': node['updatedAt'],
+                    'html_url': node['url']
+                }
+            
+            if not connection['pageInfo']['hasNextPage']:
+                return
+            variables['cursor'] = connection['pageInfo']['endCursor']
     
     def create_branch(self, branch_name: str) -> None:
         """Create and checkout a new branch"""
+        with profiler.span('create_branch'):
+            self._create_branch(branch_name)
+    
+    def _create_branch(self, branch_name: str) -> None:
+        """Create and checkout a new branch from the current one"""
         try:
-            # Get current branch to base new branch on
-            current_branch = subprocess.run(
-                ['git', 'branch', '--show-current'],
-                capture_output=True,
-                text=True,
-                check=True
-            ).stdout.strip()
-            
-            # Create and checkout new branch
-            subprocess.run(['git', 'checkout', '-b', branch_name], check=True)
+            # Create and checkout new branch from the current one
+            self.workspace.run('checkout', '-b', branch_name, capture=False)
             
         except subprocess.CalledProcessError as e:
             raise RuntimeError(f"Failed to create branch {branch_name}: {e}")
     
-    def create_pull_request(self, branch_name: str, issue: Dict[str, Any], changes: str) -> str:
-        """Create a pull request for the issue"""
+    def create_worktree(self, branch_name: str, path: Path, reset: bool = False) -> None:
+        """Create a new branch checked out in an isolated worktree at path
+
+        With reset, a branch or worktree left behind by an interrupted run is
+        discarded and recreated from HEAD.
+        """
+        with profiler.span('create_worktree'):
+            self._create_worktree(branch_name, path, reset)
+    
+    def _create_worktree(self, branch_name: str, path: Path, reset: bool) -> None:
+        """Add the worktree for create_worktree()"""
+        try:
+            if reset:
+                self.workspace.run('worktree', 'remove', '--force', str(path), check=False)
+                self.workspace.run('worktree', 'prune')
+            self.workspace.run('worktree', 'add', '-B' if reset else '-b', branch_name, str(path), 'HEAD')
+        except subprocess.CalledProcessError as e:
+            raise RuntimeError(f"Failed to create worktree for {branch_name}: {e.stderr.strip() or e}")
+    
+    def remove_worktree(self, path: Path) -> None:
+        """Remove a worktree, keeping its branch"""
+        self.workspace.run('worktree', 'remove', '--force', str(path), check=False)
+    
+    def create_pull_request(self, branch_name: str, issue: Dict[str, Any], changes: str,
+                            cwd: Optional[Path] = None, paths: Optional[List[str]] = None) -> str:
+        """Commit, push and open a pull request for the issue"""
         # First, commit any changes made by Claude Code
-        self._commit_changes(issue)
+        self._commit_changes(issue, cwd=cwd, paths=paths)
         
+        # Configure Git to use token for authentication
+        self._configure_git_auth()
+        
+        self.push_branch(branch_name, cwd=cwd)
+        return self.open_pull_request(branch_name, issue, changes)
+    
+    def push_branch(self, branch_name: str, cwd: Optional[Path] = None) -> None:
+        """Push a branch to origin"""
+        try:
+            with profiler.span('git_push'):
+                self.workspace.for_path(cwd).run('push', '-u', 'origin', branch_name, capture=False)
+        except subprocess.CalledProcessError as e:
+            raise RuntimeError(f"Failed to push branch {branch_name}. Make sure your GitHub token has push permissions: {e}")
+    
+    def push_branches(self, branch_names: List[str]) -> Dict[str, Optional[str]]:
+        """Push several branches to origin in one `git push`, returning an error (or None) per branch
+
+        One push negotiates a single connection for all refspecs; the
+        porcelain output tells which refs were rejected.
+        """
+        with profiler.span('git_push', branches=len(branch_names)):
+            result = self.workspace.run('push', '--porcelain', '-u', 'origin', *branch_names, check=False)
+        
+        fallback = result.stderr.strip() or f"git push exited with {result.returncode}"
+        errors: Dict[str, Optional[str]] = {name: f"Failed to push: {fallback}" for name in branch_names}
+        reported = False
+        for line in result.stdout.splitlines():
+            # <flag> TAB <from>:<to> TAB <summary>
+            fields = line.split('\t')
+            if len(fields) < 3 or ':' not in fields[1]:
+                continue
+            ref = fields[1].split(':', 1)[0]
+            name = ref[len('refs/heads/'):] if ref.startswith('refs/heads/') else ref
+            if name in errors:
+                errors[name] = f"Push rejected: {fields[2]}" if fields[0].strip() == '!' else None
+                reported = True
+        
+        if result.returncode != 0 and not reported and len(branch_names) > 1:
+            # The push failed before any ref was tried, e.g. on a missing
+            # branch; push one by one so only the culprit fails
+            for name in branch_names:
+                errors.update(self.push_branches([name]))
+        return errors
+    
+    def open_pull_request(self, branch_name: str, issue: Dict[str, Any], changes: str) -> str:
+        """Open a pull request for an already pushed branch"""
         title = f"Fix issue #{issue['number']}: {issue['title']}"
+        if issue.get('batched'):
+            title += f" (+{len(issue['batched'])} related)"
         
-        body = f"""Fixes #{issue['number']}
+        # One closing keyword per issue, so merging closes every duplicate too
+        fixes = '\n'.join(f"Fixes #{member['number']}" for member in covered_issues(issue))
+        
+        body = f"""{fixes}
 
 ## Changes Made
 {changes}
@@ -102,38 +324,51 @@ class GitHubClient:
 
 Co-Authored-By: Claude <noreply@anthropic.com>"""
         
-        # Configure Git to use token for authentication
-        self._configure_git_auth()
-        
-        # Push branch to remote
-        try:
-            subprocess.run(['git', 'push', '-u', 'origin', branch_name], check=True)
-        except subprocess.CalledProcessError as e:
-            raise RuntimeError(f"Failed to push branch {branch_name}. Make sure your GitHub token has push permissions: {e}")
-        
         # Create PR
-        pr = self.repo.create_pull(
-            title=title,
-            body=body,
-            head=branch_name,
-            base='main'
-        )
+        with profiler.span('create_pull'):
+            pr = self._api('POST', f"/repos/{self.repo['full_name']}/pulls", json={
+                'title': title,
+                'body': body,
+                'head': branch_name,
+                'base': self.workspace.base_branch
+            })
         
-        return pr.html_url
+        return pr['html_url']
+    
+    def find_pull_request(self, branch_name: str) -> Optional[str]:
+        """Get the URL of an open pull request for a branch, if there is one"""
+        pulls = self._api('GET', f"/repos/{self.repo['full_name']}/pulls", params={
+            'state': 'open',
+            'head': f"{self.repo['owner']['login']}:{branch_name}"
+        })
+        return pulls[0]['html_url'] if pulls else None
     
-    def _commit_changes(self, issue: Dict[str, Any]) -> None:
-        """Commit any changes made by Claude Code"""
+    def _commit_changes(self, issue: Dict[str, Any], cwd: Optional[Path] = None,
+                        paths: Optional[List[str]] = None) -> bool:
+        """Commit any changes made by Claude Code, returning whether a commit was made
+
+        paths are the files Claude wrote or edited, when known; then only
+        they are checked and staged, rather than the whole tree.
+        """
+        with profiler.span('commit_changes'):
+            return self._commit_changes_in(issue, cwd, paths)
+    
+    def _commit_changes_in(self, issue: Dict[str, Any], cwd: Optional[Path],
+                           paths: Optional[List[str]] = None) -> bool:
+        """Stage and commit everything, or the given paths, in the given checkout"""
+        workspace = self.workspace.for_path(cwd)
         try:
-            # Add all changes (staged, unstaged, and untracked)
-            subprocess.run(['git', 'add', '.'], check=True)
-            
-            # Check if there are changes to commit
-            result = subprocess.run(
-                ['git', 'diff', '--cached', '--quiet'],
-                capture_output=True
-            )
+            if paths is not None:
+                # One status call scoped to the edited paths tells which changed
+                changed = workspace.stage(paths)
+            else:
+                # Add all changes (staged, unstaged, and untracked)
+                workspace.stage()
+                
+                # Check if there are changes to commit
+                changed = workspace.run('diff', '--cached', '--quiet', check=False).returncode != 0
             
-            if result.returncode != 0:  # There are staged changes
+            if changed:  # There are staged changes
                 commit_message = f"""Fix issue #{issue['number']}: {issue['title']}
 
 {issue['body'][:200]}{'...' if len(issue['body']) > 200 else ''}
@@ -142,13 +377,13 @@ Co-Authored-By: Claude <noreply@anthropic.com>"""
 
 Co-Authored-By: Claude <noreply@anthropic.com>"""
                 
-                subprocess.run([
-                    'git', 'commit', '-m', commit_message
-                ], check=True)
+                workspace.run('commit', '-m', commit_message, capture=False)
                 
                 print(f"✅ Committed changes for issue #{issue['number']}")
+                return True
             else:
                 print(f"ℹ️  No changes to commit for issue #{issue['number']}")
+                return False
                 
         except subprocess.CalledProcessError as e:
             raise RuntimeError(f"Failed to commit changes: {e}")
@@ -162,26 +397,20 @@ Co-Authored-By: Claude <noreply@anthropic.com>"""
         
         # Get the remote URL and convert to token-authenticated HTTPS
         try:
-            result = subprocess.run(
-                ['git', 'remote', 'get-url', 'origin'],
-                capture_output=True,
-                text=True,
-                check=True
-            )
-            remote_url = result.stdout.strip()
+            remote_url = self.workspace.remote_url
             
             # Convert SSH to HTTPS with token
             if remote_url.startswith('git@github.com:'):
                 # Convert git@github.com:owner/repo.git to https://token@github.com/owner/repo.git
                 repo_path = remote_url.replace('git@github.com:', '').replace('.git', '')
                 new_url = f"https://{token}@github.com/{repo_path}.git"
-                subprocess.run(['git', 'remote', 'set-url', 'origin', new_url], check=True)
+                self.workspace.set_remote_url(new_url)
                 print(f"🔧 Configured Git remote for token authentication")
             elif remote_url.startswith('https://github.com/'):
                 # Convert https://github.com/owner/repo.git to https://token@github.com/owner/repo.git  
                 repo_path = remote_url.replace('https://github.com/', '').replace('.git', '')
                 new_url = f"https://{token}@github.com/{repo_path}.git"
-                subprocess.run(['git', 'remote', 'set-url', 'origin', new_url], check=True)
+                self.workspace.set_remote_url(new_url)
                 print(f"🔧 Configured Git remote for token authentication")
                 
         except subprocess.CalledProcessError as e:
@@ -189,5 +418,4 @@ Co-Authored-By: Claude <noreply@anthropic.com>"""
     
     def close_issue(self, issue_number: int) -> None:
         """Close an issue"""
-        issue = self.repo.get_issue(issue_number)
-        issue.edit(state='closed')
\ No newline at end of file
+        self._api('PATCH', f"/repos/{self.repo['full_name']}/issues/{issue_number}", json={'state': 'closed'})
\ No newline at end of file
@@ -0,0 +1,103 @@
+"""Persistent local cache of open GitHub issues"""
+
+import json
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Iterable
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS issues (
+    number INTEGER PRIMARY KEY,
+    updated_at TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+class IssueCache:
+    def __init__(self, path: Path):
+        self.path = path
+        self.conn = sqlite3.connect(str(path))
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        """Close the underlying database"""
+        self.conn.close()
+
+    def clear(self) -> None:
+        """Drop every cached issue and sync marker"""
+        with self.conn:
+            self.conn.execute("DELETE FROM issues")
+            self.conn.execute("DELETE FROM meta")
+
+    def get_meta(self, key: str) -> Optional[str]:
+        """Read a sync marker such as the high-water `updated_at` or an ETag"""
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key: str, value: str) -> None:
+        """Store a sync marker"""
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value)
+            )
+
+    def apply(self, raw_issues: Iterable[Dict[str, Any]]) -> int:
+        """Merge REST issue payloads into the cache, returning how many were seen
+
+        Open issues are upserted; closed issues and pull requests are removed.
+        The high-water `updated_at` mark is advanced past everything seen.
+        """
+        seen = 0
+        high_water = self.get_meta('since') or ''
+        with self.conn:
+            for raw in raw_issues:
+                seen += 1
+                high_water = max(high_water, raw['updated_at'])
+                if raw.get('state') != 'open' or raw.get('pull_request') is not None:
+                    self.conn.execute("DELETE FROM issues WHERE number = ?", (raw['number'],))
+                    continue
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO issues (number, updated_at, data) VALUES (?, ?, ?)",
+                    (raw['number'], raw['updated_at'], json.dumps(self._slim(raw)))
+                )
+            if high_water:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('since', ?)", (high_water,)
+                )
+        return seen
+
+    def open_issues(self) -> List[Dict[str, Any]]:
+        """Get cached open issues, newest first, in the shape IssueSelector consumes"""
+        rows = self.conn.execute("SELECT data FROM issues ORDER BY number DESC")
+        issues = []
+        for (data,) in rows:
+            issue = json.loads(data)
+            issue['created_at'] = parse_timestamp(issue['created_at'])
+            issues.append(issue)
+        return issues
+
+    def _slim(self, raw: Dict[str, Any]) -> Dict[str, Any]:
+        """Keep only the fields zezployee uses from a REST issue payload"""
+        assignee = raw.get('assignee')
+        return {
+            'number': raw['number'],
+            'title': raw['title'],
+            'body': raw.get('body') or '',
+            'labels': [label['name'] for label in raw.get('labels', [])],
+            'assignee': assignee['login'] if assignee else None,
+            'created_at': raw['created_at'],
+            'updated_at': raw['updated_at'],
+            'url': raw['html_url']
+        }
+
+
+def parse_timestamp(value: str) -> datetime:
+    """Parse a GitHub ISO 8601 timestamp into an aware datetime"""
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
@@ -0,0 +1,214 @@
+"""Grouping of near-duplicate and small related issues before solving
+
+Near-duplicates are found with MinHash over word bigrams of each issue's
+title and body. Signatures are computed for all issues at once in NumPy
+and bucketed with locality-sensitive hashing, so only issues sharing a
+bucket are compared. The oldest issue of each cluster is solved, and the
+others ride along as its `duplicates`.
+"""
+
+from typing import List, Dict, Any, Optional
+
+
+# Jaccard similarity of word bigrams above which two issues are duplicates
+DEFAULT_THRESHOLD = 0.6
+
+# MinHash signature length, split into LSH bands of equal width
+NUM_HASHES = 64
+BANDS = 16
+
+# Only the start of long bodies is compared; duplicates agree early on
+MAX_CHARS = 2000
+
+# Issues with bodies shorter than this can share a session with others
+SMALL_ISSUE_CHARS = 600
+
+# Fixed so clusters are stable from run to run
+SEED = 0x5EED
+
+
+def group_issues(issues: List[Dict[str, Any]], threshold: Optional[float] = DEFAULT_THRESHOLD,
+                 index=None, batch_size: int = 0) -> List[Dict[str, Any]]:
+    """Fold duplicates into one issue per cluster, then optionally batch small issues by area
+
+    A threshold of None skips duplicate detection. Returned issues are
+    copies; the ones standing for a group carry the folded issues under
+    `duplicates` and `batched`.
+    """
+    grouped = cluster_duplicates(issues, threshold) if threshold is not None else list(issues)
+    if index is not None and batch_size > 1:
+        grouped = batch_by_area(grouped, index, batch_size)
+    return grouped
+
+
+def cluster_duplicates(issues: List[Dict[str, Any]], threshold: float = DEFAULT_THRESHOLD) -> List[Dict[str, Any]]:
+    """Fold near-duplicate issues into the oldest issue of their cluster"""
+    if len(issues) < 2:
+        return [dict(issue) for issue in issues]
+
+    signatures = minhash_signatures([f"{issue['title']}\n{issue['body'] or ''}" for issue in issues])
+    parents = list(range(len(issues)))
+
+    def find(i: int) -> int:
+        while parents[i] != i:
+            parents[i] = parents[parents[i]]
+            i = parents[i]
+        return i
+
+    for a, b in _similar_pairs(signatures, threshold):
+        root_a, root_b = find(a), find(b)
+        if root_a != root_b:
+            parents[max(root_a, root_b)] = min(root_a, root_b)
+
+    clusters: Dict[int, List[Dict[str, Any]]] = {}
+    for i, issue in enumerate(issues):
+        clusters.setdefault(find(i), []).append(issue)
+
+    grouped = []
+    for i, issue in enumerate(issues):
+        members = clusters.get(i)
+        if members is None:
+            continue
+        primary, *duplicates = sorted(members, key=lambda member: member['number'])
+        primary = dict(primary)
+        if duplicates:
+            primary['duplicates'] = duplicates
+        grouped.append(primary)
+    return grouped
+
+
+def batch_by_area(issues: List[Dict[str, Any]], index, batch_size: int) -> List[Dict[str, Any]]:
+    """Merge small issues whose best-matching file is the same, up to batch_size per session"""
+    areas: Dict[str, List[Dict[str, Any]]] = {}
+    for issue in issues:
+        if issue.get('duplicates') or len(issue['body'] or '') >= SMALL_ISSUE_CHARS:
+            continue
+        ranked = index.rank(' '.join([issue['title'], issue['body'] or '', *issue['labels']]), limit=1)
+        if ranked:
+            areas.setdefault(ranked[0][0], []).append(issue)
+
+    absorbed = set()
+    leaders: Dict[int, List[Dict[str, Any]]] = {}
+    for members in areas.values():
+        members = sorted(members, key=lambda member: member['number'])
+        for start in range(0, len(members), batch_size):
+            chunk = members[start:start + batch_size]
+            if len(chunk) > 1:
+                leaders[chunk[0]['number']] = chunk[1:]
+                absorbed.update(member['number'] for member in chunk[1:])
+
+    batched = []
+    for issue in issues:
+        if issue['number'] in absorbed:
+            continue
+        if issue['number'] in leaders:
+            issue = dict(issue, batched=leaders[issue['number']])
+        batched.append(issue)
+    return batched
+
+
+def covered_issues(issue: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Get every issue a solution for this one also resolves, itself first"""
+    return [issue, *issue.get('duplicates', []), *issue.get('batched', [])]
+
+
+def minhash_signatures(texts: List[str], num_hashes: int = NUM_HASHES):
+    """Compute a MinHash signature over word bigrams for each text
+
+    Returns a (len(texts), num_hashes) uint32 array. Words are split and
+    hashed on the raw bytes in NumPy, so no per-word Python objects are made.
+    """
+    import numpy as np
+
+    encoded = [text[:MAX_CHARS].encode('utf-8', 'replace') for text in texts]
+    sizes = np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded))
+    text_starts = np.concatenate(([0], np.cumsum(sizes + 1)[:-1]))
+    # Newlines separate the texts, so no word spans two of them
+    data = np.frombuffer(b'\n'.join(encoded).lower(), dtype=np.uint8)
+
+    # Letters, digits and any non-ASCII byte make up words
+    word_bytes = np.zeros(256, dtype=bool)
+    word_bytes[list(b'abcdefghijklmnopqrstuvwxyz0123456789')] = True
+    word_bytes[128:] = True
+    in_word = word_bytes[data]
+    starts_word = in_word & ~np.concatenate(([False], in_word[:-1]))
+    word_starts = np.flatnonzero(starts_word)
+
+    # Polynomial hash of each word: sum of byte * base ** offset, wrapping at 2 ** 64
+    chars = np.flatnonzero(in_word)
+    first_chars = np.flatnonzero(starts_word[chars])
+    offsets = np.arange(len(chars)) - np.repeat(first_chars, np.diff(first_chars, append=len(chars)))
+    np.minimum(offsets, 63, out=offsets)
+    with np.errstate(over='ignore'):
+        powers = np.cumprod(np.full(64, 0x100000001B3, dtype=np.uint64))
+        values = (data[chars].astype(np.uint64) + np.uint64(1)) * powers[offsets]
+        hashes = np.add.reduceat(values, first_chars) if len(chars) else np.zeros(0, dtype=np.uint64)
+        hashes = (hashes ^ (hashes >> np.uint64(29))) * np.uint64(0xBF58476D1CE4E5B9)
+
+    owners = np.searchsorted(text_starts, word_starts, side='right') - 1
+    lengths = np.bincount(owners, minlength=len(texts))
+
+    # Bigrams never span two texts
+    same = owners[:-1] == owners[1:]
+    with np.errstate(over='ignore'):
+        bigrams = (hashes[:-1] * np.uint64(0x9E3779B97F4A7C15) ^ hashes[1:])[same]
+    bigram_owners = owners[:-1][same]
+
+    # Texts too short for a bigram get their only word or, when empty, a
+    # value of their own so that empty issues never cluster together
+    short = np.flatnonzero(lengths < 2)
+    with np.errstate(over='ignore'):
+        singles = (short.astype(np.uint64) + np.uint64(1)) * np.uint64(0xD6E8FEB86659FD93)
+    one_word = lengths[short] == 1
+    first_words = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    singles[one_word] = hashes[first_words[short[one_word]]]
+
+    # The high half of each shingle hash is plenty for MinHash and halves
+    # the memory traffic of the loop below
+    shingles = (np.concatenate((bigrams, singles)) >> np.uint64(32)).astype(np.uint32)
+    shingle_owners = np.concatenate((bigram_owners, short))
+    order = np.argsort(shingle_owners, kind='stable')
+    shingles = shingles[order]
+    segments = np.searchsorted(shingle_owners[order], np.arange(len(texts)))
+
+    # Multiply-add hashing with an odd multiplier per hash function; the
+    # minimum compares whole words, so the well-mixed high bits decide
+    rng = np.random.default_rng(SEED)
+    multipliers = rng.integers(0, 2 ** 31, size=num_hashes, dtype=np.uint32) * np.uint32(2) + np.uint32(1)
+    addends = rng.integers(0, 2 ** 32, size=num_hashes, dtype=np.uint32)
+
+    signatures = np.empty((len(texts), num_hashes), dtype=np.uint32)
+    permuted = np.empty_like(shingles)
+    with np.errstate(over='ignore'):
+        for k in range(num_hashes):
+            np.multiply(shingles, multipliers[k], out=permuted)
+            np.add(permuted, addends[k], out=permuted)
+            signatures[:, k] = np.minimum.reduceat(permuted, segments)
+    return signatures
+
+
+def _similar_pairs(signatures, threshold: float):
+    """Yield index pairs that share an LSH bucket and whose signatures agree enough"""
+    import numpy as np
+
+    count, num_hashes = signatures.shape
+    rows = num_hashes // BANDS
+    mixers = np.array([0x9E3779B97F4A7C15 >> shift for shift in range(rows)], dtype=np.uint64) | np.uint64(1)
+
+    for band in range(BANDS):
+        with np.errstate(over='ignore'):
+            keys = (signatures[:, band * rows:(band + 1) * rows] * mixers).sum(axis=1, dtype=np.uint64)
+        order = np.argsort(keys, kind='stable')
+        sorted_keys = keys[order]
+
+        # Compare each bucket member with the first one; the union-find
+        # joins the rest of the bucket transitively
+        new_bucket = np.concatenate(([True], sorted_keys[1:] != sorted_keys[:-1]))
+        if new_bucket.all():
+            continue
+        firsts = order[np.maximum.accumulate(np.where(new_bucket, np.arange(count), 0))]
+        members = np.flatnonzero(~new_bucket)
+        a, b = firsts[members], order[members]
+        agreement = (signatures[a] == signatures[b]).mean(axis=1)
+        keep = agreement >= threshold
+        yield from zip(a[keep].tolist(), b[keep].tolist())
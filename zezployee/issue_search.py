@@ -0,0 +1,179 @@
+"""In-memory search index over issues for the interactive selector
+
+Free text is matched fuzzily through a trigram index over each issue's
+title and the start of its body. `label:`, `assignee:` and `age:` filters
+use inverted indexes. The index is built once, in NumPy, and each query
+is a handful of array operations, so results can refresh on every keystroke
+even with tens of thousands of issues.
+"""
+
+from datetime import datetime, timezone
+from typing import List, Dict, Any, Tuple
+
+
+# Only the start of the body is indexed; titles carry most of the signal
+BODY_CHARS = 200
+
+# Share of the query's trigrams an issue must contain to match
+FUZZY_MATCH = 0.75
+
+# Age buckets for `age:` filters, as (name, maximum age in days)
+AGE_BUCKETS = (('today', 1), ('week', 7), ('month', 31), ('quarter', 92), ('year', 366), ('older', None))
+
+FILTER_PREFIXES = ('label:', 'assignee:', 'age:')
+
+
+def _normalize_table():
+    """Byte map: lowercase letters and digits kept, other ASCII to space, newline to 0"""
+    import numpy as np
+
+    table = np.full(256, ord(' '), dtype=np.uint8)
+    for char in b'abcdefghijklmnopqrstuvwxyz0123456789':
+        table[char] = char
+    table[128:] = np.arange(128, 256, dtype=np.uint8)
+    table[ord('\n')] = 0
+    return table
+
+
+def _first_of_runs(values):
+    """Mask of the elements of a sorted array that differ from their predecessor"""
+    import numpy as np
+
+    return np.concatenate(([True], values[1:] != values[:-1])) if len(values) else np.zeros(0, dtype=bool)
+
+
+def _distinct(values):
+    """Deduplicate a sorted array
+
+    Cheaper than np.unique, whose first call also imports numpy.ma, long
+    enough to be felt on the first keystroke.
+    """
+    return values[_first_of_runs(values)]
+
+
+class IssueIndex:
+    """Trigram and facet indexes over a list of issues, in their given order"""
+
+    def __init__(self, issues: List[Dict[str, Any]], now: datetime = None):
+        import numpy as np
+
+        self.issues = issues
+        self._table = _normalize_table()
+        count = len(issues)
+
+        # Trigram codes for every position of the concatenated texts
+        encoded = [
+            f"{issue['title']} {(issue['body'] or '')[:BODY_CHARS]}".replace('\n', ' ').lower().encode('utf-8', 'replace')
+            for issue in issues
+        ]
+        sizes = np.fromiter(map(len, encoded), dtype=np.int64, count=count)
+        starts = np.concatenate(([0], np.cumsum(sizes + 1)[:-1])) if count else np.zeros(0, dtype=np.int64)
+        data = self._table[np.frombuffer(b'\n'.join(encoded), dtype=np.uint8)]
+        codes = self._trigrams(data)
+        positions = np.flatnonzero(codes >= 0)
+        owners = np.searchsorted(starts, positions, side='right') - 1
+
+        # Postings: one sorted run of issue ids per distinct trigram
+        keys = _distinct(np.sort(codes[positions] * max(count, 1) + owners))
+        posting_codes = keys // max(count, 1)
+        self._postings = keys % max(count, 1)
+        firsts = np.flatnonzero(_first_of_runs(posting_codes))
+        self._codes = posting_codes[firsts]
+        self._offsets = np.append(firsts, len(keys))
+
+        # Facets
+        self._labels: Dict[str, List[int]] = {}
+        self._assignees: Dict[str, List[int]] = {}
+        for position, issue in enumerate(issues):
+            for label in issue['labels']:
+                self._labels.setdefault(label.lower(), []).append(position)
+            if issue.get('assignee'):
+                self._assignees.setdefault(issue['assignee'].lower(), []).append(position)
+
+        now = now or datetime.now(timezone.utc)
+        self.ages = np.array([self._age_days(issue, now) for issue in issues], dtype=np.int64)
+        self._age_buckets: Dict[str, Any] = {}
+        lower = 0
+        for name, upper in AGE_BUCKETS:
+            in_bucket = self.ages >= lower if upper is None else (self.ages >= lower) & (self.ages < upper)
+            self._age_buckets[name] = np.flatnonzero(in_bucket)
+            lower = upper or lower
+
+    def __len__(self) -> int:
+        return len(self.issues)
+
+    def search(self, query: str):
+        """Get the positions of matching issues, best first, as a NumPy array
+
+        Words like `label:bug`, `assignee:alice` or `age:week` filter; the
+        rest is matched fuzzily against titles and bodies.
+        """
+        import numpy as np
+
+        count = len(self.issues)
+        mask = np.ones(count, dtype=bool)
+        words = []
+        for word in query.split():
+            lowered = word.lower()
+            if lowered.startswith(FILTER_PREFIXES) and ':' in lowered[:-1]:
+                mask &= self._filter_mask(lowered)
+            else:
+                words.append(word)
+
+        text = ' '.join(words)
+        if len(text) < 3:
+            return np.flatnonzero(mask)
+
+        # Count the query's trigrams found in each issue
+        wanted = self._trigrams(self._table[np.frombuffer(text.lower().encode('utf-8', 'replace'), dtype=np.uint8)])
+        wanted = _distinct(np.sort(wanted[wanted >= 0]))
+        slots = np.minimum(np.searchsorted(self._codes, wanted), max(len(self._codes) - 1, 0))
+        slots = slots[self._codes[slots] == wanted] if len(self._codes) else slots[:0]
+        if len(slots) == 0:
+            return np.zeros(0, dtype=np.int64)
+        hits = np.concatenate([self._postings[self._offsets[slot]:self._offsets[slot + 1]] for slot in slots])
+        scores = np.bincount(hits, minlength=count)
+
+        needed = max(1, int(np.ceil(FUZZY_MATCH * len(wanted))))
+        matches = np.flatnonzero(mask & (scores >= needed))
+        # Best score first; ties keep the given order (newest first)
+        return matches[np.argsort(-scores[matches], kind='stable')]
+
+    def facets(self) -> Tuple[List[str], List[str]]:
+        """Known labels and assignees, for hints"""
+        return sorted(self._labels), sorted(self._assignees)
+
+    def _filter_mask(self, word: str):
+        """Which issues a `label:`, `assignee:` or `age:` word keeps, as a boolean array"""
+        import numpy as np
+
+        prefix, value = word.split(':', 1)
+        if prefix == 'label':
+            positions = self._labels.get(value, [])
+        elif prefix == 'assignee':
+            positions = self._assignees.get(value.lstrip('@'), [])
+        else:
+            positions = self._age_buckets.get(value, [])
+        mask = np.zeros(len(self.issues), dtype=bool)
+        mask[positions] = True
+        return mask
+
+    def _trigrams(self, data):
+        """Trigram code at each position, or -1 where the trigram spans two texts"""
+        import numpy as np
+
+        if len(data) < 3:
+            return np.zeros(0, dtype=np.int64)
+        wide = data.astype(np.int64)
+        codes = (wide[:-2] << 16) | (wide[1:-1] << 8) | wide[2:]
+        codes[(data[:-2] == 0) | (data[1:-1] == 0) | (data[2:] == 0)] = -1
+        return codes
+
+    def _age_days(self, issue: Dict[str, Any], now: datetime) -> int:
+        """Whole days since the issue was opened; 0 when its creation time is unknown"""
+        created_at = issue.get('created_at')
+        if not isinstance(created_at, datetime):
+            return 0
+        if created_at.tzinfo is None:
+            created_at = created_at.replace(tzinfo=timezone.utc)
+        return max(0, (now - created_at).days)
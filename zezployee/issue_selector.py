@@ -1,78 +1,317 @@
 """Interactive issue selection interface"""
 
-import click
-from rich.console import Console
-from rich.table import Table
-from rich.prompt import Prompt
-from typing import List, Dict, Any, Optional
+import gc
+import os
+import sys
+from contextlib import contextmanager
+from typing import List, Dict, Any, Optional, Set, Tuple
+
+
+# Terminal lines left over for the title, header, search line and key help
+CHROME_LINES = 9
+
+KEYS = {
+    b'\x1b[A': 'up', b'\x1bOA': 'up', b'\x1b[B': 'down', b'\x1bOB': 'down',
+    b'\x1b[5~': 'page_up', b'\x1b[6~': 'page_down', b'\x1b[H': 'home', b'\x1b[F': 'end',
+    b'\x1b': 'escape', b'\r': 'enter', b'\n': 'enter', b'\x7f': 'backspace', b'\x08': 'backspace',
+    b'\t': 'toggle', b'\x01': 'toggle_all', b'\x15': 'clear',
+}
+
+
+class _View:
+    """What the selector shows: the query, its matches, the cursor and the picked issues
+
+    Only the page holding the cursor is ever rendered, so a keystroke costs
+    one index lookup plus one page of rows, however many issues there are.
+    """
+
+    def __init__(self, index, page_size: int):
+        self.index = index
+        self.page_size = max(1, page_size)
+        self.query = ''
+        self.matches = index.search('')
+        self.cursor = 0
+        self.chosen: Set[int] = set()
+
+    def search(self, query: str) -> None:
+        """Show the matches for a new query, with the cursor back on the first"""
+        self.query = query
+        self.matches = self.index.search(query)
+        self.cursor = 0
+
+    def move(self, delta: int) -> None:
+        """Move the cursor by delta rows, stopping at the first and last match"""
+        if len(self.matches):
+            self.cursor = min(max(self.cursor + delta, 0), len(self.matches) - 1)
+
+    def current(self) -> Optional[int]:
+        """Index position of the issue under the cursor, or None without matches"""
+        return int(self.matches[self.cursor]) if len(self.matches) else None
+
+    def toggle(self, positions) -> None:
+        """Unpick the issues if all are picked, otherwise pick them all"""
+        positions = set(positions)
+        if positions <= self.chosen:
+            self.chosen -= positions
+        else:
+            self.chosen |= positions
+
+    def page(self) -> range:
+        """Rows of the matches on the page holding the cursor"""
+        start = self.cursor - self.cursor % self.page_size
+        return range(start, min(start + self.page_size, len(self.matches)))
+
+    def table(self):
+        """The visible page as a rich table, for the prompt"""
+        from rich.table import Table
+
+        rows = self.page()
+        table = Table(title=self._title(rows))
+        table.add_column("#", style="cyan", width=6)
+        table.add_column("Issue", style="cyan", width=7)
+        table.add_column("Title", style="white", width=50)
+        table.add_column("Labels", style="yellow", width=20)
+        table.add_column("Age", style="green", width=6)
+        for row in rows:
+            position = int(self.matches[row])
+            table.add_row(str(row + 1), f"#{self.index.issues[position]['number']}", *_describe(self.index, position))
+        return table
+
+    def render(self, multiple: bool):
+        """The visible page plus the search line, for live redraws
+
+        Rows are laid out with fixed widths rather than as a rich table,
+        which would cost most of a frame to measure on every keystroke.
+        """
+        from rich.console import Group
+        from rich.text import Text
+
+        rows = self.page()
+        lines = Text(no_wrap=True, overflow='ellipsis')
+        lines.append(f"  {'#':>6} {'Issue':7} {'Title':50} {'Labels':20} {'Age':>5}\n", style="bold")
+        for row in rows:
+            position = int(self.matches[row])
+            title, labels, age = _describe(self.index, position)
+            mark = "●" if position in self.chosen else " "
+            lines.append(f"{mark} {row + 1:>6} {'#' + str(self.index.issues[position]['number']):7} ",
+                         style="cyan reverse" if row == self.cursor else "cyan")
+            lines.append(f"{title:50} ", style="reverse" if row == self.cursor else "white")
+            lines.append(f"{labels:20} ", style="yellow reverse" if row == self.cursor else "yellow")
+            lines.append(f"{age:>5}\n", style="green reverse" if row == self.cursor else "green")
+
+        keys = "↑↓ move · PgUp/PgDn page · Enter solve · Esc cancel"
+        filters = "label:… assignee:… age:today|week|month|quarter|year|older"
+        if multiple:
+            keys = f"Tab pick · Ctrl-A pick all matches · {keys}"
+            filters = f"{len(self.chosen)} picked · {filters}"
+        return Group(
+            Text(self._title(rows), style="italic"),
+            lines,
+            Text(f"Search: {self.query}▏", style="bold"),
+            Text(filters, style="dim"),
+            Text(keys, style="dim")
+        )
+
+    def _title(self, rows: range) -> str:
+        pages = max(1, -(-len(self.matches) // self.page_size))
+        return (f"Open GitHub Issues ({len(self.matches)} of {len(self.index)}, "
+                f"page {rows.start // self.page_size + 1}/{pages})")
 
 
 class IssueSelector:
     def __init__(self):
+        from rich.console import Console
+
         self.console = Console()
-    
+
     def select_issue(self, issues: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
         """Display issues and let user select one"""
+        selected = self.select_issues(issues, multiple=False)
+        return selected[0] if selected else None
+
+    def select_issues(self, issues: List[Dict[str, Any]], multiple: bool = True) -> List[Dict[str, Any]]:
+        """Let the user search the issues and pick one or, with multiple, several
+
+        On a terminal the list is filtered as the user types. Otherwise, or
+        where raw key input is not available, issues are picked by row
+        number at a prompt.
+        """
         if not issues:
-            return None
-        
-        # Display issues in a table
-        table = Table(title="Open GitHub Issues")
-        table.add_column("#", style="cyan", width=6)
-        table.add_column("Title", style="white", width=50)
-        table.add_column("Labels", style="yellow", width=20)
-        table.add_column("Age", style="green", width=10)
-        
-        for i, issue in enumerate(issues, 1):
-            labels_str = ", ".join(issue['labels'][:3])  # Show first 3 labels
-            if len(issue['labels']) > 3:
-                labels_str += "..."
-            
-            # Calculate age
-            from datetime import datetime
-            age_days = (datetime.now(issue['created_at'].tzinfo) - issue['created_at']).days
-            age_str = f"{age_days}d"
-            
-            table.add_row(
-                str(i),
-                issue['title'][:47] + "..." if len(issue['title']) > 50 else issue['title'],
-                labels_str,
-                age_str
-            )
-        
-        self.console.print(table)
-        
-        # Get user selection
-        while True:
-            try:
-                choice = Prompt.ask(
-                    f"\nSelect an issue (1-{len(issues)}) or 'q' to quit",
-                    default="1"
-                )
-                
-                if choice.lower() == 'q':
-                    return None
-                
-                index = int(choice) - 1
-                if 0 <= index < len(issues):
-                    selected = issues[index]
-                    
-                    # Show issue details
-                    self.console.print(f"\n[bold]Issue #{selected['number']}: {selected['title']}[/bold]")
-                    if selected['body']:
-                        body_preview = selected['body'][:200] + "..." if len(selected['body']) > 200 else selected['body']
-                        self.console.print(f"[dim]{body_preview}[/dim]")
-                    
-                    confirm = Prompt.ask("\nWork on this issue? (y/n)", default="y")
-                    if confirm.lower() in ['y', 'yes']:
-                        return selected
+            return []
+
+        from .issue_search import IssueIndex
+
+        with self.console.status(f"Indexing {len(issues)} issues..."):
+            index = IssueIndex(issues)
+        page_size = self.console.size.height - CHROME_LINES
+
+        # Everything allocated so far lives until the selection is made;
+        # keep full collections from scanning it in the middle of a keystroke
+        gc.freeze()
+        try:
+            if self.console.is_terminal and _raw_keys_supported():
+                positions = self._select_live(_View(index, page_size), multiple)
+            else:
+                positions = self._select_prompt(_View(index, page_size), multiple)
+        except KeyboardInterrupt:
+            self.console.print("\n[yellow]Cancelled.[/yellow]")
+            return []
+        finally:
+            gc.unfreeze()
+        return [issues[position] for position in positions]
+
+    def _select_live(self, view: _View, multiple: bool) -> List[int]:
+        """Incremental search: every keystroke re-queries the index and redraws one page"""
+        from rich.live import Live
+
+        with _raw_keys() as read_keys, Live(view.render(multiple), console=self.console,
+                                           auto_refresh=False, transient=True) as live:
+            while True:
+                changed = False
+                for key, text in read_keys():
+                    if key == 'escape':
+                        return []
+                    if key == 'enter':
+                        if view.chosen:
+                            return sorted(view.chosen)
+                        return [] if view.current() is None else [view.current()]
+
+                    if key == 'up':
+                        view.move(-1)
+                    elif key == 'down':
+                        view.move(1)
+                    elif key == 'page_up':
+                        view.move(-view.page_size)
+                    elif key == 'page_down':
+                        view.move(view.page_size)
+                    elif key == 'home':
+                        view.move(-len(view.matches))
+                    elif key == 'end':
+                        view.move(len(view.matches))
+                    elif key == 'toggle' and multiple and view.current() is not None:
+                        view.toggle([view.current()])
+                        view.move(1)
+                    elif key == 'toggle_all' and multiple:
+                        view.toggle(view.matches.tolist())
+                    elif key == 'backspace':
+                        view.search(view.query[:-1])
+                    elif key == 'clear':
+                        view.search('')
+                    elif key is None and text:
+                        view.search(view.query + text)
                     else:
                         continue
-                else:
-                    self.console.print("[red]Invalid selection. Please try again.[/red]")
-                    
+                    changed = True
+                if changed:
+                    live.update(view.render(multiple), refresh=True)
+
+    def _select_prompt(self, view: _View, multiple: bool) -> List[int]:
+        """Line-based fallback: pages, `/` searches and row numbers"""
+        from rich.prompt import Prompt
+
+        while True:
+            self.console.print(view.table())
+            choice = Prompt.ask(
+                "\nSelect " + ("issues (e.g. 1,3-5)" if multiple else "an issue") +
+                ", /text to search, n/p for the next or previous page, or 'q' to quit",
+                default="1"
+            ).strip()
+
+            if choice.lower() == 'q':
+                return []
+            if choice.startswith('/'):
+                view.search(choice[1:].strip())
+                continue
+            if choice.lower() in ('n', 'p'):
+                view.move(view.page_size if choice.lower() == 'n' else -view.page_size)
+                view.cursor -= view.cursor % view.page_size
+                continue
+
+            try:
+                rows = _parse_rows(choice)
             except ValueError:
-                self.console.print("[red]Invalid input. Please enter a number or 'q'.[/red]")
-            except KeyboardInterrupt:
-                self.console.print("\n[yellow]Cancelled.[/yellow]")
-                return None
\ No newline at end of file
+                self.console.print("[red]Invalid input. Please enter row numbers, a search or 'q'.[/red]")
+                continue
+            if not rows or (len(rows) > 1 and not multiple) or not all(0 < row <= len(view.matches) for row in rows):
+                self.console.print("[red]Invalid selection. Please try again.[/red]")
+                continue
+
+            positions = [int(view.matches[row - 1]) for row in rows]
+            # Show issue details
+            for position in positions:
+                selected = view.index.issues[position]
+                self.console.print(f"\n[bold]Issue #{selected['number']}: {selected['title']}[/bold]")
+                if selected['body'] and len(positions) == 1:
+                    body_preview = selected['body'][:200] + "..." if len(selected['body']) > 200 else selected['body']
+                    self.console.print(f"[dim]{body_preview}[/dim]")
+
+            confirm = Prompt.ask(f"\nWork on {'this issue' if len(positions) == 1 else 'these issues'}? (y/n)",
+                                 default="y")
+            if confirm.lower() in ['y', 'yes']:
+                return positions
+
+
+def _describe(index, position: int):
+    """Title, labels and age cells for one issue"""
+    issue = index.issues[position]
+    labels_str = ", ".join(issue['labels'][:3])  # Show first 3 labels
+    if len(issue['labels']) > 3:
+        labels_str += "..."
+
+    # Duplicates and batched issues folded into this one are solved with it
+    folded = len(issue.get('duplicates', [])) + len(issue.get('batched', []))
+    title = issue['title'] if not folded else f"{issue['title']} (+{folded})"
+    return title[:47] + "..." if len(title) > 50 else title, labels_str, f"{index.ages[position]}d"
+
+
+def _parse_rows(choice: str) -> List[int]:
+    """Row numbers from input like `3`, `1,4` or `2-5 7`"""
+    rows = []
+    for part in choice.replace(',', ' ').split():
+        first, _, last = part.partition('-')
+        rows.extend(range(int(first), int(last or first) + 1))
+    return list(dict.fromkeys(rows))
+
+
+def _raw_keys_supported() -> bool:
+    try:
+        import termios  # noqa: F401
+    except ImportError:
+        return False
+    return sys.stdin.isatty()
+
+
+@contextmanager
+def _raw_keys():
+    """Put the terminal in cbreak mode and yield a function reading the next keys"""
+    import termios
+    import tty
+
+    fd = sys.stdin.fileno()
+    saved = termios.tcgetattr(fd)
+    tty.setcbreak(fd)
+
+    def read_keys() -> List[Tuple[Optional[str], str]]:
+        """Named keys as (name, ''), typed text as (None, text)"""
+        # An escape sequence arrives in one read, as may several keys
+        # typed quickly or pasted
+        data = os.read(fd, 64)
+        if data.startswith(b'\x1b'):
+            return [(KEYS.get(data, 'unknown'), '')]
+        keys: List[Tuple[Optional[str], str]] = []
+        for char in data.decode(errors='ignore'):
+            name = KEYS.get(char.encode())
+            if name:
+                keys.append((name, ''))
+            elif not char.isprintable():
+                continue
+            elif keys and keys[-1][0] is None:
+                keys[-1] = (None, keys[-1][1] + char)
+            else:
+                keys.append((None, char))
+        return keys
+
+    try:
+        yield read_keys
+    finally:
+        termios.tcsetattr(fd, termios.TCSADRAIN, saved)
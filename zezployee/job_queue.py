@@ -0,0 +1,158 @@
+"""Persistent queue of issues being worked on by the daemon"""
+
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Iterable
+
+
+# Stages a job moves through, in order. A restarted daemon picks a job up
+# again from the last stage it reached.
+QUEUED = 'queued'
+SOLVING = 'solving'
+COMMITTED = 'committed'
+PUSHED = 'pushed'
+PR_OPENED = 'pr_opened'
+FAILED = 'failed'
+
+STAGES = (QUEUED, SOLVING, COMMITTED, PUSHED, PR_OPENED, FAILED)
+RUNNABLE_STAGES = (QUEUED, COMMITTED, PUSHED)
+
+# Seconds a job waits after a failed try, doubling with each failure in a
+# row at the same stage up to the maximum
+RETRY_BACKOFF = 30.0
+MAX_RETRY_BACKOFF = 3600.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    number INTEGER PRIMARY KEY,
+    stage TEXT NOT NULL,
+    issue TEXT NOT NULL,
+    branch TEXT NOT NULL,
+    changes TEXT,
+    pr_url TEXT,
+    error TEXT,
+    session_id TEXT,
+    cost_usd REAL NOT NULL DEFAULT 0,
+    turns INTEGER NOT NULL DEFAULT 0,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    retries INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_stage ON jobs (stage, number);
+"""
+
+UPDATABLE_FIELDS = ('changes', 'pr_url', 'error', 'session_id', 'cost_usd', 'turns', 'attempts')
+
+
+class JobQueue:
+    def __init__(self, path: Path):
+        self.path = path
+        self.conn = sqlite3.connect(str(path))
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+        columns = {row['name'] for row in self.conn.execute("PRAGMA table_info(jobs)")}
+        if 'retries' not in columns:
+            # Queues written before failed tries were counted per stage
+            with self.conn:
+                self.conn.execute("ALTER TABLE jobs ADD COLUMN retries INTEGER NOT NULL DEFAULT 0")
+
+    def close(self) -> None:
+        """Close the underlying database"""
+        self.conn.close()
+
+    def enqueue(self, issue: Dict[str, Any]) -> bool:
+        """Queue an issue unless it already has a job, returning whether it was added"""
+        now = time.time()
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT OR IGNORE INTO jobs (number, stage, issue, branch, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (issue['number'], QUEUED, json.dumps(issue, default=str),
+                 f"issue-{issue['number']}", now, now)
+            )
+        return cursor.rowcount == 1
+
+    def recover(self) -> int:
+        """Requeue jobs interrupted while Claude was running, returning how many
+
+        Nothing is kept from an interrupted session, so those jobs start over;
+        jobs that got further resume from their last completed stage.
+        """
+        with self.conn:
+            cursor = self.conn.execute(
+                "UPDATE jobs SET stage = ?, updated_at = ? WHERE stage = ?",
+                (QUEUED, time.time(), SOLVING)
+            )
+        return cursor.rowcount
+
+    def runnable(self, limit: int, exclude: Iterable[int] = ()) -> List[Dict[str, Any]]:
+        """Get up to limit jobs with work left, furthest along first
+
+        A job whose last try failed is held back until its backoff is over.
+        """
+        if limit <= 0:
+            return []
+        exclude = list(exclude)
+        placeholders = ','.join('?' * len(RUNNABLE_STAGES))
+        query = (f"SELECT * FROM jobs WHERE stage IN ({placeholders}) "
+                 "AND (retries = 0 OR updated_at <= ? - MIN(?, ? * (1 << MIN(retries - 1, 20))))")
+        params = [*RUNNABLE_STAGES, time.time(), MAX_RETRY_BACKOFF, RETRY_BACKOFF]
+        if exclude:
+            query += f" AND number NOT IN ({','.join('?' * len(exclude))})"
+            params.extend(exclude)
+        # Finishing a nearly done job is cheaper than starting a new one
+        query += " ORDER BY CASE stage WHEN ? THEN 0 WHEN ? THEN 1 ELSE 2 END, number LIMIT ?"
+        params.extend([PUSHED, COMMITTED, limit])
+        return [self._to_dict(row) for row in self.conn.execute(query, params)]
+
+    def get(self, number: int) -> Optional[Dict[str, Any]]:
+        """Get the job for an issue"""
+        row = self.conn.execute("SELECT * FROM jobs WHERE number = ?", (number,)).fetchone()
+        return self._to_dict(row) if row else None
+
+    def advance(self, number: int, stage: str, **fields: Any) -> None:
+        """Record that a job reached a stage, along with any result fields
+
+        Moving to another stage clears the count of failed tries.
+        """
+        if stage not in STAGES:
+            raise ValueError(f"Unknown job stage: {stage}")
+        unknown = set(fields) - set(UPDATABLE_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown job fields: {', '.join(sorted(unknown))}")
+
+        assignments = ''.join(f", {name} = ?" for name in fields)
+        with self.conn:
+            self.conn.execute(
+                "UPDATE jobs SET retries = CASE WHEN stage = ? THEN retries ELSE 0 END, "
+                f"stage = ?, updated_at = ?{assignments} WHERE number = ?",
+                (stage, stage, time.time(), *fields.values(), number)
+            )
+
+    def fail(self, number: int, stage: str, error: str) -> int:
+        """Record a failed try at a stage, leaving the job there to be retried after a backoff
+
+        Returns how many tries in a row have failed at that stage.
+        """
+        with self.conn:
+            self.conn.execute(
+                "UPDATE jobs SET retries = CASE WHEN stage = ? THEN retries + 1 ELSE 1 END, "
+                "stage = ?, error = ?, updated_at = ? WHERE number = ?",
+                (stage, stage, error, time.time(), number)
+            )
+        return self.get(number)['retries']
+
+    def counts(self) -> Dict[str, int]:
+        """Get the number of jobs in each stage"""
+        counts = {stage: 0 for stage in STAGES}
+        for stage, count in self.conn.execute("SELECT stage, COUNT(*) FROM jobs GROUP BY stage"):
+            counts[stage] = count
+        return counts
+
+    def _to_dict(self, row: sqlite3.Row) -> Dict[str, Any]:
+        job = dict(row)
+        job['issue'] = json.loads(job['issue'])
+        return job
@@ -0,0 +1,33 @@
+"""Filesystem locations used by zezployee"""
+
+import os
+import subprocess
+from pathlib import Path
+from typing import Optional
+
+
+def state_dir(cwd: Optional[Path] = None) -> Path:
+    """Get the per-repository state directory (inside the git common dir)"""
+    base = Path(cwd) if cwd else Path.cwd()
+    try:
+        result = subprocess.run(
+            ['git', 'rev-parse', '--git-common-dir'],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=base
+        )
+    except subprocess.CalledProcessError:
+        raise ValueError("Could not locate git directory")
+
+    path = (base / result.stdout.strip()).resolve() / 'zezployee'
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def user_cache_dir() -> Path:
+    """Get the per-user cache directory, shared by every repository"""
+    base = os.getenv('XDG_CACHE_HOME') or Path.home() / '.cache'
+    path = Path(base) / 'zezployee'
+    path.mkdir(parents=True, exist_ok=True)
+    return path
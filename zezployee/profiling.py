@@ -0,0 +1,176 @@
+"""Lightweight per-phase timing and counters for a zezployee run"""
+
+import asyncio
+import contextvars
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import List, Dict, Any, Iterator, Tuple
+
+
+class Span:
+    def __init__(self, name: str, attrs: Dict[str, Any]):
+        self.name = name
+        self.attrs = dict(attrs)
+        self.counters: Dict[str, float] = {}
+        self.gauges: Dict[str, float] = {}
+        self.start = time.time()
+        self.wall = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the span to a dictionary for serialization"""
+        return {
+            'name': self.name,
+            'start': self.start,
+            'wall_s': self.wall,
+            'counters': self.counters,
+            'gauges': self.gauges,
+            'attrs': self.attrs
+        }
+
+
+# Spans open in the current task or thread, outermost first. A contextvar
+# keeps concurrent issues in a batch from charging each other's spans.
+_open_spans: contextvars.ContextVar = contextvars.ContextVar('zezployee_open_spans', default=())
+
+
+class Profiler:
+    def __init__(self):
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str, **attrs: Any) -> Iterator[Span]:
+        """Time a phase; counters recorded inside it are charged to it and its parents"""
+        span = Span(name, attrs)
+        token = _open_spans.set(_open_spans.get() + (span,))
+        start = time.perf_counter()
+        try:
+            yield span
+        finally:
+            span.wall = time.perf_counter() - start
+            _open_spans.reset(token)
+            with self._lock:
+                self.spans.append(span)
+
+    def count(self, name: str, value: float = 1) -> None:
+        """Add to a counter on every open span"""
+        with self._lock:
+            for span in _open_spans.get():
+                span.counters[name] = span.counters.get(name, 0) + value
+
+    def gauge(self, name: str, value: float) -> None:
+        """Record the latest value of a gauge on every open span"""
+        for span in _open_spans.get():
+            span.gauges[name] = value
+
+    def record(self, **attrs: Any) -> None:
+        """Attach attributes, such as Claude cost and turns, to the innermost span"""
+        spans = _open_spans.get()
+        if spans:
+            spans[-1].attrs.update(attrs)
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """Aggregate finished spans by phase name, in order of first appearance"""
+        phases: Dict[str, Dict[str, Any]] = {}
+        with self._lock:
+            spans = sorted(self.spans, key=lambda span: span.start)
+        for span in spans:
+            phase = phases.setdefault(span.name, {
+                'phase': span.name, 'count': 0, 'wall_s': 0.0, 'max_wall_s': 0.0,
+                'counters': {}, 'gauges': {}, 'attrs': {}
+            })
+            phase['count'] += 1
+            phase['wall_s'] += span.wall
+            phase['max_wall_s'] = max(phase['max_wall_s'], span.wall)
+            for name, value in span.counters.items():
+                phase['counters'][name] = phase['counters'].get(name, 0) + value
+            phase['gauges'].update(span.gauges)
+            for name, value in span.attrs.items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    phase['attrs'][name] = phase['attrs'].get(name, 0) + value
+        return list(phases.values())
+
+    def report(self) -> str:
+        """Format the per-phase breakdown as a text table"""
+        rows: List[Tuple[str, ...]] = [('phase', 'n', 'wall s', 'max s', 'git', 'paths', 'api', 'rl left', 'extra')]
+        for phase in self.summary():
+            extra = ', '.join(f"{name}={value:g}" for name, value in sorted(phase['attrs'].items()))
+            remaining = phase['gauges'].get('rate_limit_remaining')
+            rows.append((
+                phase['phase'],
+                str(phase['count']),
+                f"{phase['wall_s']:.3f}",
+                f"{phase['max_wall_s']:.3f}",
+                f"{phase['counters'].get('subprocesses', 0):g}",
+                f"{phase['counters'].get('paths_scanned', 0):g}",
+                f"{phase['counters'].get('api_calls', 0):g}",
+                '-' if remaining is None else f"{remaining:g}",
+                extra
+            ))
+        widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+        return '\n'.join(
+            '  '.join(cell.ljust(width) for cell, width in zip(row, widths)).rstrip() for row in rows
+        )
+
+    def to_json(self) -> str:
+        """Export every span plus the per-phase summary as JSON"""
+        with self._lock:
+            spans = [span.to_dict() for span in self.spans]
+        return json.dumps({'spans': spans, 'phases': self.summary()}, indent=2, default=str)
+
+    def to_prometheus(self) -> str:
+        """Export the per-phase summary in the Prometheus text exposition format"""
+        metrics = [
+            ('zezployee_phase_seconds_total', 'counter', 'Wall time spent in each phase',
+             lambda phase: phase['wall_s']),
+            ('zezployee_phase_runs_total', 'counter', 'Number of times each phase ran',
+             lambda phase: phase['count']),
+            ('zezployee_phase_subprocesses_total', 'counter', 'git subprocesses started in each phase',
+             lambda phase: phase['counters'].get('subprocesses', 0)),
+            ('zezployee_phase_paths_scanned_total', 'counter', 'Working tree paths git checked in each phase',
+             lambda phase: phase['counters'].get('paths_scanned', 0)),
+            ('zezployee_phase_api_calls_total', 'counter', 'GitHub API calls made in each phase',
+             lambda phase: phase['counters'].get('api_calls', 0)),
+            ('zezployee_phase_rate_limit_remaining', 'gauge', 'GitHub rate limit left at the end of each phase',
+             lambda phase: phase['gauges'].get('rate_limit_remaining')),
+            ('zezployee_phase_claude_cost_usd_total', 'counter', 'Claude cost in dollars per phase',
+             lambda phase: phase['attrs'].get('cost_usd')),
+            ('zezployee_phase_claude_turns_total', 'counter', 'Claude turns per phase',
+             lambda phase: phase['attrs'].get('turns')),
+        ]
+        phases = self.summary()
+        lines = []
+        for name, kind, help_text, value_of in metrics:
+            samples = [(phase['phase'], value_of(phase)) for phase in phases]
+            samples = [(phase, value) for phase, value in samples if value is not None]
+            if not samples:
+                continue
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for phase, value in samples:
+                lines.append(f'{name}{{phase="{phase}"}} {value:g}')
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path: Path) -> None:
+        """Atomically write a textfile for node_exporter's textfile collector"""
+        tmp_path = Path(f"{path}.{os.getpid()}.tmp")
+        tmp_path.write_text(self.to_prometheus())
+        os.replace(tmp_path, path)
+
+
+# Shared by every module of a run
+profiler = Profiler()
+
+
+async def in_thread(func, *args):
+    """Run a blocking call in the default executor without stalling the event loop
+
+    The call runs in a copy of the caller's context, so profiling spans
+    follow it into the thread.
+    """
+    context = contextvars.copy_context()
+    return await asyncio.get_running_loop().run_in_executor(None, context.run, func, *args)
@@ -0,0 +1,214 @@
+"""Live dashboard of running Claude sessions, fed by ClaudeIntegration's events
+
+Events reach subscribers as they are published, in the thread that
+publishes them, straight from the SDK message stream. The dashboard only
+updates counters when an event arrives. rich redraws it from its own thread
+at a capped frame rate, so drawing never holds up message handling.
+"""
+
+import json
+import threading
+import time
+from typing import List, Dict, Any, Optional
+
+from .claude_integration import ProgressCallback
+
+
+# Events describing a session's messages, shown by the dashboard instead of printed
+SESSION_EVENTS = ('started', 'message', 'finished')
+
+# Redraws per second, at most
+FRAME_RATE = 8
+
+# Rough size of a token, for counting tokens before the session reports usage
+CHARS_PER_TOKEN = 4
+
+
+class EventBus:
+    """Fans each event out to every subscriber, synchronously and in order
+
+    publish() has the ProgressCallback signature, so it can be passed to
+    ClaudeIntegration as on_event.
+    """
+
+    def __init__(self):
+        self._subscribers: List[ProgressCallback] = []
+
+    def subscribe(self, callback: ProgressCallback) -> None:
+        """Have the callback receive every later event, after the earlier subscribers"""
+        self._subscribers.append(callback)
+
+    def publish(self, event: str, data: Dict[str, Any]) -> None:
+        """Hand an event to each subscriber in turn, on the caller's thread"""
+        for callback in self._subscribers:
+            callback(event, data)
+
+
+class Dashboard:
+    """One row per running session: turns, tool calls, tokens, cost, elapsed and estimated time, current tool
+
+    The display starts with the first session and is cleared once none are
+    left running, so output between sessions prints normally. Cost is only
+    known once a session reports it. A row shows what the issue's earlier
+    sessions cost. The footer adds up every finished session.
+    """
+
+    def __init__(self, console=None, frame_rate: float = FRAME_RATE):
+        self.console = console
+        self.frame_rate = frame_rate
+        self.sessions: Dict[str, Dict[str, Any]] = {}
+        self.issue_cost: Dict[Any, float] = {}
+        self.totals = {'sessions': 0, 'tokens': 0, 'cost_usd': 0.0}
+        self._lock = threading.Lock()
+        self._live = None
+
+    def __call__(self, event: str, data: Dict[str, Any]) -> None:
+        if event == 'started':
+            with self._lock:
+                self.sessions[data['session']] = {
+                    'issue': data.get('issue'),
+                    'attempt': data.get('attempt') or 1,
+                    'max_turns': data.get('max_turns') or 0,
+                    'started': time.monotonic(),
+                    'turns': 0,
+                    'tool_calls': 0,
+                    'chars': 0,
+                    'tool': None
+                }
+            self._start()
+        elif event == 'message':
+            row = self.sessions.get(data.get('session'))
+            if row is not None:
+                self._count(row, data['message'])
+        elif event == 'finished':
+            with self._lock:
+                self.sessions.pop(data.get('session'), None)
+                idle = not self.sessions
+            if idle:
+                self.close()
+
+    def close(self) -> None:
+        """Stop and clear the display"""
+        live, self._live = self._live, None
+        if live is not None:
+            live.stop()
+
+    def _start(self) -> None:
+        if self._live is not None:
+            return
+        from rich.live import Live
+
+        self._live = Live(self, console=self.console, refresh_per_second=self.frame_rate, transient=True)
+        self._live.start()
+
+    def _count(self, row: Dict[str, Any], message: Any) -> None:
+        """Update a session's counters from one message; no drawing happens here"""
+        kind = type(message).__name__
+        content = getattr(message, 'content', None)
+        blocks = content if isinstance(content, list) else []
+        if kind == 'AssistantMessage':
+            row['turns'] += 1
+            for block in blocks:
+                name = getattr(block, 'name', None)
+                if name is not None:
+                    row['tool_calls'] += 1
+                    row['tool'] = _describe_tool(name, getattr(block, 'input', None) or {})
+                row['chars'] += _block_chars(block)
+        elif kind == 'UserMessage':
+            if any(getattr(block, 'tool_use_id', None) for block in blocks):
+                row['tool'] = None
+            row['chars'] += sum(_block_chars(block) for block in blocks) if blocks else len(content or '')
+        elif kind == 'ResultMessage':
+            usage = getattr(message, 'usage', None) or {}
+            tokens = sum(value for key, value in usage.items() if key.endswith('tokens') and isinstance(value, int))
+            cost = getattr(message, 'total_cost_usd', None) or 0
+            with self._lock:
+                self.issue_cost[row['issue']] = self.issue_cost.get(row['issue'], 0) + cost
+                self.totals['sessions'] += 1
+                self.totals['tokens'] += tokens or row['chars'] // CHARS_PER_TOKEN
+                self.totals['cost_usd'] += cost
+
+    def __rich__(self):
+        """Build the current frame; called by rich's refresh thread"""
+        from rich.table import Table
+
+        now = time.monotonic()
+        with self._lock:
+            rows = sorted(self.sessions.values(), key=lambda row: row['started'])
+            rows = [dict(row) for row in rows]
+            issue_cost = dict(self.issue_cost)
+            totals = dict(self.totals)
+
+        table = Table(title=f"Claude sessions ({len(rows)} running)", title_justify='left', expand=False)
+        table.add_column("Issue", style="cyan", no_wrap=True)
+        table.add_column("Try", justify="right", no_wrap=True)
+        table.add_column("Turns", justify="right", no_wrap=True)
+        table.add_column("Tools", justify="right", no_wrap=True)
+        table.add_column("Tokens", justify="right", no_wrap=True)
+        table.add_column("Cost", justify="right", style="green", no_wrap=True)
+        table.add_column("Time", justify="right", no_wrap=True)
+        table.add_column("Left", justify="right", style="dim", no_wrap=True)
+        table.add_column("Current tool", style="yellow", max_width=40, no_wrap=True, overflow="ellipsis")
+        for row in rows:
+            elapsed = now - row['started']
+            left = None
+            if row['turns'] and row['max_turns']:
+                left = elapsed / row['turns'] * max(0, row['max_turns'] - row['turns'])
+            turns = f"{row['turns']}/{row['max_turns']}" if row['max_turns'] else str(row['turns'])
+            cost = issue_cost.get(row['issue'])
+            table.add_row(
+                f"#{row['issue']}" if row['issue'] is not None else "-",
+                str(row['attempt']),
+                turns,
+                str(row['tool_calls']),
+                f"~{_compact(row['chars'] // CHARS_PER_TOKEN)}",
+                f"${cost:.2f}+" if cost else "…",
+                _duration(elapsed),
+                f"≤{_duration(left)}" if left is not None else "-",
+                row['tool'] or "thinking"
+            )
+        table.caption = (f"{totals['sessions']} sessions finished · {_compact(totals['tokens'])} tokens · "
+                         f"${totals['cost_usd']:.2f}")
+        return table
+
+
+def _block_chars(block: Any) -> int:
+    """Characters a content block adds to the conversation"""
+    for attr in ('text', 'thinking'):
+        value = getattr(block, attr, None)
+        if isinstance(value, str):
+            return len(value)
+    if getattr(block, 'name', None) is not None:
+        return len(json.dumps(getattr(block, 'input', None) or {}, default=str))
+    content = getattr(block, 'content', None)
+    if isinstance(content, str):
+        return len(content)
+    if isinstance(content, list):
+        return len(json.dumps(content, default=str))
+    return 0
+
+
+def _describe_tool(name: str, tool_input: Dict[str, Any]) -> str:
+    """Tool name with its most telling argument, e.g. `Edit app/models.py`"""
+    detail: Optional[str] = None
+    for key in ('file_path', 'notebook_path', 'command', 'pattern', 'path', 'url'):
+        value = tool_input.get(key)
+        if isinstance(value, str) and value:
+            detail = value.splitlines()[0] if key == 'command' else value.rsplit('/', 1)[-1]
+            break
+    return f"{name} {detail}" if detail else name
+
+
+def _duration(seconds: float) -> str:
+    """Seconds as minutes:seconds, e.g. 2:05"""
+    minutes, seconds = divmod(int(seconds), 60)
+    return f"{minutes}:{seconds:02d}"
+
+
+def _compact(count: int) -> str:
+    """A count shortened to one decimal with a k or M suffix, e.g. 12.3k"""
+    if count >= 1_000_000:
+        return f"{count / 1_000_000:.1f}M"
+    if count >= 1000:
+        return f"{count / 1000:.1f}k"
+    return str(count)
@@ -0,0 +1,122 @@
+"""Asynchronous publishing of finished branches: batched pushes, then PRs and issue closes"""
+
+import asyncio
+from typing import List, Dict, Any, Optional
+
+from .issue_clustering import covered_issues
+from .profiling import in_thread
+
+
+class Publisher:
+    """Pushes, opens pull requests and closes issues off the solving path
+
+    Branches handed to submit() are pushed in batches, many refspecs per
+    `git push`. Once a batch is pushed, its pull requests are opened and
+    its issues closed concurrently, at most `concurrency` at a time. Each
+    submit() returns a future for that branch's pull request URL, so
+    callers can move on to the next issue and collect results later.
+    """
+
+    def __init__(self, github_client, concurrency: int = 8, max_batch: int = 20,
+                 linger: float = 0.2, close_issues: bool = True):
+        if concurrency < 1:
+            raise ValueError("Concurrency must be at least 1")
+        self.github_client = github_client
+        self.concurrency = concurrency
+        self.max_batch = max_batch
+        self.linger = linger
+        self.close_issues = close_issues
+        self._queue: Optional[asyncio.Queue] = None
+        self._pusher: Optional[asyncio.Future] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._tasks: List[asyncio.Future] = []
+
+    async def __aenter__(self) -> 'Publisher':
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    def start(self) -> None:
+        """Start the push loop on the running event loop"""
+        self._queue = asyncio.Queue()
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._pusher = asyncio.ensure_future(self._push_loop())
+
+    def submit(self, issue: Dict[str, Any], branch_name: str, changes: str) -> asyncio.Future:
+        """Queue a committed branch for publishing, returning a future for its PR URL"""
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait({'issue': issue, 'branch': branch_name, 'changes': changes, 'future': future})
+        return future
+
+    async def close(self) -> None:
+        """Publish everything submitted so far, then stop"""
+        self._queue.put_nowait(None)
+        await self._pusher
+        if self._tasks:
+            await asyncio.gather(*self._tasks)
+
+    async def _push_loop(self) -> None:
+        """Collect submitted branches into batches and push each batch at once"""
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is None:
+                return
+
+            # Linger briefly so branches finishing together share one push
+            batch = [item]
+            deadline = loop.time() + self.linger
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), remaining)
+                    except asyncio.TimeoutError:
+                        break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            try:
+                errors = await in_thread(self.github_client.push_branches, [item['branch'] for item in batch])
+            except Exception as e:
+                errors = {item['branch']: str(e) for item in batch}
+
+            for item in batch:
+                if errors.get(item['branch']):
+                    item['future'].set_exception(RuntimeError(errors[item['branch']]))
+                else:
+                    self._tasks.append(asyncio.ensure_future(self._open(item)))
+
+    async def _open(self, item: Dict[str, Any]) -> None:
+        """Open the pull request for a pushed branch and close the issues it resolves"""
+        issue = item['issue']
+        async with self._semaphore:
+            try:
+                pr_url = await in_thread(
+                    self.github_client.open_pull_request, item['branch'], issue, item['changes']
+                )
+            except Exception as e:
+                item['future'].set_exception(e)
+                return
+
+            if self.close_issues:
+                numbers = [member['number'] for member in covered_issues(issue)]
+                closed = await asyncio.gather(
+                    *(in_thread(self.github_client.close_issue, number) for number in numbers),
+                    return_exceptions=True
+                )
+                for number, outcome in zip(numbers, closed):
+                    if isinstance(outcome, Exception):
+                        # The PR is open; a stale issue is not worth failing it for
+                        print(f"⚠️  Could not close issue #{number}: {outcome}")
+
+        item['future'].set_result(pr_url)
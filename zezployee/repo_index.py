@@ -0,0 +1,238 @@
+"""Incremental repository index used to give Claude relevant context up front"""
+
+import json
+import math
+import re
+import sqlite3
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import List, Dict, Optional, Callable, Iterable, Iterator, Tuple
+
+from .git_workspace import GitWorkspace
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    blob TEXT NOT NULL,
+    length INTEGER NOT NULL,
+    symbols TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS postings (
+    term TEXT NOT NULL,
+    path TEXT NOT NULL,
+    tf INTEGER NOT NULL,
+    PRIMARY KEY (term, path)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS postings_path ON postings (path);
+"""
+
+# Files larger than this are mostly generated or vendored
+MAX_FILE_BYTES = 512 * 1024
+
+SYMBOL_PATTERN = re.compile(
+    r'^\s*(?:export\s+)?(?:pub\s+)?(?:async\s+)?'
+    r'(?:def|class|function|func|fn|struct|interface|trait|enum|type|module)\s+([A-Za-z_]\w*)',
+    re.MULTILINE
+)
+WORD_PATTERN = re.compile(r'[A-Za-z_][A-Za-z0-9_]*')
+CAMEL_PATTERN = re.compile(r'[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+')
+
+STOPWORDS = frozenset(
+    'the and for that this with from are was were has have not but you your can will '
+    'should would could when what which into there their then than self none true false '
+    'return import def class if else elif in is it of on or to be as by an at we do'.split()
+)
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+# Rough characters-per-token ratio used for the prompt budget
+CHARS_PER_TOKEN = 4
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase terms, breaking identifiers on case and underscores"""
+    terms = []
+    for word in WORD_PATTERN.findall(text):
+        parts = [word] if '_' not in word and word.islower() else []
+        for piece in word.split('_'):
+            parts.extend(CAMEL_PATTERN.findall(piece))
+        for part in parts:
+            term = part.lower()
+            if len(term) > 1 and term not in STOPWORDS:
+                terms.append(term)
+    return terms
+
+
+class RepoIndex:
+    """BM25 index of the tracked files, brought up to date the first time it is queried
+
+    on_update gets the (indexed, removed) counts when that update changed anything.
+    """
+
+    def __init__(self, path: Path, workspace: Optional[GitWorkspace] = None,
+                 on_update: Optional[Callable[[int, int], None]] = None):
+        self.path = path
+        self.workspace = workspace or GitWorkspace()
+        self.on_update = on_update
+        self.conn = sqlite3.connect(str(path), check_same_thread=False)
+        self.conn.executescript(SCHEMA)
+        self._updated = False
+        self._update_lock = threading.Lock()
+
+    def close(self) -> None:
+        """Close the underlying database"""
+        self.conn.close()
+
+    def update(self) -> Tuple[int, int]:
+        """Re-index files whose blob changed, returning (indexed, removed) counts"""
+        tracked = self._tracked_blobs()
+        indexed = dict(self.conn.execute("SELECT path, blob FROM files"))
+
+        removed = [path for path in indexed if path not in tracked]
+        changed = {path: blob for path, blob in tracked.items() if indexed.get(path) != blob}
+
+        with self.conn:
+            for path in removed + list(changed):
+                self.conn.execute("DELETE FROM files WHERE path = ?", (path,))
+                self.conn.execute("DELETE FROM postings WHERE path = ?", (path,))
+
+            for path, content in self._read_blobs(changed):
+                if content is None:
+                    # Recorded without terms, so the blob is not read again until it changes
+                    self.conn.execute(
+                        "INSERT INTO files (path, blob, length, symbols) VALUES (?, ?, 0, '[]')",
+                        (path, changed[path])
+                    )
+                    continue
+                terms = Counter(tokenize(path) * 3 + tokenize(content))
+                symbols = SYMBOL_PATTERN.findall(content)
+                for symbol in symbols:
+                    for term in tokenize(symbol):
+                        terms[term] += 2
+                self.conn.execute(
+                    "INSERT INTO files (path, blob, length, symbols) VALUES (?, ?, ?, ?)",
+                    (path, changed[path], sum(terms.values()), json.dumps(symbols))
+                )
+                self.conn.executemany(
+                    "INSERT INTO postings (term, path, tf) VALUES (?, ?, ?)",
+                    ((term, path, tf) for term, tf in terms.items())
+                )
+
+        self._updated = True
+        return len(changed), len(removed)
+
+    def ensure_updated(self) -> None:
+        """Update the index once, before the first query"""
+        with self._update_lock:
+            if self._updated:
+                return
+            indexed, removed = self.update()
+        if self.on_update and (indexed or removed):
+            self.on_update(indexed, removed)
+
+    def rank(self, text: str, limit: int = 5) -> List[Tuple[str, float]]:
+        """Rank indexed files against free text with BM25"""
+        query = set(tokenize(text))
+        if not query:
+            return []
+
+        self.ensure_updated()
+        # Files without terms, such as skipped binaries, can never match
+        doc_count, total_length = self.conn.execute(
+            "SELECT COUNT(*), SUM(length) FROM files WHERE length > 0"
+        ).fetchone()
+        if not doc_count:
+            return []
+        average_length = total_length / doc_count
+
+        scores: Dict[str, float] = Counter()
+        for term in query:
+            postings = self.conn.execute(
+                "SELECT p.path, p.tf, f.length FROM postings p JOIN files f ON f.path = p.path "
+                "WHERE p.term = ?", (term,)
+            ).fetchall()
+            if not postings:
+                continue
+            idf = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for path, tf, length in postings:
+                norm = K1 * (1 - B + B * length / average_length)
+                scores[path] += idf * tf * (K1 + 1) / (tf + norm)
+
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]
+
+    def context_for(self, text: str, token_budget: int = 2000, limit: int = 5,
+                    window: int = 30) -> str:
+        """Build a markdown block of the most relevant snippets within a token budget"""
+        ranked = self.rank(text, limit=limit)
+        if not ranked or token_budget <= 0:
+            return ''
+
+        blobs = dict(self.conn.execute(
+            f"SELECT path, blob FROM files WHERE path IN ({','.join('?' * len(ranked))})",
+            [path for path, _ in ranked]
+        ))
+        contents = dict(self._read_blobs({path: blobs[path] for path, _ in ranked}))
+        query = set(tokenize(text))
+
+        budget = token_budget * CHARS_PER_TOKEN
+        sections = []
+        for path, _ in ranked:
+            content = contents.get(path)
+            if not content:
+                continue
+            snippet, start = self._best_window(content, query, window)
+            header = f"### {path} (from line {start + 1})\n```\n"
+            room = budget - len(header) - len("\n```")
+            if len(snippet) > room:
+                if sections or room <= 0:
+                    break
+                snippet = snippet[:room]
+            section = f"{header}{snippet}\n```"
+            sections.append(section)
+            budget -= len(section)
+            if budget <= 0:
+                break
+
+        return '\n\n'.join(sections)
+
+    def _best_window(self, content: str, query: Iterable[str], window: int) -> Tuple[str, int]:
+        """Find the run of lines with the most query term hits"""
+        lines = content.splitlines()
+        hits = [sum(1 for term in tokenize(line) if term in query) for line in lines]
+
+        best_start, best_score = 0, -1
+        score = sum(hits[:window])
+        for start in range(max(1, len(lines) - window + 1)):
+            if start:
+                score += (hits[start + window - 1] if start + window - 1 < len(hits) else 0) - hits[start - 1]
+            if score > best_score:
+                best_start, best_score = start, score
+        return '\n'.join(lines[best_start:best_start + window]), best_start
+
+    def _tracked_blobs(self) -> Dict[str, str]:
+        """Map tracked paths to blob hashes from the git index"""
+        output = self.workspace.run('ls-files', '-s', '-z').stdout
+        blobs = {}
+        for entry in output.split('\0'):
+            if not entry:
+                continue
+            meta, path = entry.split('\t', 1)
+            mode, blob, _ = meta.split(' ')
+            # Skip symlinks and submodules
+            if mode.startswith('100'):
+                blobs[path] = blob
+        return blobs
+
+    def _read_blobs(self, blobs: Dict[str, str]) -> Iterator[Tuple[str, Optional[str]]]:
+        """Stream blob contents as text, giving None for binary or huge files"""
+        paths = list(blobs)
+        contents = self.workspace.read_blobs([blobs[path] for path in paths])
+        for path, data in zip(paths, contents):
+            if data is None or len(data) > MAX_FILE_BYTES or b'\0' in data[:8192]:
+                yield path, None
+            else:
+                yield path, data.decode('utf-8', errors='replace')
@@ -0,0 +1,214 @@
+"""Turn budgets and ordering for a batch of issues, learned from past sessions"""
+
+import time
+from typing import List, Dict, Any, Optional, Tuple
+
+from .transcript_store import TranscriptStore, NO_LABEL
+
+
+# Issue size buckets by title and body length, as (name, upper bound)
+SIZE_BUCKETS = (('small', 500), ('medium', 2000), ('large', None))
+
+# Placeholder label for estimates from issue size alone
+ANY_LABEL = '*'
+
+# Runs of similar issues needed before the overall history is not mixed in
+MIN_RUNS = 5
+
+# Weight, in runs, of the overall history in every group's estimates
+PRIOR_RUNS = 2.0
+
+# The turn budget covers this share of similar issues' successful runs
+TURN_QUANTILE = 0.8
+
+MIN_TURNS = 3
+
+# Assumed before there is any history
+DEFAULT_SUCCESS = 0.5
+DEFAULT_COST_USD = 0.5
+DEFAULT_DURATION_S = 300.0
+
+
+def size_bucket(chars: int) -> str:
+    """Name of the size bucket of an issue with this much text"""
+    for name, upper in SIZE_BUCKETS:
+        if upper is None or chars < upper:
+            return name
+    return SIZE_BUCKETS[-1][0]
+
+
+def issue_chars(issue: Dict[str, Any]) -> int:
+    """Length of an issue's title and body, which decides its size bucket"""
+    return len(issue['title']) + len(issue['body'] or '')
+
+
+class History:
+    """Outcomes of past runs (all attempts at one issue) by label and issue size"""
+
+    def __init__(self):
+        self.groups: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self.overall = self._new_group()
+
+    @classmethod
+    def load(cls, store: TranscriptStore, since: Optional[float] = None) -> 'History':
+        """Build the history from the session summaries in a transcript store"""
+        runs: Dict[str, Dict[str, Any]] = {}
+        for session in store.sessions(since):
+            run = runs.setdefault(session.get('run') or session.get('session_id') or '', {
+                'labels': session.get('labels') or [],
+                'issue_chars': session.get('issue_chars') or 0,
+                'turns': 0, 'cost_usd': 0.0, 'duration_s': 0.0, 'success': False
+            })
+            run['turns'] += session.get('turns') or 0
+            run['cost_usd'] += session.get('cost_usd') or 0
+            run['duration_s'] += session.get('duration_s') or 0
+            run['success'] = run['success'] or bool(session.get('success'))
+
+        history = cls()
+        for run in runs.values():
+            history.add(run)
+        return history
+
+    def add(self, run: Dict[str, Any]) -> None:
+        """Count one run towards its labels' groups, its size group and the overall totals"""
+        size = size_bucket(run['issue_chars'])
+        keys = [(label, size) for label in run['labels'] or [NO_LABEL]] + [(ANY_LABEL, size)]
+        for group in [self.overall] + [self.groups.setdefault(key, self._new_group()) for key in keys]:
+            group['runs'] += 1
+            group['cost_usd'] += run['cost_usd']
+            group['duration_s'] += run['duration_s']
+            if run['success']:
+                group['successes'] += 1
+                group['turns'].append(run['turns'])
+
+    def estimate(self, issue: Dict[str, Any], default_turns: int, max_turns: int) -> Dict[str, Any]:
+        """Expected success chance, cost and duration of an issue, and the turns to give it
+
+        Groups for the issue's labels at its size are pooled; with fewer than
+        MIN_RUNS runs among them, all issues of that size are added. Every
+        figure is then pulled towards the overall history by PRIOR_RUNS.
+        """
+        size = size_bucket(issue_chars(issue))
+        pooled = self._new_group()
+        for label in issue['labels'] or [NO_LABEL]:
+            self._merge(pooled, self.groups.get((label, size)))
+        if pooled['runs'] < MIN_RUNS:
+            self._merge(pooled, self.groups.get((ANY_LABEL, size)))
+
+        overall = self.overall
+        if overall['runs']:
+            prior_success = overall['successes'] / overall['runs']
+            prior_cost = overall['cost_usd'] / overall['runs']
+            prior_duration = overall['duration_s'] / overall['runs']
+        else:
+            prior_success, prior_cost, prior_duration = DEFAULT_SUCCESS, DEFAULT_COST_USD, DEFAULT_DURATION_S
+        weight = pooled['runs'] + PRIOR_RUNS
+
+        turns = sorted(pooled['turns'] if len(pooled['turns']) >= MIN_RUNS else pooled['turns'] + overall['turns'])
+        if turns:
+            budget = turns[min(len(turns) - 1, int(TURN_QUANTILE * len(turns)))]
+        else:
+            budget = default_turns
+
+        return {
+            'success': (pooled['successes'] + PRIOR_RUNS * prior_success) / weight,
+            'cost_usd': (pooled['cost_usd'] + PRIOR_RUNS * prior_cost) / weight,
+            'duration_s': (pooled['duration_s'] + PRIOR_RUNS * prior_duration) / weight,
+            'max_turns': max(MIN_TURNS, min(max_turns, budget)),
+            'runs': pooled['runs']
+        }
+
+    def _new_group(self) -> Dict[str, Any]:
+        return {'runs': 0, 'successes': 0, 'cost_usd': 0.0, 'duration_s': 0.0, 'turns': []}
+
+    def _merge(self, into: Dict[str, Any], group: Optional[Dict[str, Any]]) -> None:
+        if not group:
+            return
+        for key in ('runs', 'successes', 'cost_usd', 'duration_s'):
+            into[key] += group[key]
+        into['turns'] = into['turns'] + group['turns']
+
+
+class Scheduler:
+    """Plans a batch to solve as many issues as possible within dollar and time budgets
+
+    Issues are ordered by expected success per share of the budgets they
+    would use, so short, likely issues go first, and issues that would not
+    fit are deferred. While the batch runs, admit() re-checks each issue
+    against what has been spent and how much time has passed. An admitted
+    issue's estimated cost stays reserved until charge() replaces it with
+    what the issue actually cost, so issues running at once cannot together
+    overshoot the dollar budget.
+    """
+
+    def __init__(self, history: History, default_turns: int = 10, max_turns: int = 40,
+                 budget_usd: Optional[float] = None, budget_seconds: Optional[float] = None,
+                 concurrency: int = 1):
+        self.history = history
+        self.default_turns = default_turns
+        self.max_turns = max_turns
+        self.budget_usd = budget_usd
+        self.budget_seconds = budget_seconds
+        self.concurrency = concurrency
+        self.estimates: Dict[int, Dict[str, Any]] = {}
+        self.spent_usd = 0.0
+        self.reserved_usd: Dict[int, float] = {}
+        self._started: Optional[float] = None
+
+    def plan(self, issues: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Order the issues to solve and set aside those over budget, as (planned, deferred)"""
+        for issue in issues:
+            self.estimates[issue['number']] = self.history.estimate(issue, self.default_turns, self.max_turns)
+
+        def value(issue: Dict[str, Any]) -> float:
+            estimate = self.estimates[issue['number']]
+            share = 0.0
+            if self.budget_usd:
+                share += estimate['cost_usd'] / self.budget_usd
+            if self.budget_seconds:
+                share += estimate['duration_s'] / (self.budget_seconds * self.concurrency)
+            if not share:
+                # No budgets: the shortest likely issues first
+                share = estimate['duration_s']
+            return estimate['success'] / max(share, 1e-9)
+
+        planned, deferred = [], []
+        cost = duration = 0.0
+        for issue in sorted(issues, key=value, reverse=True):
+            estimate = self.estimates[issue['number']]
+            over_cost = self.budget_usd is not None and cost + estimate['cost_usd'] > self.budget_usd
+            over_time = (self.budget_seconds is not None and
+                         (duration + estimate['duration_s']) / self.concurrency > self.budget_seconds)
+            if over_cost or over_time:
+                deferred.append(issue)
+                continue
+            planned.append(issue)
+            cost += estimate['cost_usd']
+            duration += estimate['duration_s']
+        return planned, deferred
+
+    def max_turns_for(self, issue: Dict[str, Any]) -> int:
+        """Turn limit for the issue's first session, or the default for issues without an estimate"""
+        estimate = self.estimates.get(issue['number'])
+        return estimate['max_turns'] if estimate else self.default_turns
+
+    def admit(self, issue: Dict[str, Any]) -> bool:
+        """Whether the issue still fits in what is left of the budgets; reserves its cost and starts the clock"""
+        now = time.monotonic()
+        if self._started is None:
+            self._started = now
+        estimate = self.estimates.get(issue['number'])
+        if not estimate:
+            return True
+        committed = self.spent_usd + sum(self.reserved_usd.values())
+        if self.budget_usd is not None and committed + estimate['cost_usd'] > self.budget_usd:
+            return False
+        if self.budget_seconds is not None and now - self._started + estimate['duration_s'] > self.budget_seconds:
+            return False
+        self.reserved_usd[issue['number']] = estimate['cost_usd']
+        return True
+
+    def charge(self, issue: Dict[str, Any], cost_usd: float) -> None:
+        """Count what a finished issue actually cost, in place of its reservation"""
+        self.reserved_usd.pop(issue['number'], None)
+        self.spent_usd += cost_usd
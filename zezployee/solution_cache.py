@@ -0,0 +1,87 @@
+"""Content-addressed cache of Claude's solutions, so a re-run does not pay twice"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+
+# Patches are small; this keeps thousands of them
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS solutions (
+    key TEXT PRIMARY KEY,
+    patch BLOB NOT NULL,
+    meta TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS solutions_last_used ON solutions (last_used);
+"""
+
+
+def solution_key(prompt: str, tree: str) -> str:
+    """Key a solution by the exact prompt and the tree it was produced against"""
+    return hashlib.sha256(f"{tree}\0{prompt}".encode()).hexdigest()
+
+
+class SolutionCache:
+    """Patches keyed by prompt and base tree, evicted least recently used first
+
+    Batch runs look entries up from several executor threads at once, so
+    the connection is shared behind a lock.
+    """
+
+    def __init__(self, path: Path, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.conn = sqlite3.connect(str(path), timeout=30, check_same_thread=False)
+        self.conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def close(self) -> None:
+        """Close the underlying database"""
+        self.conn.close()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get the patch and metadata stored under key, marking it as recently used"""
+        with self._lock, self.conn:
+            row = self.conn.execute("SELECT patch, meta FROM solutions WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self.conn.execute("UPDATE solutions SET last_used = ? WHERE key = ?", (time.time(), key))
+        return dict(json.loads(row[1]), patch=bytes(row[0]))
+
+    def put(self, key: str, patch: bytes, meta: Dict[str, Any]) -> None:
+        """Store a patch with its metadata, then evict down to the size limit"""
+        now = time.time()
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO solutions (key, patch, meta, size, created_at, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, patch, json.dumps(meta, default=str), len(patch), now, now)
+            )
+            self._evict()
+
+    def discard(self, key: str) -> None:
+        """Drop an entry, e.g. one whose patch no longer applies"""
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM solutions WHERE key = ?", (key,))
+
+    def _evict(self) -> None:
+        """Delete least recently used entries until the cache fits in max_bytes"""
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM solutions").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        victims = []
+        for key, size in self.conn.execute("SELECT key, size FROM solutions ORDER BY last_used"):
+            if total <= self.max_bytes:
+                break
+            victims.append((key,))
+            total -= size
+        self.conn.executemany("DELETE FROM solutions WHERE key = ?", victims)
@@ -0,0 +1,27 @@
+"""Append-only NDJSON transcript of a Claude Code session"""
+
+import json
+from pathlib import Path
+from typing import Dict, Any
+
+
+class NdjsonSink:
+    def __init__(self, path: Path):
+        self.path = path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.count = 0
+        self._file = None
+
+    def __enter__(self) -> 'NdjsonSink':
+        self._file = open(self.path, 'a', encoding='utf-8')
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._file.close()
+        self._file = None
+
+    def write(self, record: Dict[str, Any]) -> None:
+        """Append one record as a single JSON line"""
+        self._file.write(json.dumps(record, default=str, ensure_ascii=False))
+        self._file.write('\n')
+        self.count += 1
@@ -0,0 +1,225 @@
+"""Compressed, append-only store of Claude Code session transcripts
+
+Each session is spooled to its own gzip file while it runs, then appended
+whole, as one gzip member, to the current segment file. A fixed-size binary
+record per session (issue, session id hash, segment, offset, length) goes
+to `index.bin`, which is read through mmap to find transcripts. A one-line
+JSON summary per session goes to `sessions.ndjson`, which `stats()` streams
+to aggregate cost, turns, duration and success without reading transcripts.
+"""
+
+import gzip
+import hashlib
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+import uuid
+import zlib
+from pathlib import Path
+from typing import Dict, Any, Iterator, List, Optional
+
+from .transcript import NdjsonSink
+
+try:
+    import fcntl
+except ImportError:  # Windows: appends are only serialized within the process
+    fcntl = None
+
+
+# A new segment is started once the current one passes this size
+DEFAULT_SEGMENT_BYTES = 64 * 1024 * 1024
+
+# issue number, session id hash, segment number, offset, length
+INDEX_RECORD = struct.Struct('<Q16sIQQ')
+
+READ_CHUNK = 64 * 1024
+
+# Pseudo-labels in stats(): sessions of unlabeled issues, and every session
+NO_LABEL = '(none)'
+ALL_SESSIONS = '(all)'
+
+
+def session_key(session_id: Optional[str]) -> bytes:
+    """Fixed-size key of a session id, as stored in the index"""
+    return hashlib.blake2b((session_id or '').encode(), digest_size=16).digest()
+
+
+class SessionWriter(NdjsonSink):
+    """Spools one session's messages, committing them to the store on exit
+
+    finish() records the outcome; a session left without one, for example
+    by an exception, is stored as failed.
+    """
+
+    def __init__(self, store: 'TranscriptStore', meta: Dict[str, Any]):
+        super().__init__(store.root / 'spool' / f"{uuid.uuid4().hex}.gz")
+        self.store = store
+        self.meta = meta
+        self.summary: Dict[str, Any] = {}
+        self.started_at = time.time()
+
+    def __enter__(self) -> 'SessionWriter':
+        self._file = gzip.open(self.path, 'wt', encoding='utf-8', compresslevel=6)
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        super().__exit__(exc_type, exc, traceback)
+        try:
+            if self.count:
+                if not self.summary:
+                    self.finish(success=False, outcome=f"error: {exc}" if exc else 'unfinished')
+                self.store._commit(self)
+        finally:
+            self.path.unlink()
+
+    def finish(self, **summary: Any) -> None:
+        """Record the session's outcome: session_id, success, outcome, cost_usd, turns"""
+        self.summary = summary
+
+
+class TranscriptStore:
+    """Transcripts of every session, in gzip segments under `root`"""
+
+    def __init__(self, root: Path, segment_bytes: int = DEFAULT_SEGMENT_BYTES):
+        self.root = root
+        self.segment_bytes = segment_bytes
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.index_path = root / 'index.bin'
+        self.sessions_path = root / 'sessions.ndjson'
+        self._lock = threading.Lock()
+
+    def session(self, **meta: Any) -> SessionWriter:
+        """Start recording a session; meta (issue, labels, ...) goes into its summary"""
+        return SessionWriter(self, meta)
+
+    def find(self, issue: Optional[int] = None, session_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Locate stored transcripts by issue number and/or session id, oldest first"""
+        if not self.index_path.exists() or not self.index_path.stat().st_size:
+            return []
+
+        key = session_key(session_id) if session_id is not None else None
+        found = []
+        with open(self.index_path, 'rb') as handle, \
+                mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            # Records are unpacked in place rather than from a copy of the
+            # index; a record cut short by a crash mid-append is ignored
+            usable = len(view) - len(view) % INDEX_RECORD.size
+            for position in range(0, usable, INDEX_RECORD.size):
+                number, stored_key, segment, offset, length = INDEX_RECORD.unpack_from(view, position)
+                if issue is not None and number != issue:
+                    continue
+                if key is not None and stored_key != key:
+                    continue
+                found.append({'issue': number, 'segment': segment, 'offset': offset, 'length': length})
+        return found
+
+    def messages(self, entry: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """Stream the messages of a transcript located by find()"""
+        decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)
+        pending = b''
+        with open(self._segment_path(entry['segment']), 'rb') as handle:
+            handle.seek(entry['offset'])
+            remaining = entry['length']
+            while remaining:
+                chunk = handle.read(min(READ_CHUNK, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                pending += decompressor.decompress(chunk)
+                *lines, pending = pending.split(b'\n')
+                for line in lines:
+                    if line:
+                        yield json.loads(line)
+
+    def sessions(self, since: Optional[float] = None) -> Iterator[Dict[str, Any]]:
+        """Stream session summaries, optionally only those started after a timestamp"""
+        if not self.sessions_path.exists():
+            return
+        with open(self.sessions_path, encoding='utf-8') as handle:
+            for line in handle:
+                try:
+                    summary = json.loads(line)
+                except ValueError:
+                    continue
+                if since is None or summary.get('started_at', 0) >= since:
+                    yield summary
+
+    def stats(self, since: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Sessions, success rate, cost, turns and duration per label, busiest label first
+
+        A session counts towards each of its issue's labels; unlabeled ones
+        are grouped under NO_LABEL, and a last ALL_SESSIONS row covers every
+        session once. Only running totals are kept in memory.
+        """
+        totals: Dict[str, Dict[str, float]] = {}
+        for summary in self.sessions(since):
+            for label in [*(summary.get('labels') or [NO_LABEL]), ALL_SESSIONS]:
+                row = totals.setdefault(label, {'sessions': 0, 'succeeded': 0, 'cost_usd': 0.0,
+                                                'turns': 0, 'duration_s': 0.0})
+                row['sessions'] += 1
+                row['succeeded'] += bool(summary.get('success'))
+                row['cost_usd'] += summary.get('cost_usd') or 0
+                row['turns'] += summary.get('turns') or 0
+                row['duration_s'] += summary.get('duration_s') or 0
+
+        rows = []
+        for label, row in totals.items():
+            sessions = row['sessions']
+            rows.append({
+                'label': label,
+                'sessions': sessions,
+                'success_rate': row['succeeded'] / sessions,
+                'cost_usd': row['cost_usd'],
+                'avg_cost_usd': row['cost_usd'] / sessions,
+                'avg_turns': row['turns'] / sessions,
+                'avg_duration_s': row['duration_s'] / sessions
+            })
+        rows.sort(key=lambda row: (row['label'] == ALL_SESSIONS, -row['sessions'], row['label']))
+        return rows
+
+    def _commit(self, writer: SessionWriter) -> None:
+        """Append a finished session's spool, index record and summary"""
+        data = writer.path.read_bytes()
+        summary = dict(writer.meta, **writer.summary)
+        summary['started_at'] = writer.started_at
+        summary['duration_s'] = round(time.time() - writer.started_at, 3)
+        summary['messages'] = writer.count
+
+        with self._lock, open(self.index_path, 'ab') as index:
+            if fcntl:
+                fcntl.flock(index, fcntl.LOCK_EX)
+            try:
+                segment = self._current_segment()
+                with open(self._segment_path(segment), 'ab') as handle:
+                    offset = handle.tell()
+                    handle.write(data)
+                    handle.flush()
+                    os.fsync(handle.fileno())
+
+                index.write(INDEX_RECORD.pack(int(summary.get('issue') or 0),
+                                              session_key(summary.get('session_id')),
+                                              segment, offset, len(data)))
+                index.flush()
+                with open(self.sessions_path, 'a', encoding='utf-8') as sessions:
+                    sessions.write(json.dumps(dict(summary, segment=segment, offset=offset), default=str))
+                    sessions.write('\n')
+            finally:
+                if fcntl:
+                    fcntl.flock(index, fcntl.LOCK_UN)
+
+    def _current_segment(self) -> int:
+        """Number of the segment to append to, starting a new one when it is full"""
+        numbers = [int(path.name.split('-')[1].split('.')[0]) for path in self.root.glob('segment-*.ndjson.gz')]
+        if not numbers:
+            return 1
+        latest = max(numbers)
+        if self._segment_path(latest).stat().st_size >= self.segment_bytes:
+            return latest + 1
+        return latest
+
+    def _segment_path(self, segment: int) -> Path:
+        """File holding a segment; numbers are zero-padded so the names sort in order"""
+        return self.root / f"segment-{segment:06d}.ndjson.gz"
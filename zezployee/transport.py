@@ -0,0 +1,225 @@
+"""Rate-limit-aware HTTP transport for the GitHub API"""
+
+import json
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+from .profiling import profiler
+
+try:
+    import fcntl
+except ImportError:  # Windows: bucket state is only shared within the process
+    fcntl = None
+
+
+# Requests kept in reserve so other tools using the same token are not starved
+SAFETY_MARGIN = 50
+
+# Largest burst allowed before pacing kicks in
+BURST = 100
+
+# Retries after a secondary rate limit or a primary limit running out
+MAX_RATE_LIMIT_RETRIES = 5
+
+
+class RateLimiter:
+    """Token bucket per API resource, fed by X-RateLimit-* headers
+
+    Tokens refill at the rate that spreads the remaining quota evenly until
+    the reset time, so throughput sits just under the limit instead of
+    bursting into a lockout. A server that sends no such headers, such as
+    GitHub Enterprise with rate limiting turned off, is not paced at all.
+    The bucket lives in a small JSON file guarded by an exclusive lock, so
+    every zezployee process on the machine paces itself against the same
+    budget.
+    """
+
+    def __init__(self, state_path: Path, burst: int = BURST, safety_margin: int = SAFETY_MARGIN):
+        self.state_path = state_path
+        self.burst = burst
+        self.safety_margin = safety_margin
+        self._thread_lock = threading.Lock()
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+
+    @contextmanager
+    def _locked_state(self):
+        """Load the bucket state under a process-wide and file lock, saving it afterwards"""
+        with self._thread_lock:
+            with open(self.state_path, 'a+') as handle:
+                if fcntl:
+                    fcntl.flock(handle, fcntl.LOCK_EX)
+                try:
+                    handle.seek(0)
+                    try:
+                        state = json.loads(handle.read() or '{}')
+                    except ValueError:
+                        state = {}
+                    yield state
+                    handle.seek(0)
+                    handle.truncate()
+                    handle.write(json.dumps(state))
+                    handle.flush()
+                finally:
+                    if fcntl:
+                        fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def acquire(self, resource: str) -> float:
+        """Take one token for a request, sleeping until one is available
+
+        Returns the number of seconds spent waiting.
+        """
+        waited = 0.0
+        while True:
+            with self._locked_state() as state:
+                bucket = self._refill(state.setdefault(resource, {}), time.time())
+                now = time.time()
+                if bucket.get('blocked_until', 0) > now:
+                    delay = bucket['blocked_until'] - now
+                elif bucket.get('unpaced'):
+                    return waited
+                elif bucket['tokens'] >= 1:
+                    bucket['tokens'] -= 1
+                    return waited
+                elif bucket['rate'] > 0:
+                    delay = (1 - bucket['tokens']) / bucket['rate']
+                else:
+                    delay = max(1.0, bucket.get('reset', now + 60) - now)
+            time.sleep(delay)
+            waited += delay
+
+    def update(self, resource: str, headers: Dict[str, str]) -> None:
+        """Re-pace the bucket from a response's rate limit headers"""
+        if 'X-RateLimit-Remaining' not in headers:
+            # No limit to stay under; pacing resumes if headers show up
+            with self._locked_state() as state:
+                self._refill(state.setdefault(resource, {}), time.time())['unpaced'] = True
+            return
+        remaining = int(headers['X-RateLimit-Remaining'])
+        reset = float(headers.get('X-RateLimit-Reset', time.time() + 3600))
+        # The response names the bucket that was actually charged
+        resource = headers.get('X-RateLimit-Resource', resource)
+
+        with self._locked_state() as state:
+            now = time.time()
+            bucket = self._refill(state.setdefault(resource, {}), now)
+            bucket.pop('unpaced', None)
+            usable = max(0, remaining - self.safety_margin)
+            bucket['remaining'] = remaining
+            bucket['reset'] = reset
+            bucket['rate'] = usable / max(1.0, reset - now)
+            bucket['tokens'] = min(bucket['tokens'], usable, self.burst)
+
+    def block(self, resource: str, seconds: float) -> None:
+        """Stop every process from using a resource for a while"""
+        with self._locked_state() as state:
+            bucket = self._refill(state.setdefault(resource, {}), time.time())
+            bucket['blocked_until'] = max(bucket.get('blocked_until', 0), time.time() + seconds)
+            bucket['tokens'] = 0
+
+    def remaining(self, resource: str = 'core') -> Optional[int]:
+        """Last known remaining quota for a resource"""
+        with self._locked_state() as state:
+            return state.get(resource, {}).get('remaining')
+
+    def _refill(self, bucket: Dict[str, Any], now: float) -> Dict[str, Any]:
+        """Add the tokens earned since the bucket was last touched"""
+        if 'tokens' not in bucket:
+            # Nothing known yet: allow a burst until the first response tells us more
+            bucket.update(tokens=float(self.burst), rate=1.0, updated=now)
+        if bucket.get('reset') and now >= bucket['reset']:
+            # The window rolled over; pace loosely until headers arrive again
+            bucket.update(rate=1.0, reset=0, tokens=float(self.burst))
+        elapsed = max(0.0, now - bucket['updated'])
+        bucket['tokens'] = min(float(self.burst), bucket['tokens'] + elapsed * bucket['rate'])
+        bucket['updated'] = now
+        return bucket
+
+
+class GitHubTransport:
+    """Pooled HTTP session for the GitHub API that paces itself under the rate limit"""
+
+    def __init__(self, token: str, api_url: str, state_path: Path, pool_size: int = 16):
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        self.api_url = api_url.rstrip('/')
+        self.limiter = RateLimiter(state_path)
+        self.request_count = 0
+
+        self.session = requests.Session()
+        self.session.headers.update({
+            'Authorization': f'token {token}',
+            'Accept': 'application/vnd.github+json',
+            'User-Agent': 'zezployee'
+        })
+        # Connection-level failures and 5xx are retried by urllib3; rate
+        # limits are handled in request() where the headers are understood
+        adapter = HTTPAdapter(
+            pool_connections=2,
+            pool_maxsize=pool_size,
+            max_retries=Retry(total=3, connect=3, backoff_factor=0.5, status_forcelist=(502, 503, 504),
+                              allowed_methods=frozenset(['GET', 'HEAD']))
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def request(self, method: str, url: str, **kwargs: Any):
+        """Send a request, waiting for rate limit budget and backing off when limited"""
+        if url.startswith('/'):
+            url = self.api_url + url
+        resource = self._resource(url)
+
+        for _ in range(MAX_RATE_LIMIT_RETRIES + 1):
+            self.limiter.acquire(resource)
+            response = self.session.request(method, url, **kwargs)
+            self.request_count += 1
+            profiler.count('api_calls')
+            if 'X-RateLimit-Remaining' in response.headers:
+                profiler.gauge('rate_limit_remaining', int(response.headers['X-RateLimit-Remaining']))
+            self.limiter.update(resource, response.headers)
+
+            wait = self._rate_limit_wait(response)
+            if wait is None:
+                return response
+            print(f"⏳ GitHub rate limit hit, backing off {wait:.0f}s")
+            self.limiter.block(resource, wait)
+
+        return response
+
+    def get(self, url: str, **kwargs: Any):
+        """Send a GET request"""
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs: Any):
+        """Send a POST request"""
+        return self.request('POST', url, **kwargs)
+
+    def patch(self, url: str, **kwargs: Any):
+        """Send a PATCH request"""
+        return self.request('PATCH', url, **kwargs)
+
+    def _resource(self, url: str) -> str:
+        """Rate limit bucket a URL is charged against"""
+        if url.endswith('/graphql'):
+            return 'graphql'
+        if '/search/' in url:
+            return 'search'
+        return 'core'
+
+    def _rate_limit_wait(self, response) -> Optional[float]:
+        """Seconds to wait if the response is a primary or secondary rate limit"""
+        if response.status_code not in (403, 429):
+            return None
+        retry_after = response.headers.get('Retry-After')
+        if retry_after:
+            return float(retry_after)
+        if response.headers.get('X-RateLimit-Remaining') == '0':
+            return max(1.0, float(response.headers.get('X-RateLimit-Reset', 0)) - time.time())
+        if response.status_code == 429 or 'secondary rate limit' in response.text.lower():
+            # GitHub asks for at least a minute when it gives no Retry-After
+            return 60.0
+        return None
@@ -0,0 +1,262 @@
+"""Running the project's tests on Claude's changes before they are published
+
+Only tests that can be affected by the changed files are run. They are
+found through a map of Python imports. The map is kept per git blob, so
+each file is parsed once however many worktrees and runs see it. Results
+are cached by the tree that was tested.
+"""
+
+import hashlib
+import json
+import os
+import re
+import shlex
+import sqlite3
+import subprocess
+import threading
+import time
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Set
+
+from .git_workspace import GitWorkspace
+
+
+DEFAULT_TEST_COMMAND = 'python -m pytest -q'
+
+# Seconds before a test run counts as failed
+DEFAULT_TIMEOUT = 900
+
+# Characters of test output kept for the cache and for Claude
+OUTPUT_CHARS = 8000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS imports (
+    blob TEXT PRIMARY KEY,
+    modules TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    passed INTEGER NOT NULL,
+    output TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+"""
+
+# `from` imports may list their names in parentheses over several lines
+IMPORT_PATTERN = re.compile(
+    r'^[ \t]*(?:from[ \t]+(\.*[\w.]*)[ \t]+import[ \t]*(?:\(([^)]*)\)|([^\n#;]+))|import[ \t]+([^\n#;]+))',
+    re.MULTILINE
+)
+
+# Changes to these cannot break tests. Not .txt: requirements.txt and
+# CMakeLists.txt change how the project builds
+DOC_SUFFIXES = ('.md', '.rst')
+
+
+def is_test_file(path: str) -> bool:
+    """Whether pytest would collect the file by default: `test_*.py` or `*_test.py`
+
+    Only the name counts, so tests are found in a `tests/` directory or next
+    to the code alike, while helpers and conftest.py in `tests/` are not.
+    """
+    name = path.rsplit('/', 1)[-1]
+    return name.endswith('.py') and (name.startswith('test_') or name.endswith('_test.py'))
+
+
+def parse_imports(source: str) -> List[str]:
+    """Dotted names a Python file imports; `from x import y` gives `x.y`, relative names keep their dots"""
+    modules = []
+    for base, grouped, names, plain in IMPORT_PATTERN.findall(source):
+        if plain:
+            modules.extend(name.split()[0] for name in plain.split(',') if name.strip())
+            continue
+        if grouped:
+            names = re.sub(r'#[^\n]*', '', grouped)
+        for name in names.split(','):
+            # `name as alias` imports name
+            name = name.split()[0] if name.strip() else ''
+            if name == '*':
+                modules.append(base)
+            elif name:
+                modules.append(f"{base}{name}" if base.endswith('.') else f"{base}.{name}")
+    return modules
+
+
+def _module_path(path: str) -> List[str]:
+    """Dotted module path of a Python file, as a list of parts"""
+    parts = path[:-3].split('/')
+    return parts[:-1] if parts[-1] == '__init__' else parts
+
+
+class ImportMap:
+    """Python import graph of a checkout, for finding the tests a change can affect"""
+
+    def __init__(self, conn: sqlite3.Connection, lock: threading.Lock):
+        self.conn = conn
+        self._lock = lock
+
+    def affected_tests(self, workspace: GitWorkspace, changed: List[str]) -> Optional[List[str]]:
+        """Test files that import a changed file, directly or not
+
+        Returns None when the whole suite must run: a changed file that is
+        neither Python nor documentation, or a changed conftest.py.
+        """
+        code = [path for path in changed if not path.endswith(DOC_SUFFIXES) and not path.startswith('docs/')]
+        if any(not path.endswith('.py') or path.rsplit('/', 1)[-1] == 'conftest.py' for path in code):
+            return None
+
+        blobs = self._python_blobs(workspace)
+        imports = self._imports(workspace, blobs)
+
+        # Every dotted suffix of a file's module path may be how it is imported
+        paths = set(blobs) | set(code)
+        names: Dict[str, Set[str]] = {}
+        for path in paths:
+            parts = _module_path(path)
+            for start in range(len(parts)):
+                names.setdefault('.'.join(parts[start:]), set()).add(path)
+
+        importers: Dict[str, Set[str]] = {}
+        for path, blob in blobs.items():
+            for module in imports.get(blob, []):
+                for target in self._resolve(path, module, names, paths):
+                    importers.setdefault(target, set()).add(path)
+
+        seen = set(code)
+        pending = list(code)
+        while pending:
+            for importer in importers.get(pending.pop(), ()):
+                if importer not in seen:
+                    seen.add(importer)
+                    pending.append(importer)
+        return sorted(path for path in seen if is_test_file(path) and path in blobs)
+
+    def _resolve(self, importer: str, module: str, names: Dict[str, Set[str]], paths: Set[str]) -> Set[str]:
+        """Files an imported dotted name may refer to, trying the longest name first"""
+        if module.startswith('.'):
+            # Relative to the importer's package, going up one package per extra dot
+            level = len(module) - len(module.lstrip('.'))
+            package = importer.split('/')[:-1]
+            package = package[:max(0, len(package) - level + 1)]
+            parts = package + [part for part in module.lstrip('.').split('.') if part]
+            for end in range(len(parts), len(package) - 1, -1):
+                base = '/'.join(parts[:end])
+                found = {path for path in (f"{base}.py", f"{base}/__init__.py") if path in paths}
+                if found:
+                    return found
+            return set()
+
+        parts = module.split('.')
+        for end in range(len(parts), 0, -1):
+            found = names.get('.'.join(parts[:end]))
+            if found:
+                return found
+        return set()
+
+    def _python_blobs(self, workspace: GitWorkspace) -> Dict[str, str]:
+        """Map staged Python paths to blob hashes"""
+        output = workspace.run('ls-files', '-s', '-z', '--', '*.py').stdout
+        blobs = {}
+        for entry in output.split('\0'):
+            if entry:
+                meta, path = entry.split('\t', 1)
+                blobs[path] = meta.split(' ')[1]
+        return blobs
+
+    def _imports(self, workspace: GitWorkspace, blobs: Dict[str, str]) -> Dict[str, List[str]]:
+        """Imports of each blob, parsing only blobs not seen before"""
+        wanted = set(blobs.values())
+        with self._lock:
+            known = {blob: json.loads(modules) for blob, modules in self.conn.execute("SELECT blob, modules FROM imports")
+                     if blob in wanted}
+        missing = sorted(wanted - set(known))
+        if missing:
+            parsed = {}
+            for blob, data in zip(missing, workspace.read_blobs(missing)):
+                parsed[blob] = parse_imports(data.decode('utf-8', errors='replace')) if data is not None else []
+            with self._lock, self.conn:
+                self.conn.executemany("INSERT OR IGNORE INTO imports (blob, modules) VALUES (?, ?)",
+                                      [(blob, json.dumps(modules)) for blob, modules in parsed.items()])
+            known.update(parsed)
+        return known
+
+
+class Verifier:
+    """Runs the tests affected by a checkout's changes, caching results by tree
+
+    verify() stages the changes, so the tested tree is the one that gets
+    committed. Test runs of different checkouts can happen at
+    the same time; the database is shared behind a lock.
+    """
+
+    def __init__(self, path: Path, workspace: Optional[GitWorkspace] = None,
+                 test_command: str = DEFAULT_TEST_COMMAND, timeout: float = DEFAULT_TIMEOUT):
+        self.workspace = workspace or GitWorkspace()
+        self.test_command = test_command
+        self.timeout = timeout
+        self.conn = sqlite3.connect(str(path), timeout=30, check_same_thread=False)
+        self.conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        self.import_map = ImportMap(self.conn, self._lock)
+
+    def close(self) -> None:
+        """Close the underlying database"""
+        self.conn.close()
+
+    def verify(self, cwd: Optional[Path] = None, paths: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Test the checkout's changes: `passed`, `output`, `command`, `tests` (None = all), `cached`
+
+        With paths, the files Claude edited, only those are staged rather
+        than everything in the checkout.
+        """
+        workspace = self.workspace.for_path(cwd)
+        workspace.stage(paths)
+        tree = workspace.run('write-tree').stdout.strip()
+        changed = workspace.staged_paths()
+
+        tests = self.import_map.affected_tests(workspace, changed)
+        if tests is not None and not tests:
+            return {'passed': True, 'output': 'No tests are affected by the changes', 'command': None,
+                    'tests': [], 'cached': False}
+
+        command = self._command(tests)
+        key = hashlib.sha256(f"{tree}\0{command}".encode()).hexdigest()
+        with self._lock:
+            row = self.conn.execute("SELECT passed, output FROM results WHERE key = ?", (key,)).fetchone()
+        if row:
+            return {'passed': bool(row[0]), 'output': row[1], 'command': command, 'tests': tests, 'cached': True}
+
+        passed, output = self._run(command, workspace.path, clean=paths is None)
+        with self._lock, self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO results (key, passed, output, created_at) VALUES (?, ?, ?, ?)",
+                              (key, int(passed), output, time.time()))
+        return {'passed': passed, 'output': output, 'command': command, 'tests': tests, 'cached': False}
+
+    def _command(self, tests: Optional[List[str]]) -> str:
+        """The test command, limited to the given test files unless running everything"""
+        if tests is None:
+            return self.test_command.replace('{tests}', '')
+        selected = ' '.join(shlex.quote(test) for test in tests)
+        if '{tests}' in self.test_command:
+            return self.test_command.replace('{tests}', selected)
+        return f"{self.test_command} {selected}"
+
+    def _run(self, command: str, cwd: Path, clean: bool = True) -> tuple:
+        """Run the tests, with clean dropping the untracked files they left behind
+
+        Without it the artifacts stay, but only edited paths get committed.
+        """
+        env = dict(os.environ, PYTHONDONTWRITEBYTECODE='1')
+        try:
+            completed = subprocess.run(command, shell=True, cwd=cwd, env=env, timeout=self.timeout,
+                                       stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                       text=True, errors='replace')
+            passed, output = completed.returncode == 0, completed.stdout
+        except subprocess.TimeoutExpired as e:
+            output = e.stdout.decode(errors='replace') if isinstance(e.stdout, bytes) else (e.stdout or '')
+            passed, output = False, f"{output}\nTimed out after {self.timeout:.0f}s"
+        finally:
+            if clean:
+                # Everything Claude wrote is staged, so this only removes test artifacts
+                self.workspace.for_path(cwd).run('clean', '-fdq', check=False, scan=True)
+        return passed, output[-OUTPUT_CHARS:]
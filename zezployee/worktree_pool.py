@@ -0,0 +1,193 @@
+"""Pool of ready-to-use worktrees, so an issue does not pay for checkout and setup"""
+
+import os
+import queue
+import shutil
+import subprocess
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import List, Optional, Sequence, Iterator
+
+from .git_workspace import GitWorkspace
+from .profiling import profiler
+
+
+# Untracked paths that survive recycling, so installed dependencies are kept
+DEFAULT_KEEP = ('.venv', 'venv', 'node_modules')
+
+# Seconds between background fetches of the base branch
+DEFAULT_FETCH_INTERVAL = 300.0
+
+
+def non_interactive_env():
+    """Environment for background git commands that must fail rather than ask for credentials
+
+    The terminal may belong to the issue picker, so neither git nor ssh may
+    prompt on it for a password or passphrase.
+    """
+    return {
+        'GIT_TERMINAL_PROMPT': '0',
+        'GIT_SSH_COMMAND': f"{os.environ.get('GIT_SSH_COMMAND') or 'ssh'} -o BatchMode=yes"
+    }
+
+
+class WorktreePool:
+    """Keeps `size` worktrees checked out at the base branch with dependencies installed
+
+    Slots live under `root` and survive between runs. A new slot is added
+    with `git worktree add` and set up once with `setup_command`. A returned
+    slot is recycled in the background with `git reset --hard` and
+    `git clean -fdx`, keeping the `keep` paths, and checked out at the
+    latest fetched base commit. acquire() only has to create the branch.
+    """
+
+    def __init__(self, workspace: GitWorkspace, root: Path, size: int,
+                 setup_command: Optional[str] = None, keep: Sequence[str] = DEFAULT_KEEP,
+                 fetch_interval: float = DEFAULT_FETCH_INTERVAL):
+        if size < 1:
+            raise ValueError("Pool size must be at least 1")
+        self.workspace = workspace
+        self.root = root
+        self.size = size
+        self.setup_command = setup_command
+        self.keep = tuple(keep)
+        self.fetch_interval = fetch_interval
+        self.base: Optional[str] = None
+        self._ready: queue.Queue = queue.Queue()
+        self._workers: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._fetcher: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Resolve the base commit and prepare every slot in the background
+
+        Starting an already started pool does nothing, so a pool warmed up
+        while the user picks issues can be handed on to a batch run.
+        """
+        if self._fetcher is not None:
+            return
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.base = self._resolve_base()
+        self.workspace.run('worktree', 'prune')
+        for index in range(self.size):
+            self._in_background(self._prepare, self.root / f"slot-{index}")
+        self._fetcher = threading.Thread(target=self._fetch_loop, daemon=True)
+        self._fetcher.start()
+
+    def grow(self, size: int) -> None:
+        """Add slots up to size, preparing them in the background once started
+
+        Slots are never taken away, so a smaller size does nothing.
+        """
+        if size <= self.size:
+            return
+        added = range(self.size, size)
+        self.size = size
+        if self._fetcher is not None:
+            for index in added:
+                self._in_background(self._prepare, self.root / f"slot-{index}")
+
+    def close(self) -> None:
+        """Stop fetching and wait for slots still being prepared or recycled"""
+        self._stop.set()
+        with self._lock:
+            workers = list(self._workers)
+        for worker in workers:
+            worker.join()
+
+    def acquire(self, branch_name: str) -> Path:
+        """Take a ready slot and create the branch in it from the base commit
+
+        Blocks until a slot is ready. A branch of the same name left by an
+        earlier run, such as one whose push failed, is started over, so the
+        issue can be solved again (or taken from the solution cache).
+        """
+        with profiler.span('lease_worktree'):
+            slot = self._ready.get()
+            if isinstance(slot, Exception):
+                raise RuntimeError(f"Could not prepare a pooled worktree: {slot}")
+
+            try:
+                self.workspace.for_path(slot).run('checkout', '-B', branch_name, self.base)
+            except subprocess.CalledProcessError as e:
+                self.release(slot)
+                raise RuntimeError(f"Failed to create branch {branch_name}: {e.stderr.strip() or e}")
+            return slot
+
+    def release(self, path: Path) -> None:
+        """Give a slot back; it is recycled in the background, leaving its branch intact"""
+        self._in_background(self._recycle, path)
+
+    @contextmanager
+    def lease(self, branch_name: str) -> Iterator[Path]:
+        """Hold a slot with the branch checked out for the duration of the block"""
+        path = self.acquire(branch_name)
+        try:
+            yield path
+        finally:
+            self.release(path)
+
+    def _prepare(self, path: Path) -> Path:
+        """Reuse a slot left by an earlier run, or add and set up a new one"""
+        if (path / '.git').exists():
+            try:
+                return self._recycle(path)
+            except subprocess.CalledProcessError:
+                # No longer a registered worktree; start this slot over
+                shutil.rmtree(path, ignore_errors=True)
+                self.workspace.run('worktree', 'prune')
+
+        with profiler.span('create_pool_worktree'):
+            self.workspace.run('worktree', 'add', '--detach', str(path), self.base)
+            if self.setup_command:
+                subprocess.run(self.setup_command, shell=True, cwd=path, check=True,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        return path
+
+    def _recycle(self, path: Path) -> Path:
+        """Discard everything Claude did and move the slot to the latest base commit"""
+        workspace = self.workspace.for_path(path)
+        workspace.run('reset', '--hard', '--quiet')
+        workspace.run('checkout', '--detach', '--quiet', self.base)
+        workspace.run('clean', '-fdx', '--quiet', *(f"--exclude={pattern}" for pattern in self.keep))
+        return path
+
+    def _in_background(self, func, path: Path) -> None:
+        """Run a slot job on its own thread, making the slot ready (or failed) at the end"""
+        def work():
+            try:
+                self._ready.put(func(path))
+            except (subprocess.CalledProcessError, OSError) as e:
+                detail = getattr(e, 'stderr', None)
+                if isinstance(detail, bytes):
+                    detail = detail.decode(errors='replace')
+                self._ready.put(RuntimeError(f"{path.name}: {(detail or '').strip() or e}"))
+
+        worker = threading.Thread(target=work)
+        with self._lock:
+            self._workers = [thread for thread in self._workers if thread.is_alive()]
+            self._workers.append(worker)
+        worker.start()
+
+    def _resolve_base(self) -> str:
+        """Commit of origin's default branch, falling back to HEAD without one"""
+        for rev in (f"refs/remotes/origin/{self.workspace.base_branch}", 'HEAD'):
+            result = self.workspace.run('rev-parse', '--verify', '--quiet', f"{rev}^{{commit}}", check=False)
+            if result.returncode == 0:
+                return result.stdout.strip()
+        raise RuntimeError("Could not find a base commit for pooled worktrees")
+
+    def _fetch_loop(self) -> None:
+        """Keep the base commit fresh so recycled slots start from new upstream work
+
+        A fetch that fails, for example because it would need credentials,
+        keeps the old base.
+        """
+        while not self._stop.is_set():
+            result = self.workspace.run('fetch', '--quiet', 'origin', self.workspace.base_branch, check=False,
+                                        env=non_interactive_env())
+            if result.returncode == 0:
+                self.base = self._resolve_base()
+            self._stop.wait(self.fetch_interval)